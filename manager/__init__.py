@@ -1 +1,7 @@
-from .agent import root_agent
\ No newline at end of file
+# `adk web` / `adk run` look up `manager.root_agent`; resolve it on first access so importing a
+# lightweight submodule (e.g. manager.server for /api/healthz) doesn't build the whole agent tree.
+def __getattr__(name):
+    if name == "root_agent":
+        from .agent import root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,23 +1,29 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
-from manager.sub_agents.coding_agent.agent import coding_agent
-from manager.sub_agents.google_agent.agent import google_agent
-from manager.sub_agents.scraper_agent.agent import scraper_agent
-from manager.sub_agents.socialmedia_agent.agent import socialmedia_agent
-from manager.sub_agents.coinbase_agent.agent import coinbase_agent
-from manager.sub_agents.stock_agent.agent import stock_agent
-from google.adk.sessions import InMemorySessionService
-from google.adk.artifacts import InMemoryArtifactService
+from manager import agent_registry
+from manager.utils.lazy_agent import LazyAgent
 from google.adk.runners import Runner
 from manager.tools.custom_search_tool import google_custom_search
 from manager.utils.instructions_loader import load_instructions_from_file
 from manager.utils.file_summarizer import summarize_file
+from manager.utils.async_tools import offload_sync_tools, run_in_tool_thread
+from manager.utils.session_registry import SessionRegistry, DEFAULT_USER_ID, DEFAULT_CONVERSATION_ID
+from manager.utils.services import create_session_service, create_artifact_service, sessions_are_shared
+from manager.utils.stream_events import event_to_messages
+from manager.utils.fast_router import get_fast_router
+from manager.utils.metrics import TurnObserver, instrument_agent
+from manager.utils import tracing
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.agents.run_config import RunConfig, StreamingMode
+import asyncio
+import os
 
 load_dotenv(".env")
 
-# Session and artifact service setup
-artifact_service = InMemoryArtifactService()
-session_service = InMemorySessionService()
+# Session and artifact service setup (backend chosen by SESSION_BACKEND / ARTIFACT_BACKEND)
+artifact_service = create_artifact_service()
+session_service = create_session_service()
 
 # Instantiate the manager agent as the root agent
 # Tool for file summarization to be callable by the agent
@@ -39,52 +45,179 @@ def summarize_txt_file(file_name: str, max_lines: int = 60) -> dict:
         return {"status": "error", "message": summary}
     return {"status": "success", "summary": summary}
 
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-
 # Session and runner setup for agent interaction
-session_service = InMemorySessionService()
 APP_NAME = "agent4_app"
-USER_ID = "user_1"
-SESSION_ID = "session_001"
+
+# One session per (user, conversation); idle sessions expire and the total is LRU-bounded
+session_registry = SessionRegistry(
+    session_service,
+    app_name=APP_NAME,
+    ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+    max_sessions=int(os.getenv("SESSION_MAX_COUNT", "1000")),
+    shared=sessions_are_shared(),
+)
 
 runner = Runner(
     agent=None,  # Will be set after manager_agent is instantiated
     app_name=APP_NAME,
-    session_service=session_service
+    session_service=session_service,
+    artifact_service=artifact_service
 )
 
+# Upper bound on agent turns running concurrently in this process (each holds an LLM call and tool quota)
+MAX_CONCURRENT_TURNS = int(os.getenv("MANAGER_MAX_CONCURRENCY", "8"))
+_turn_semaphore = None
+
+
+def _get_turn_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the server's event loop rather than the import-time one
+    global _turn_semaphore
+    if _turn_semaphore is None:
+        _turn_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TURNS)
+    return _turn_semaphore
+
+
+def _reply_text(last_result) -> str:
+    if last_result is None:
+        print("[ManagerAgent] ERROR: No result produced by runner.")
+        return "[ERROR] No response generated. Please try again."
+    return last_result.content.parts[0].text
+
+
+_sub_agent_runners = {}
+
+
+def _sub_agent_runner(name: str) -> Runner:
+    """
+    Runner rooted at a sub-agent, sharing the manager's app name and services, so a routed turn is
+    recorded in the same conversation session (and later turns continue from that sub-agent).
+    """
+    sub_runner = _sub_agent_runners.get(name)
+    if sub_runner is None:
+        sub_runner = _sub_agent_runners.setdefault(name, Runner(
+            agent=agent_registry.load_sub_agent(name),
+            app_name=APP_NAME,
+            session_service=session_service,
+            artifact_service=artifact_service
+        ))
+    return sub_runner
+
+
 class ManagerAgent(LlmAgent):
-    def handle_message(self, message):
+    def _select_runner(self, message, user_id, session_id):
+        """
+        Picks the runner for this turn. Unambiguous requests (see manager.utils.fast_router and
+        manager/router_rules.json) go straight to the sub-agent without a manager LLM call.
+        """
+        router = get_fast_router()
+        if router is None:
+            return runner
+        state = {}
+        if router.needs_state:
+            session = session_service.get_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session_id,
+                config=GetSessionConfig(num_recent_events=1),
+            )
+            state = session.state if session else {}
+        route = router.route(message, state)
+        if route is None:
+            return runner
+        agent_name, rule_name = route
+        print(f"[ManagerAgent] Routing to {agent_name} (rule '{rule_name}').")
+        return _sub_agent_runner(agent_name)
+
+    def handle_message(self, message, user_id=DEFAULT_USER_ID, conversation_id=DEFAULT_CONVERSATION_ID):
+        """Synchronous entry point (CLI/scripts). The server uses handle_message_async."""
         from google.genai.types import Content, Part
-        # Always create (or overwrite) the session before running the agent
-        # Always create (or overwrite) the manager session before running the agent
-        session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-        # Robust routing: check for pending stock trade
-        stock_session = session_service.get_session(app_name="stock_agent", user_id=USER_ID, session_id=SESSION_ID)
-        if stock_session and stock_session.state.get("pending_trade_action"):
-            print("[ManagerAgent] Routing to stock_agent due to pending_trade_action.")
-            return stock_agent.handle_message(message, user_id=USER_ID, session_id=SESSION_ID)
+        # Reuse the conversation's session (created on first use)
+        session_id = session_registry.get_or_create(user_id, conversation_id)
         msg = Content(role="user", parts=[Part(text=message)])
-        result_gen = runner.run(
-            user_id=USER_ID,
-            session_id=SESSION_ID,
+        result_gen = self._select_runner(message, user_id, session_id).run(
+            user_id=user_id,
+            session_id=session_id,
             new_message=msg
         )
         last_result = None
         for result in result_gen:
             last_result = result
-        if last_result is None:
-            print("[ManagerAgent] ERROR: No result produced by runner.")
-            return "[ERROR] No response generated. Please try again."
-        return last_result.content.parts[0].text
+        return _reply_text(last_result)
+
+    async def _run_events(self, message, user_id, conversation_id, run_config=None):
+        """
+        Yields raw runner events for one turn while holding a concurrency slot.
+        Closing the generator early (client cancel/disconnect) stops the turn.
+        """
+        from google.genai.types import Content, Part
+        async with _get_turn_semaphore():
+            trace = tracing.start_trace("chat.turn", user_id=user_id, conversation_id=conversation_id,
+                                        message_chars=len(message))
+            observer, events, outcome, error = None, None, "error", None
+            try:
+                session_id = session_registry.get_or_create(user_id, conversation_id)
+                msg = Content(role="user", parts=[Part(text=message)])
+                selected_runner = await run_in_tool_thread(self._select_runner, message, user_id, session_id)
+                routed_to = selected_runner.agent.name if selected_runner is not runner else None
+                observer = TurnObserver(routed_to=routed_to)
+                events = selected_runner.run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=msg,
+                    run_config=run_config or RunConfig()
+                )
+                async for event in events:
+                    observer.event(event)
+                    if event.actions and event.actions.transfer_to_agent:
+                        tracing.record_transfer(event.author, event.actions.transfer_to_agent)
+                    yield event
+                outcome = "completed"
+            except (GeneratorExit, asyncio.CancelledError):
+                outcome = "cancelled"
+                raise
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                if events is not None:
+                    await events.aclose()
+                if observer is not None:
+                    observer.finish(outcome)
+                tracing.finish_trace(trace, status="ok" if outcome == "completed" else outcome, outcome=outcome,
+                                     **({"routed_to": routed_to} if observer and routed_to else {}),
+                                     **({"error": error} if error else {}))
+
+    async def handle_message_async(self, message, user_id=DEFAULT_USER_ID, conversation_id=DEFAULT_CONVERSATION_ID):
+        """
+        Runs one turn on the runner's async API without blocking the event loop.
+        At most MANAGER_MAX_CONCURRENCY turns run at once; further callers wait for a slot.
+        Sync tools are executed on the tool thread pool (see manager.utils.async_tools).
+        Each (user_id, conversation_id) pair gets its own session, reused across turns.
+        """
+        last_result = None
+        async for result in self._run_events(message, user_id, conversation_id):
+            last_result = result
+        return _reply_text(last_result)
+
+    async def stream_message(self, message, user_id=DEFAULT_USER_ID, conversation_id=DEFAULT_CONVERSATION_ID):
+        """
+        Runs one turn and yields client-facing messages as events are produced:
+        partial text, tool call start/end and sub-agent transfers (see manager.utils.stream_events),
+        followed by a final {"type": "done", "reply": ...} message.
+        """
+        reply = None
+        async for event in self._run_events(message, user_id, conversation_id, RunConfig(streaming_mode=StreamingMode.SSE)):
+            for item in event_to_messages(event):
+                if item["type"] == "text":
+                    reply = item["text"]
+                yield item
+        yield {"type": "done", "reply": reply if reply is not None else "[ERROR] No response generated. Please try again."}
 
 manager_agent = ManagerAgent(
     name="manager_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "manager_agent"),
     description="Handles high-level management and orchestration of sub-agents.",
     instruction=load_instructions_from_file("MANAGER_AGENT_INSTRUCTIONS.md"),
-    sub_agents=[google_agent, scraper_agent, coding_agent, socialmedia_agent, coinbase_agent, stock_agent],
+    # Placeholders: each sub-agent module is imported the first time the manager transfers to it
+    sub_agents=[LazyAgent.from_registry(name) for name in agent_registry.SUB_AGENTS],
     tools=[google_custom_search, summarize_txt_file]
 )
 
@@ -92,5 +225,23 @@ manager_agent = ManagerAgent(
 # Now that manager_agent is set, update runner.agent
 runner.agent = manager_agent
 
+def _attach_to_manager(agent):
+    # Loaded sub-agents report to the manager, so they can transfer back to it and to their peers
+    if agent.parent_agent is None:
+        agent.parent_agent = manager_agent
+
+# Run blocking tool functions on a thread pool so one slow tool doesn't stall the event loop,
+# then time every tool and model call (see /api/metrics)
+offload_sync_tools(manager_agent)
+instrument_agent(manager_agent)
+agent_registry.add_load_hook(_attach_to_manager)
+agent_registry.add_load_hook(offload_sync_tools)
+agent_registry.add_load_hook(instrument_agent)
+# Per-turn trace spans for tools, model calls and the HTTP requests tools make (see /api/traces)
+if tracing.TRACING_ENABLED:
+    tracing.install_http_tracing()
+    tracing.trace_agent(manager_agent)
+    agent_registry.add_load_hook(tracing.trace_agent)
+
 # Set the root agent
 root_agent = manager_agent
@@ -0,0 +1,98 @@
+"""
+Registry of the manager's sub-agents.
+
+Sub-agent modules (and the tool modules and instruction files they pull in: selenium, PyGithub,
+googleapiclient, jwt, alpaca, ...) are imported on first use instead of when `manager.agent` is
+imported. This module itself must stay cheap to import: no ADK or sub-agent imports at the top level.
+"""
+import importlib
+import threading
+import time
+
+# name -> module defining an attribute of the same name, plus the description the manager LLM sees
+# before the module is loaded (keep in sync with the agent's own description)
+SUB_AGENTS = {
+    "google_agent": {
+        "module": "manager.sub_agents.google_agent.agent",
+        "description": "Automates Gmail, Google Sheets, Calendar, YouTube, and Tasks for messaging, data, scheduling, and media workflows.",
+    },
+    "scraper_agent": {
+        "module": "manager.sub_agents.scraper_agent.agent",
+        "description": "Handles advanced web scraping, crawling, and Google Custom Search using Selenium and custom tools.",
+    },
+    "coding_agent": {
+        "module": "manager.sub_agents.coding_agent.agent",
+        "description": "Handles coding tasks and debugging using LLMs.",
+    },
+    "socialmedia_agent": {
+        "module": "manager.sub_agents.socialmedia_agent.agent",
+        "description": "Handles social media operations, including LinkedIn interactions.",
+    },
+    "coinbase_agent": {
+        "module": "manager.sub_agents.coinbase_agent.agent",
+        "description": "Handles all Coinbase Advanced Trade operations, including account info, market data, and trading.",
+    },
+    "stock_agent": {
+        "module": "manager.sub_agents.stock_agent.agent",
+        "description": "Handles stock trading operations with the Alpaca API.",
+    },
+}
+
+_loaded = {}
+_load_seconds = {}
+_load_hooks = []
+_lock = threading.RLock()
+
+
+def is_loaded(name: str) -> bool:
+    return name in _loaded
+
+
+def get_loaded(name: str):
+    """Returns the sub-agent if it has been loaded already, otherwise None (never triggers a load)."""
+    return _loaded.get(name)
+
+
+def load_sub_agent(name: str):
+    """
+    Imports the sub-agent's module (once) and returns the agent instance.
+    Registered load hooks run on the agent before it is returned for the first time.
+    """
+    agent = _loaded.get(name)
+    if agent is not None:
+        return agent
+    with _lock:
+        agent = _loaded.get(name)
+        if agent is None:
+            started = time.perf_counter()
+            module = importlib.import_module(SUB_AGENTS[name]["module"])
+            agent = getattr(module, name)
+            for hook in _load_hooks:
+                hook(agent)
+            _load_seconds[name] = time.perf_counter() - started
+            _loaded[name] = agent
+    return agent
+
+
+def add_load_hook(hook) -> None:
+    """Registers `hook(agent)` to run on every sub-agent when it loads (and on those already loaded)."""
+    with _lock:
+        _load_hooks.append(hook)
+        for agent in _loaded.values():
+            hook(agent)
+
+
+def preload_all() -> None:
+    """Loads every sub-agent now (e.g. in a background warm-up thread)."""
+    for name in SUB_AGENTS:
+        load_sub_agent(name)
+
+
+def load_times() -> dict:
+    """Seconds spent loading each sub-agent loaded so far."""
+    return dict(_load_seconds)
+
+
+def get_manager_agent():
+    """Imports manager.agent on first use and returns the root manager agent."""
+    return importlib.import_module("manager.agent").manager_agent
@@ -0,0 +1,62 @@
+"""
+Google API client construction time, cold and warm.
+
+For each API used by the Google tools, times building a service object:
+  - pinned cold: first google_client.build_service() call (reads and parses the pinned document)
+  - pinned warm: later build_service() calls in the same thread (document already parsed)
+  - library: googleapiclient's build() with its static documents (re-reads and parses every time)
+  - network (with --network): build() fetching the discovery document from Google, which is what
+    older google-api-python-client versions or static_discovery=False do
+
+No credentials are needed; services are built with a dummy API key and no requests are sent
+except the discovery fetches of --network.
+
+Usage:
+    python -m manager.benchmarks.google_service_build --repeat 20 [--network]
+"""
+import argparse
+import statistics
+import time
+
+from googleapiclient.discovery import build
+
+from manager.sub_agents.google_agent.tools import google_client
+
+
+def _time_ms(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def bench(api: str, version: str, repeat: int, network: bool) -> dict:
+    google_client._document_texts.pop((api, version), None)
+    getattr(google_client._local, "documents", {}).pop((api, version), None)
+    result = {"api": f"{api} {version}"}
+    result["pinned_cold_ms"] = _time_ms(lambda: google_client.build_service(api, version, developerKey="bench"))
+    result["pinned_warm_ms"] = statistics.median(
+        _time_ms(lambda: google_client.build_service(api, version, developerKey="bench")) for _ in range(repeat))
+    result["library_ms"] = statistics.median(
+        _time_ms(lambda: build(api, version, developerKey="bench", cache_discovery=False)) for _ in range(repeat))
+    if network:
+        result["network_ms"] = statistics.median(
+            _time_ms(lambda: build(api, version, developerKey="bench", cache_discovery=False, static_discovery=False))
+            for _ in range(min(repeat, 3)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Warm builds per API (median reported)")
+    parser.add_argument("--network", action="store_true", help="Also time build() fetching discovery over the network")
+    args = parser.parse_args()
+
+    columns = ["pinned_cold_ms", "pinned_warm_ms", "library_ms"] + (["network_ms"] if args.network else [])
+    print(f"{'api':<14}" + "".join(f"{c:>16}" for c in columns))
+    for api, version in google_client.PINNED_APIS:
+        result = bench(api, version, args.repeat, args.network)
+        print(f"{result['api']:<14}" + "".join(f"{result[c]:>16.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Open-loop load test for /api/chat.
+
+Starts `manager.server:app` with the fake LLM backend (no Gemini calls; see manager.utils.fake_llm),
+sends requests at a fixed arrival rate regardless of how fast responses come back, and reports
+latency percentiles, error rate, and CPU / memory use of each server worker (read from /proc).
+
+Usage:
+    python -m manager.benchmarks.load_test --rps 20 --duration 30 --workers 2
+    python -m manager.benchmarks.load_test --url http://127.0.0.1:3001 --server-pid 1234
+
+--real-llm keeps LLM_BACKEND unset so the server calls Gemini (consumes quota).
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+
+from manager.benchmarks.worker_scaling import PROJECT_ROOT, _percentile, start_server, wait_until_healthy
+
+DEFAULT_MESSAGES = ["hello", "What's on my calendar today?", "Please summarize the docs"]
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _read_proc(pid: int):
+    """Returns (cpu_seconds, rss_bytes) for a process, or None if it has exited."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (FileNotFoundError, ProcessLookupError, IndexError):
+        return None
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat (12 and 13 after the command name)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def find_workers(server_pid: int) -> list:
+    """Uvicorn worker processes: spawned children of the server, or the server itself with one worker."""
+    workers = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        if ppid == server_pid and b"spawn_main" in cmdline:
+            workers.append(int(entry))
+    return sorted(workers) or [server_pid]
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU time and RSS of the given processes until stopped."""
+
+    def __init__(self, pids: list, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.samples = {pid: [] for pid in pids}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for pid in self.pids:
+                sample = _read_proc(pid)
+                if sample:
+                    self.samples[pid].append((time.monotonic(), *sample))
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> dict:
+        """Stops sampling. Returns {pid: {"cpu_percent", "rss_mb_mean", "rss_mb_max"}}."""
+        self._stop_event.set()
+        self.join()
+        report = {}
+        for pid, samples in self.samples.items():
+            if len(samples) < 2:
+                continue
+            (t0, cpu0, _), (t1, cpu1, _) = samples[0], samples[-1]
+            rss = [s[2] / 2**20 for s in samples]
+            report[pid] = {
+                "cpu_percent": 100 * (cpu1 - cpu0) / (t1 - t0),
+                "rss_mb_mean": sum(rss) / len(rss),
+                "rss_mb_max": max(rss),
+            }
+        return report
+
+
+async def drive(url: str, rps: float, duration: float, messages: list, conversations: int, timeout: float) -> dict:
+    """Sends requests at `rps` for `duration` seconds (open loop) and waits for all of them."""
+    latencies, errors, statuses = [], 0, {}
+    total = int(rps * duration)
+    conversation_ids = itertools.cycle(range(conversations))
+
+    async def one(http, i):
+        nonlocal errors
+        conv = next(conversation_ids)
+        started = time.perf_counter()
+        try:
+            resp = await http.post(f"{url}/api/chat", json={
+                "message": messages[i % len(messages)],
+                "context": {"user_id": f"load-{conv}", "conversation_id": f"load-{conv}"},
+            })
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+            if resp.status_code != 200 or resp.json().get("reply", "").startswith("[ERROR]"):
+                errors += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as http:
+        started = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            # Fixed schedule: a slow server doesn't slow down arrivals
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(http, i)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "throughput": total / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "error_rate": errors / total if total else 0.0,
+        "statuses": statuses,
+    }
+
+
+def print_report(result: dict, resources: dict) -> None:
+    print(f"requests    {result['requests']}  ({result['throughput']:.1f} completed/s)")
+    print(f"latency     p50 {result['p50_ms']:.0f} ms   p95 {result['p95_ms']:.0f} ms   p99 {result['p99_ms']:.0f} ms")
+    print(f"error rate  {result['error_rate']:.2%}   statuses {result['statuses']}")
+    if resources:
+        print(f"{'worker pid':>10} {'cpu %':>7} {'rss mean MB':>12} {'rss max MB':>11}")
+        for pid, usage in resources.items():
+            print(f"{pid:>10} {usage['cpu_percent']:>7.1f} {usage['rss_mb_mean']:>12.1f} {usage['rss_mb_max']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=10, help="target arrival rate (requests/second)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=3102)
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="with --url: server process to sample CPU/memory from")
+    parser.add_argument("--message", action="append", help="message to send (repeatable, sent round-robin)")
+    parser.add_argument("--conversations", type=int, default=50, help="distinct conversations to spread requests over")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="FAKE_LLM_LATENCY_MS for the started server")
+    parser.add_argument("--real-llm", action="store_true", help="don't use the fake LLM backend")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the started server")
+    args = parser.parse_args()
+    messages = args.message or DEFAULT_MESSAGES
+
+    server = None
+    extra_env = {}
+    if not args.real_llm:
+        extra_env.update(
+            LLM_BACKEND="fake",
+            FAKE_LLM_SCRIPT=os.path.join(PROJECT_ROOT, "manager", "benchmarks", "fake_llm_script.json"),
+            FAKE_LLM_LATENCY_MS=str(args.llm_latency_ms),
+        )
+    extra_env.update(item.split("=", 1) for item in args.env)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        if args.url:
+            url, server_pid = args.url.rstrip("/"), args.server_pid
+        else:
+            server = start_server(args.workers, args.port, extra_env, data_dir)
+            url, server_pid = f"http://127.0.0.1:{args.port}", server.pid
+        try:
+            if server:
+                wait_until_healthy(args.port)
+            # The agent tree loads lazily; keep that out of the measured latencies
+            httpx.post(f"{url}/api/chat", json={"message": messages[0], "context": {"user_id": "load-warmup"}},
+                       timeout=args.timeout)
+            sampler = ResourceSampler(find_workers(server_pid)) if server_pid else None
+            if sampler:
+                sampler.start()
+            result = asyncio.run(drive(url, args.rps, args.duration, messages, args.conversations, args.timeout))
+            resources = sampler.stop() if sampler else {}
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+    print_report(result, resources)
+
+
+if __name__ == "__main__":
+    main()
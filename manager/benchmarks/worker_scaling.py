@@ -0,0 +1,118 @@
+"""
+Chat throughput as the number of uvicorn workers grows.
+
+For each worker count, starts `manager.server:app` with a shared SQLite session store, drives
+/api/chat with a fixed number of concurrent clients, and reports requests/second and latency.
+
+Usage:
+    python -m manager.benchmarks.worker_scaling --max-workers 4 --requests 200 --concurrency 32
+
+Extra server environment can be passed with --env KEY=VALUE (repeatable), e.g. --env LLM_BACKEND=fake
+to run offline (see manager.utils.fake_llm). Otherwise the server talks to the real Gemini API, so
+results include model latency and consume quota.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def start_server(workers: int, port: int, extra_env: dict, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ, SESSION_BACKEND="sqlite", LENOAI_DATA_DIR=data_dir, **extra_env)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "manager.server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+
+
+def wait_until_healthy(port: int, timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/healthz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server on port {port} did not become healthy within {timeout}s")
+
+
+async def drive(port: int, total: int, concurrency: int, message: str) -> dict:
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def client(client_id: int):
+        nonlocal errors
+        async with httpx.AsyncClient(timeout=300) as http:
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    resp = await http.post(
+                        f"http://127.0.0.1:{port}/api/chat",
+                        json={"message": message, "context": {"user_id": f"bench-{client_id}", "conversation_id": f"bench-{client_id}"}},
+                    )
+                    if resp.status_code != 200 or resp.json().get("reply", "").startswith("[ERROR]"):
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": total / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=3101)
+    parser.add_argument("--message", default="What's on my calendar today?")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the server")
+    args = parser.parse_args()
+    extra_env = dict(item.split("=", 1) for item in args.env)
+
+    print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'errors':>6}")
+    for workers in range(1, args.max_workers + 1):
+        with tempfile.TemporaryDirectory() as data_dir:
+            server = start_server(workers, args.port, extra_env, data_dir)
+            try:
+                wait_until_healthy(args.port)
+                result = asyncio.run(drive(args.port, args.requests, args.concurrency, args.message))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        print(f"{workers:>7} {result['rps']:>8.1f} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+              f"{result['mean_ms']:>8.0f} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import time
 import logging
 from dotenv import load_dotenv
 import gspread
+from gspread.utils import rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
 from sub_agents.scraper_agent.scraper_tool import scrape_linkedin_profile
 
@@ -13,6 +14,8 @@ SHEET_TAB = 'Sheet1'
 LINKEDIN_COL = 'LinkedIn Profile'
 EMAIL_COL = 'Email Address'
 PHONE_COL = 'Phone Number'
+# Cell updates are sent together with one batch_update (the Sheets API allows 60 write requests per minute)
+UPDATE_BATCH_SIZE = 20
 
 # Path to your Google service account credentials JSON
 GOOGLE_CREDS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'client.json')
@@ -28,36 +31,54 @@ sh = gc.open_by_key(SHEET_ID)
 worksheet = sh.worksheet(SHEET_TAB)
 
 # --- GET ALL ROWS ---
-rows = worksheet.get_all_records()
-headers = worksheet.row_values(1)
+# One values download; headers and records are both derived from it
+values = worksheet.get_all_values()
+headers = values[0] if values else []
+rows = [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in values[1:]]
 
 # Find column indices
 linkedin_idx = headers.index(LINKEDIN_COL)
 email_idx = headers.index(EMAIL_COL)
 phone_idx = headers.index(PHONE_COL)
 
+pending_updates = []
+
+
+def flush_updates():
+    if pending_updates:
+        worksheet.batch_update(pending_updates)
+        print(f"  → Wrote {len(pending_updates)} cells")
+        pending_updates.clear()
+
+
 # --- SCRAPE AND UPDATE ---
-for i, row in enumerate(rows, start=2):  # start=2 because row 1 is headers
-    profile_url = row.get(LINKEDIN_COL, '').strip()
-    if not profile_url or not profile_url.startswith('http'):
-        continue
-    print(f"Scraping ({i}): {profile_url}")
-    result = scrape_linkedin_profile(profile_url)
-    if result['status'] == 'success':
-        profile = result['profile']
-        email = profile.get('email', '')
-        phone = profile.get('phone', '')
-        # Only update if new info is found
-        updates = []
-        if email and not row.get(EMAIL_COL):
-            worksheet.update_cell(i, email_idx + 1, email)
-            updates.append('email')
-        if phone and not row.get(PHONE_COL):
-            worksheet.update_cell(i, phone_idx + 1, phone)
-            updates.append('phone')
-        print(f"  → Updated: {', '.join(updates) if updates else 'No new info'}")
-    else:
-        print(f"  → Error: {result['message']}")
-    time.sleep(5)  # Delay to avoid being blocked by LinkedIn
+try:
+    for i, row in enumerate(rows, start=2):  # start=2 because row 1 is headers
+        profile_url = row.get(LINKEDIN_COL, '').strip()
+        if not profile_url or not profile_url.startswith('http'):
+            continue
+        print(f"Scraping ({i}): {profile_url}")
+        result = scrape_linkedin_profile(profile_url)
+        if result['status'] == 'success':
+            profile = result['profile']
+            email = profile.get('email', '')
+            phone = profile.get('phone', '')
+            # Only update if new info is found
+            updates = []
+            if email and not row.get(EMAIL_COL):
+                pending_updates.append({'range': rowcol_to_a1(i, email_idx + 1), 'values': [[email]]})
+                updates.append('email')
+            if phone and not row.get(PHONE_COL):
+                pending_updates.append({'range': rowcol_to_a1(i, phone_idx + 1), 'values': [[phone]]})
+                updates.append('phone')
+            print(f"  → Queued: {', '.join(updates) if updates else 'No new info'}")
+            if len(pending_updates) >= UPDATE_BATCH_SIZE:
+                flush_updates()
+        else:
+            print(f"  → Error: {result['message']}")
+        time.sleep(5)  # Delay to avoid being blocked by LinkedIn
+finally:
+    # Also runs on errors or Ctrl+C, so scraped contact info is not lost
+    flush_updates()
 
 print("Done scraping all recruiter profiles!")
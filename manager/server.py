@@ -2,11 +2,25 @@ import os
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), "../.env"))
 
+import asyncio
 import logging
-from fastapi import FastAPI, Request
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from manager.agent import manager_agent  # Ensure this import points to your main agent instance
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from manager import agent_registry
+from manager.utils.session_registry import DEFAULT_USER_ID, DEFAULT_CONVERSATION_ID
+from manager.utils.stream_events import format_sse
+from manager.utils.task_history import TaskHistoryStore
+from manager.utils.data_dir import data_path
+from manager.utils.fast_router import get_fast_router
+from manager.utils.admission import AdmissionController, AdmissionRejected
+from manager.utils import jobs
+from manager.utils import metrics
+from manager.utils import tracing
+import threading
 import uvicorn
 from datetime import datetime
 
@@ -22,11 +36,24 @@ logger = logging.getLogger(__name__)
 # Define a simple message schema
 class ChatRequest(BaseModel):
     message: str
-    context: dict = None  # Optional, for future extensibility
+    context: dict = None  # Optional: {"user_id": ..., "conversation_id": ...} plus any extra client data
+
+    @property
+    def user_id(self) -> str:
+        return str((self.context or {}).get("user_id") or DEFAULT_USER_ID)
+
+    @property
+    def conversation_id(self) -> str:
+        return str((self.context or {}).get("conversation_id") or DEFAULT_CONVERSATION_ID)
 
 class ChatResponse(BaseModel):
     reply: str
 
+class JobRequest(BaseModel):
+    kind: str  # one of manager.utils.jobs.JOB_KINDS, e.g. "crawl"
+    params: dict = {}
+    context: dict = None  # Optional: {"user_id": ...}
+
 
 # ---
 # Initialize FastAPI app
@@ -49,44 +76,321 @@ app.add_middleware(
 # ---
 # Main chat endpoint
 # ---
-# In-memory task history store
-# Each entry: {user, request, response, timestamp, status}
-task_history = []
+# Persistent task history store (SQLite, batched writes off the request path)
+# Each entry: {id, user, request, response, timestamp, status}
+task_history = TaskHistoryStore(
+    os.getenv("TASK_HISTORY_DB") or data_path("task_history.db"),
+    max_rows=int(os.getenv("TASK_HISTORY_MAX_ROWS", "1000000")),
+)
+
+# ---
+# The agent tree (ADK plus sub-agents) loads lazily: /api/healthz answers immediately and the first
+# chat request waits only for whatever hasn't been loaded yet.
+# Set once the agent tree is fully imported. Checking sys.modules is not enough: the module is
+# listed there while the warm-up thread is still importing it, and importing it again from the
+# event loop would block on the import lock.
+_agent_ready = threading.Event()
+
+async def get_manager_agent():
+    if _agent_ready.is_set():
+        return agent_registry.get_manager_agent()
+    agent = await asyncio.to_thread(agent_registry.get_manager_agent)
+    _agent_ready.set()
+    return agent
+
+def _warm_up():
+    try:
+        agent_registry.get_manager_agent()
+        _agent_ready.set()
+        if os.getenv("PRELOAD_SUB_AGENTS", "false").lower() == "true":
+            agent_registry.preload_all()
+    except Exception:
+        logger.exception("Agent warm-up failed; loading will be retried on the first request")
+
+@app.on_event("startup")
+def start_warm_up():
+    threading.Thread(target=_warm_up, name="agent-warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+def close_task_history():
+    # Write out entries still waiting in the ring buffer
+    task_history.close()
+
+def _record_task(request: ChatRequest, response: str, status: str):
+    task_history.append({
+        "user": request.user_id,
+        "request": request.message,
+        "response": response,
+        "timestamp": datetime.utcnow().isoformat(),
+        "status": status
+    })
+
+# ---
+# Admission control: bounded concurrency and queueing per worker; overload gets a fast 429/503
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT") or os.getenv("MANAGER_MAX_CONCURRENCY", "8")),
+    max_per_user=int(os.getenv("ADMISSION_MAX_PER_USER", "4")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+    max_wait_seconds=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10")),
+)
+
+metrics.register_gauge("lenoai_admission_running", "Turns currently running in this worker.", lambda: admission.stats()["running"])
+metrics.register_gauge("lenoai_admission_queued", "Turns waiting for a slot in this worker.", lambda: admission.stats()["queued"])
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    logger.warning(f"Rejected {request.url.path} ({exc.reason}), retry after {exc.retry_after}s")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "reason": exc.reason, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response that gives the admission slot back however the response ends."""
+
+    def __init__(self, ticket, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     logger.debug(f"Received chat request: message={request.message!r}, context={request.context!r}")
+    async with admission.admit(request.user_id):
+        return await _chat_turn(request)
+
+async def _chat_turn(request: ChatRequest) -> ChatResponse:
     try:
-        reply = manager_agent.handle_message(request.message)
+        # Async path: the turn runs on the ADK async runner, so other requests keep being served
+        manager_agent = await get_manager_agent()
+        reply = await manager_agent.handle_message_async(
+            request.message, user_id=request.user_id, conversation_id=request.conversation_id
+        )
         logger.debug(f"Agent reply: {reply!r}")
         # Store in task history
-        task_history.append({
-            "user": "user_1",  # Replace with real user if available
-            "request": request.message,
-            "response": reply,
-            "timestamp": datetime.utcnow().isoformat(),
-            "status": "completed"
-        })
+        _record_task(request, reply, "completed")
         return ChatResponse(reply=reply)
     except Exception as e:
         logger.exception("Error processing chat request")
         # Store error in task history
-        task_history.append({
-            "user": "user_1",
-            "request": request.message,
-            "response": f"[ERROR] {str(e)}",
-            "timestamp": datetime.utcnow().isoformat(),
-            "status": "error"
-        })
+        _record_task(request, f"[ERROR] {str(e)}", "error")
         return ChatResponse(reply=f"[ERROR] {str(e)}")
 
 # ---
-# Task history endpoint
-from fastapi.responses import JSONResponse
+# Streaming chat endpoints: forward runner events (partial text, tool calls, transfers) as they happen
+async def _stream_turn(request: ChatRequest):
+    """Yields stream messages for one turn and records it in task history however it ends."""
+    logger.debug(f"Received streaming chat request: message={request.message!r}, context={request.context!r}")
+    manager_agent = await get_manager_agent()
+    stream = manager_agent.stream_message(
+        request.message, user_id=request.user_id, conversation_id=request.conversation_id
+    )
+    # Stays "cancelled" unless the turn runs to completion or fails
+    reply, status = "[CANCELLED]", "cancelled"
+    try:
+        async for item in stream:
+            if item["type"] == "done":
+                reply, status = item["reply"], "completed"
+            yield item
+    except Exception as e:
+        logger.exception("Error processing streaming chat request")
+        reply, status = f"[ERROR] {str(e)}", "error"
+        yield {"type": "error", "message": str(e)}
+    finally:
+        await stream.aclose()
+        _record_task(request, reply, status)
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Server-Sent Events stream of one turn. Closing the connection cancels the turn
+    (Starlette cancels the response task on client disconnect).
+    Admission is decided before the stream starts, so overload is a plain 429/503 response.
+    """
+    ticket = await admission.acquire(request.user_id)
+
+    async def event_source():
+        async for item in _stream_turn(request):
+            yield format_sse(item)
+    return AdmittedStreamingResponse(
+        ticket,
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
+@app.websocket("/api/chat/stream/ws")
+async def chat_stream_websocket(websocket: WebSocket):
+    """
+    WebSocket variant. Client sends {"message": ..., "context": {...}} to start a turn and
+    {"type": "cancel"} to stop the running one; one turn runs at a time per connection.
+    """
+    await websocket.accept()
+    turn = None
+
+    async def run_turn(request: ChatRequest):
+        try:
+            async with admission.admit(request.user_id):
+                async for item in _stream_turn(request):
+                    await websocket.send_json(jsonable_encoder(item))
+        except AdmissionRejected as e:
+            await websocket.send_json({"type": "error", "message": str(e), "reason": e.reason, "retry_after": e.retry_after})
+        except asyncio.CancelledError:
+            try:
+                await websocket.send_json({"type": "cancelled"})
+            except Exception:
+                pass
+            raise
+
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "message": f"Invalid JSON: {e}"})
+                continue
+            if not isinstance(data, dict):
+                await websocket.send_json({"type": "error", "message": "Expected a JSON object."})
+                continue
+            if data.get("type") == "cancel":
+                if turn and not turn.done():
+                    turn.cancel()
+                continue
+            if turn and not turn.done():
+                await websocket.send_json({"type": "error", "message": "A turn is already running; cancel it first."})
+                continue
+            try:
+                request = ChatRequest(**data)
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "message": str(e)})
+                continue
+            turn = asyncio.create_task(run_turn(request))
+    except WebSocketDisconnect:
+        logger.debug("Streaming chat websocket disconnected")
+    finally:
+        if turn and not turn.done():
+            turn.cancel()
+
+# ---
+# Task history endpoint
 @app.get("/api/task_history")
-async def get_task_history():
-    return JSONResponse(content=task_history)
+def get_task_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    status: Optional[str] = None,
+    user: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO 8601 timestamp, inclusive"),
+    until: Optional[str] = Query(None, description="ISO 8601 timestamp, exclusive"),
+):
+    """Newest-first page of task history: {"items": [...], "next_cursor": ...}."""
+    try:
+        return task_history.query(limit=limit, cursor=cursor, status=status, user=user, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid since/until: {e}")
+
+# ---
+# Fast-path router statistics (share of turns that skipped the manager LLM hop)
+@app.get("/api/router/stats")
+def router_stats():
+    router = get_fast_router()
+    if router is None:
+        return {"enabled": False}
+    return dict(router.stats(), enabled=True)
+
+# ---
+# Background jobs: long tool work (crawls, scrapes, uploads) runs on the job worker pool, so
+# these requests return immediately; follow a job by polling or via its SSE event stream.
+JOB_EVENTS_POLL_SECONDS = 0.5
+
+@app.post("/api/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    user = str((request.context or {}).get("user_id") or DEFAULT_USER_ID)
+    try:
+        return jobs.get_job_manager().submit(request.kind, request.params, user=user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/jobs")
+def list_jobs(user: Optional[str] = None, status: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    return {"items": jobs.get_job_manager().list(user=user, status=status, limit=limit)}
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID {job_id}")
+    return job
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Requests cancellation; running jobs stop at their next progress check."""
+    job = jobs.get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID {job_id}")
+    return job
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-Sent Events: a "job" message with the full record whenever it changes, ending once the
+    job finishes. Reads the shared job store, so it works whichever worker runs the job.
+    """
+    manager = await asyncio.to_thread(jobs.get_job_manager)
+    job = await asyncio.to_thread(manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID {job_id}")
+
+    async def event_source(job):
+        last_update = None
+        while True:
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                yield format_sse(dict(job, type="job"))
+            if job["status"] in jobs.TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            job = await asyncio.to_thread(manager.get, job_id)
+    return StreamingResponse(
+        event_source(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.on_event("shutdown")
+def stop_jobs():
+    jobs.shutdown_job_manager()
+
+# ---
+# Admission queue metrics (running/queued turns, rejections, wait-time percentiles)
+@app.get("/api/admission/stats")
+async def admission_stats():
+    return admission.stats()
+
+# ---
+# Prometheus metrics for this worker: tool/model/turn latency histograms, call and error counts, transfers
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ---
+# Recent turn traces (newest first); min_duration_ms filters for slow turns
+@app.get("/api/traces")
+def list_traces(limit: int = Query(50, ge=1, le=500), min_duration_ms: float = Query(0, ge=0)):
+    return {"traces": tracing.store.list(limit=limit, min_duration_ms=min_duration_ms)}
+
+# One trace with all spans, as JSON or as an OTLP/JSON export request
+@app.get("/api/traces/{trace_id}")
+def get_trace(trace_id: str, format: str = Query("json", pattern="^(json|otlp)$")):
+    trace = tracing.store.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace with ID {trace_id}")
+    return tracing.to_otlp([trace]) if format == "otlp" else trace
 
 # ---
 # Health check endpoint
@@ -99,7 +403,12 @@ def health_check():
 if __name__ == "__main__":
     print("[INFO] Starting FastAPI server on http://0.0.0.0:3001 ...")
     logger.info("Starting FastAPI server on http://0.0.0.0:3001 ...")
+    # Several workers need a shared session store (SESSION_BACKEND=sqlite); auto-reload only works with one
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
+    if workers > 1 and os.getenv("SESSION_BACKEND", "memory").lower() == "memory":
+        logger.warning("UVICORN_WORKERS > 1 with in-memory sessions: conversations will not be shared between workers. Set SESSION_BACKEND=sqlite.")
+    reload = workers == 1 and os.getenv("UVICORN_RELOAD", "true").lower() == "true"
     try:
-        uvicorn.run("manager.server:app", host="0.0.0.0", port=3001, reload=True)
+        uvicorn.run("manager.server:app", host="0.0.0.0", port=3001, reload=reload, workers=workers)
     finally:
         print("[INFO] FastAPI server is running and ready to accept requests at http://localhost:3001")
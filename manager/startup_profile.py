@@ -0,0 +1,76 @@
+"""
+Startup import-time report.
+
+Measures, each in a fresh interpreter (`python -X importtime`):
+  - manager.server   what uvicorn imports before /api/healthz can answer
+  - manager.agent    the manager agent with its lazy sub-agent placeholders
+then loads every registered sub-agent in-process and reports what each one costs on first use.
+
+Usage:
+    python -m manager.startup_profile [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def profile_import(module: str) -> dict:
+    """Imports `module` in a fresh interpreter. Returns wall time and cumulative time per top-level import."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=PROJECT_ROOT),
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.rstrip()
+        # Indentation is nesting depth; keep the packages imported directly (depth 0 or 1)
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            cumulative[name.strip()] = int(cumulative_us) / 1e6
+    return {"wall_seconds": wall, "cumulative": cumulative}
+
+
+def profile_sub_agents() -> dict:
+    """Loads the manager agent, then each sub-agent in registry order. Returns seconds per step."""
+    from manager import agent_registry
+    started = time.perf_counter()
+    agent_registry.get_manager_agent()
+    timings = {"manager.agent": time.perf_counter() - started}
+    for name in agent_registry.SUB_AGENTS:
+        agent_registry.load_sub_agent(name)
+    timings.update(agent_registry.load_times())
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list per module")
+    args = parser.parse_args()
+
+    for module in ("manager.server", "manager.agent"):
+        result = profile_import(module)
+        print(f"\n== import {module}: {result['wall_seconds']:.2f}s wall (interpreter start included)")
+        slowest = sorted(result["cumulative"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, seconds in slowest:
+            print(f"  {seconds:8.3f}s  {name}")
+
+    print("\n== first-use load, in process (after manager.agent)")
+    for name, seconds in profile_sub_agents().items():
+        print(f"  {seconds:8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
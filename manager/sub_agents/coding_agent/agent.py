@@ -1,4 +1,5 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
 from .utils.instructions_loader import load_instructions_from_file
 from .tools.github_tool import (
@@ -17,7 +18,7 @@ load_dotenv(os.path.join(os.path.dirname(__file__), "../../../.env"))
 
 coding_agent = LlmAgent(
     name="coding_agent",
-    model="gemini-2.0-pro",
+    model=resolve_model("gemini-2.0-pro", "coding_agent"),
     description="Handles coding tasks and debugging using LLMs.",
     instruction=load_instructions_from_file("CODING_AGENT_INSTRUCTIONS.md"),
     sub_agents=[],
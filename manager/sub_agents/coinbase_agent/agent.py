@@ -1,4 +1,5 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
 from .utils.instructions_loader import load_instructions_from_file
 
@@ -16,7 +17,7 @@ from .tools.coinbase_tools import (
 
 coinbase_agent = LlmAgent(
     name="coinbase_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "coinbase_agent"),
     description="Handles all Coinbase Advanced Trade operations, including account info, market data, and trading.",
     instruction=load_instructions_from_file("COINBASE_AGENT_INSTRUCTIONS.md"),
     tools=[
@@ -0,0 +1,17 @@
+
+from google.adk.agents.llm_agent import LlmAgent
+from .tools.demo_tool import demo_action
+
+demo_agent = LlmAgent(
+    name="demo_agent",
+    model="gemini-1.5-pro",
+    description="Demo sub-agent created by workflow.",
+    instruction="""
+You are a demo agent. Use your tools to perform demo actions.
+SAFE EDIT POLICY:
+- Only add or append new code for new features.
+- Never remove or replace existing code unless specifically asked.
+- NEVER update manager/agent.py (the user will handle this).
+""",
+    tools=[demo_action]
+)
@@ -0,0 +1,3 @@
+def demo_action(param: str) -> dict:
+    """Demo tool for the new sub-agent."""
+    return {"status": "success", "result": f'Demo action with {param}'}
@@ -1,15 +1,22 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
-from .tools.gmail_tools import send_gmail, get_recent_emails, get_unread_emails, delete_email, reply_to_email, get_many_emails
-from .tools.sheets_tools import read_sheet, write_sheet, append_sheet, list_sheets, describe_sheet, extract_and_log_order_receipts
+from .tools.gmail_tools import send_gmail, send_bulk_gmail, start_bulk_gmail_job, get_recent_emails, get_unread_emails, delete_email, reply_to_email, get_many_emails, get_emails_page
+from .tools.gmail_attachments import get_email_body, download_email_attachments, save_email_attachment_artifact
+from .tools.sheets_tools import read_sheet, write_sheet, append_sheet, list_sheets, describe_sheet
+from .tools.order_receipts import extract_and_log_order_receipts
+from .tools.sheets_writes import write_sheet_cells
+from .tools.sheets_stream import read_sheet_page
+from .tools.sheets_index import find_sheet
 from .tools.youtube_tools import (
-    youtube_search_afc, youtube_get_channel_info_afc, youtube_list_playlists_afc, youtube_upload_video_afc, youtube_update_video_afc, youtube_delete_video_afc, youtube_comment_video_afc, youtube_rate_video_afc, youtube_subscribe_channel_afc, youtube_unsubscribe_channel_afc,
+    youtube_search_afc, youtube_get_channel_info_afc, youtube_list_playlists_afc, youtube_upload_video_afc, youtube_upload_video_job_afc, youtube_update_video_afc, youtube_delete_video_afc, youtube_comment_video_afc, youtube_rate_video_afc, youtube_subscribe_channel_afc, youtube_unsubscribe_channel_afc,
     youtube_comment_video_by_name_afc, youtube_rate_video_by_name_afc, youtube_update_video_by_name_afc, youtube_delete_video_by_name_afc, youtube_subscribe_channel_by_name_afc, youtube_get_channel_info_by_name_afc, youtube_list_playlists_by_channel_name_afc, youtube_get_playlist_id_by_title_afc
 )
 from .tools.calendar_tools import (
     list_upcoming_events, create_event, update_event, delete_event, get_event_details
 )
 from .utils.instructions_loader import load_instructions_from_file
+from manager.utils.jobs import get_job_status, cancel_job
 
 
 load_dotenv("../.env")
@@ -17,7 +24,7 @@ load_dotenv("../.env")
 # --- Register the Google Agent ---
 google_agent = LlmAgent(
     name="google_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "google_agent"),
     description="Automates Gmail, Google Sheets, Calendar, YouTube, and Tasks for messaging, data, scheduling, and media workflows.",
     # Load both Google Agent and YouTube tool instructions
     instruction=(
@@ -26,11 +33,13 @@ google_agent = LlmAgent(
         load_instructions_from_file("CALENDAR_TOOL_INSTRUCTIONS.md")
     ),
     tools=[
-        send_gmail, get_recent_emails, get_unread_emails, delete_email, reply_to_email, get_many_emails,
-        read_sheet, write_sheet, append_sheet, list_sheets, describe_sheet, extract_and_log_order_receipts,
-        youtube_search_afc, youtube_get_channel_info_afc, youtube_list_playlists_afc, youtube_upload_video_afc, youtube_update_video_afc, youtube_delete_video_afc, youtube_comment_video_afc, youtube_rate_video_afc, youtube_subscribe_channel_afc, youtube_unsubscribe_channel_afc,
+        send_gmail, send_bulk_gmail, start_bulk_gmail_job, get_recent_emails, get_unread_emails, delete_email, reply_to_email, get_many_emails, get_emails_page,
+        get_email_body, download_email_attachments, save_email_attachment_artifact,
+        read_sheet, read_sheet_page, write_sheet, append_sheet, write_sheet_cells, list_sheets, find_sheet, describe_sheet, extract_and_log_order_receipts,
+        youtube_search_afc, youtube_get_channel_info_afc, youtube_list_playlists_afc, youtube_upload_video_afc, youtube_upload_video_job_afc, youtube_update_video_afc, youtube_delete_video_afc, youtube_comment_video_afc, youtube_rate_video_afc, youtube_subscribe_channel_afc, youtube_unsubscribe_channel_afc,
         youtube_comment_video_by_name_afc, youtube_rate_video_by_name_afc, youtube_update_video_by_name_afc, youtube_delete_video_by_name_afc, youtube_subscribe_channel_by_name_afc, youtube_get_channel_info_by_name_afc, youtube_list_playlists_by_channel_name_afc, youtube_get_playlist_id_by_title_afc,
-        list_upcoming_events, create_event, update_event, delete_event, get_event_details
+        list_upcoming_events, create_event, update_event, delete_event, get_event_details,
+        get_job_status, cancel_job
     ],
 )
 
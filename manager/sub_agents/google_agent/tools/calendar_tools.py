@@ -1,24 +1,13 @@
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
+from manager.sub_agents.google_agent.tools.google_client import get_service
 
 CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
 def get_calendar_service():
     """Get the Google Calendar API service using stored credentials."""
-    import os
-    creds = None
-    # Always look for token.json in the google_agent directory
-    token_path = os.path.join(os.path.dirname(__file__), "../token.json")
-    token_path = os.path.abspath(token_path)
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, CALENDAR_SCOPES)
-    else:
-        raise Exception(f"token.json not found at {token_path}. Please complete OAuth2 flow for Google Calendar API.")
-    service = build("calendar", "v3", credentials=creds)
-    return service
+    return get_service("calendar", "v3", CALENDAR_SCOPES)
 
 def list_upcoming_events(calendar_id: str = 'primary', max_results: int = 10) -> List[Dict[str, Any]]:
     """
@@ -0,0 +1,237 @@
+"""
+Full message bodies and attachments for Gmail messages.
+
+Messages are fetched in `full` format, which carries the MIME part tree and inline bodies of
+small parts; attachments are referenced by ID. Attachments are downloaded with a streamed
+request and decoded from base64url chunk by chunk straight into a file, so memory use does not
+depend on attachment size.
+"""
+import base64
+import io
+import os
+import re
+import tempfile
+from google.auth.transport.requests import AuthorizedSession
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+from manager.utils.async_tools import run_in_tool_thread
+from manager.utils.data_dir import data_path
+from manager.sub_agents.google_agent.tools.google_client import get_credentials
+from manager.sub_agents.google_agent.tools.gmail_tools import GMAIL_SCOPES, get_gmail_service
+
+GMAIL_API = "https://gmail.googleapis.com/gmail/v1/users/me"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Longest body text returned to the agent
+MAX_BODY_CHARS = 20000
+# ADK artifacts are saved from an in-memory Part, so larger attachments can only go to disk
+ARTIFACT_MAX_BYTES = int(os.getenv("ATTACHMENT_ARTIFACT_MAX_BYTES", str(20 * 1024 * 1024)))
+
+
+class Base64UrlDecoder:
+    """Incremental base64url decoder: feed text in arbitrary pieces, get bytes as soon as whole quads arrive."""
+
+    _IGNORED = re.compile(r"[\s=]")
+
+    def __init__(self):
+        self._pending = ""
+
+    def decode(self, chunk) -> bytes:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("ascii")
+        data = self._pending + self._IGNORED.sub("", chunk)
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return base64.urlsafe_b64decode(data[:usable]) if usable else b""
+
+    def flush(self) -> bytes:
+        """Decodes the trailing partial quad (base64url from Gmail is often unpadded)."""
+        data, self._pending = self._pending, ""
+        if len(data) % 4 == 1:
+            raise ValueError("Truncated base64url data")
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)) if data else b""
+
+
+def iter_json_string_field(chunks, field: str):
+    """
+    Yields the value of the top-level string `field` of a JSON object piece by piece, reading the
+    object from an iterable of byte chunks. Meant for large base64url values, which need no JSON
+    unescaping; the rest of the object is skipped without being kept.
+    """
+    marker = f'"{field}"'.encode()
+    buffer = b""
+    chunks = iter(chunks)
+    # Find `"field"`, then the opening quote of its value
+    for chunk in chunks:
+        buffer += chunk
+        index = buffer.find(marker)
+        if index < 0:
+            buffer = buffer[-len(marker):]
+            continue
+        buffer = buffer[index + len(marker):]
+        while b'"' not in buffer:
+            more = next(chunks, None)
+            if more is None:
+                raise ValueError(f"Malformed JSON: no value for {field}")
+            buffer += more
+        buffer = buffer[buffer.index(b'"') + 1:]
+        break
+    else:
+        raise ValueError(f"Field {field} not found in response")
+    # Stream the value up to the closing quote
+    while True:
+        end = buffer.find(b'"')
+        if end >= 0:
+            if end:
+                yield buffer[:end].decode("ascii")
+            return
+        if buffer:
+            yield buffer.decode("ascii")
+        buffer = next(chunks, None)
+        if buffer is None:
+            raise ValueError(f"Malformed JSON: unterminated value for {field}")
+
+
+def walk_parts(payload: dict, path: str = ""):
+    """Yields every leaf MIME part of a full-format message payload, depth first."""
+    parts = payload.get("parts")
+    if parts:
+        for i, part in enumerate(parts):
+            yield from walk_parts(part, f"{path}.{i}" if path else str(i))
+        return
+    body = payload.get("body", {})
+    headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+    yield {
+        "part_id": payload.get("partId", path),
+        "mime_type": payload.get("mimeType", ""),
+        "filename": payload.get("filename", ""),
+        "size": body.get("size", 0),
+        "attachment_id": body.get("attachmentId"),
+        "data": body.get("data"),
+        "is_attachment": bool(payload.get("filename")) or "attachment" in headers.get("content-disposition", ""),
+    }
+
+
+def _decode_inline(data: str) -> str:
+    decoder = Base64UrlDecoder()
+    raw = decoder.decode(data) + decoder.flush()
+    return raw.decode("utf-8", errors="replace")
+
+
+def _safe_filename(name: str, fallback: str) -> str:
+    name = re.sub(r"[^\w.\- ]", "_", os.path.basename(name or "")).strip(" .")
+    return name or fallback
+
+
+def stream_attachment(message_id: str, attachment_id: str, out, session: AuthorizedSession = None) -> int:
+    """Downloads one attachment into the binary file object `out`, decoding as it streams. Returns bytes written."""
+    session = session or AuthorizedSession(get_credentials(GMAIL_SCOPES))
+    url = f"{GMAIL_API}/messages/{message_id}/attachments/{attachment_id}"
+    with session.get(url, params={"fields": "data"}, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        decoder = Base64UrlDecoder()
+        written = 0
+        for piece in iter_json_string_field(response.iter_content(DOWNLOAD_CHUNK_SIZE), "data"):
+            data = decoder.decode(piece)
+            out.write(data)
+            written += len(data)
+        tail = decoder.flush()
+        out.write(tail)
+        return written + len(tail)
+
+
+def get_email_body(message_id: str) -> dict:
+    """
+    Retrieve the full text of an email and the list of its attachments.
+    - message_id: Gmail message ID (from get_many_emails and similar tools)
+    Returns subject, from, date, body (plain text, or HTML when there is no plain text part) and
+    attachments (filename, mime_type, size, attachment_id).
+    """
+    try:
+        message = get_gmail_service().users().messages().get(userId="me", id=message_id, format="full").execute()
+        payload = message.get("payload", {})
+        headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+        texts, attachments = {}, []
+        for part in walk_parts(payload):
+            if part["is_attachment"] or (part["attachment_id"] and not part["mime_type"].startswith("text/")):
+                attachments.append({k: part[k] for k in ("filename", "mime_type", "size", "attachment_id", "part_id")})
+            elif part["mime_type"] in ("text/plain", "text/html"):
+                if part["data"]:
+                    text = _decode_inline(part["data"])
+                elif part["attachment_id"]:
+                    # Large text bodies are stored like attachments
+                    buffer = io.BytesIO()
+                    stream_attachment(message_id, part["attachment_id"], buffer)
+                    text = buffer.getvalue().decode("utf-8", errors="replace")
+                else:
+                    continue
+                texts.setdefault(part["mime_type"], []).append(text)
+        body = "\n".join(texts.get("text/plain") or texts.get("text/html") or [])
+        result = {
+            "status": "success", "id": message_id, "subject": headers.get("subject", "(No Subject)"),
+            "from": headers.get("from", "(Unknown Sender)"), "date": headers.get("date", ""),
+            "body": body[:MAX_BODY_CHARS], "attachments": attachments,
+        }
+        if len(body) > MAX_BODY_CHARS:
+            result["truncated"] = True
+        return result
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def download_email_attachments(message_id: str, filename_contains: str = "") -> dict:
+    """
+    Download the attachments of an email to the local data directory.
+    - message_id: Gmail message ID
+    - filename_contains: only download attachments whose filename contains this text (case-insensitive)
+    Returns the saved file paths and sizes.
+    """
+    try:
+        message = get_gmail_service().users().messages().get(
+            userId="me", id=message_id, format="full", fields="payload"
+        ).execute()
+        directory = os.path.join(data_path("attachments"), _safe_filename(message_id, "message"))
+        os.makedirs(directory, exist_ok=True)
+        session = AuthorizedSession(get_credentials(GMAIL_SCOPES))
+        saved, used_names = [], set()
+        for part in walk_parts(message.get("payload", {})):
+            if not part["is_attachment"] or filename_contains.lower() not in part["filename"].lower():
+                continue
+            name = _safe_filename(part["filename"], f"part-{part['part_id']}")
+            if name.lower() in used_names:
+                # Same filename twice in one message (e.g. image.png): keep both
+                stem, ext = os.path.splitext(name)
+                name = f"{stem}-part-{part['part_id']}{ext}"
+            used_names.add(name.lower())
+            path = os.path.join(directory, name)
+            with open(path, "wb") as out:
+                if part["attachment_id"]:
+                    size = stream_attachment(message_id, part["attachment_id"], out, session=session)
+                else:
+                    decoder = Base64UrlDecoder()
+                    data = decoder.decode(part["data"] or "") + decoder.flush()
+                    out.write(data)
+                    size = len(data)
+            saved.append({"filename": part["filename"], "path": path, "size": size, "mime_type": part["mime_type"]})
+        return {"status": "success", "attachments": saved}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def save_email_attachment_artifact(message_id: str, attachment_id: str, filename: str, mime_type: str = "application/octet-stream", tool_context: ToolContext = None) -> dict:
+    """
+    Save one email attachment as an artifact of this conversation (for attachments up to
+    ATTACHMENT_ARTIFACT_MAX_BYTES; use download_email_attachments for larger files).
+    - message_id / attachment_id / filename / mime_type: as listed by get_email_body
+    """
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            size = await run_in_tool_thread(stream_attachment, message_id, attachment_id, tmp)
+            if size > ARTIFACT_MAX_BYTES:
+                return {"status": "error", "message": f"Attachment is {size} bytes; artifacts are limited to "
+                                                      f"{ARTIFACT_MAX_BYTES}. Use download_email_attachments instead."}
+            tmp.seek(0)
+            data = tmp.read()
+        version = await tool_context.save_artifact(filename, types.Part.from_bytes(data=data, mime_type=mime_type))
+        return {"status": "success", "filename": filename, "version": version, "size": size}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
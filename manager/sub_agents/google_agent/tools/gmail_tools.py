@@ -1,104 +1,347 @@
 import os
 import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from email.utils import parseaddr
+from googleapiclient.errors import HttpError
+from google.adk.tools.tool_context import ToolContext
+from manager.sub_agents.google_agent.tools.google_client import get_service
+from manager.utils.jobs import get_job_manager, job_handle, job_user
+from manager.utils.rate_limit import TokenBucket, call_with_retry
 from dotenv import load_dotenv
 
 load_dotenv("../.env")
 
-# Assumes you have already completed OAuth2 flow and have a token.json file with user credentials
-# For production, implement a full OAuth2 flow with refresh token handling
+GMAIL_SCOPES = [
+    "https://www.googleapis.com/auth/gmail.readonly",
+    "https://www.googleapis.com/auth/gmail.send"
+]
 
 def get_gmail_service():
-    creds = None
-    SCOPES = [
-        "https://www.googleapis.com/auth/gmail.readonly",
-        "https://www.googleapis.com/auth/gmail.send"
-    ]
-    if os.path.exists("token.json"):
-        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        # Check if the credentials have the required scopes
-        if not creds or not creds.has_scopes(SCOPES):
-            raise Exception(
-                "Your token.json does not have the required Gmail API scopes. "
-                "Please delete token.json and re-run the authentication flow to grant both read and send permissions."
-            )
-    else:
-        raise Exception(
-            "token.json not found. Please complete the OAuth2 flow for Gmail API. "
-            "You must grant both read and send permissions."
-        )
-    service = build("gmail", "v1", credentials=creds)
-    return service
+    """Gmail API client (cached per thread, see google_client)."""
+    return get_service("gmail", "v1", GMAIL_SCOPES)
+
+# Headers the email listing tools return; messages are fetched in metadata format with only these
+EMAIL_HEADERS = ["Subject", "From"]
+# Gmail accepts up to 100 calls per batch but starts rate limiting above ~50
+GMAIL_BATCH_SIZE = 50
+# messages().list page size limit
+LIST_PAGE_SIZE = 500
+
+def _header(headers: list, name: str, default: str) -> str:
+    return next((h["value"] for h in headers if h["name"].lower() == name.lower()), default)
+
+def _parse_email(msg_detail: dict) -> dict:
+    """Summary of a message in metadata (or full) format."""
+    headers = msg_detail.get("payload", {}).get("headers", [])
+    return {
+        "id": msg_detail["id"],
+        "subject": _header(headers, "Subject", "(No Subject)"),
+        "from": _header(headers, "From", "(Unknown Sender)"),
+        "snippet": msg_detail.get("snippet", "")
+    }
+
+def _list_message_ids(service, max_results: int, **filters) -> list:
+    """IDs of up to max_results messages matching the list filters (labelIds, q), newest first."""
+    ids, page_token = [], None
+    while len(ids) < max_results:
+        results = service.users().messages().list(
+            userId="me", maxResults=min(max_results - len(ids), LIST_PAGE_SIZE), pageToken=page_token, **filters
+        ).execute()
+        ids.extend(m["id"] for m in results.get("messages", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return ids[:max_results]
+
+def _fetch_emails(service, message_ids: list, parse=_parse_email, format: str = "metadata") -> dict:
+    """
+    Fetches message summaries with batched metadata-format gets (one HTTP round trip per
+    GMAIL_BATCH_SIZE messages). Calls that fail in a batch (e.g. rate limited) are retried once.
+    `parse` turns each message into the returned entry; format="full" fetches whole messages instead.
+    Messages that could not be fetched are listed under "failed" with the error and its HTTP status.
+    """
+    options = {"metadataHeaders": EMAIL_HEADERS} if format == "metadata" else {}
+    fetched, errors = {}, {}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            fetched[request_id] = parse(response)
+
+    pending = list(dict.fromkeys(message_ids))
+    for attempt in range(2):
+        if attempt:
+            time.sleep(1)
+        errors.clear()
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for message_id in pending[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(
+                    service.users().messages().get(userId="me", id=message_id, format=format, **options),
+                    request_id=message_id
+                )
+            batch.execute()
+        pending = [message_id for message_id in pending if message_id in errors]
+        if not pending:
+            break
+
+    result = {"status": "success", "emails": [fetched[m] for m in message_ids if m in fetched]}
+    if errors:
+        result["failed"] = [{"id": m, "error": str(e), "status": getattr(getattr(e, "resp", None), "status", None)}
+                            for m, e in errors.items()]
+    return result
+
+def _list_emails(max_results: int, **filters) -> dict:
+    try:
+        service = get_gmail_service()
+        return _fetch_emails(service, _list_message_ids(service, max_results, **filters))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def iter_email_pages(page_size: int = 100, page_token: str = None, parse=_parse_email, service_factory=None, **filters):
+    """
+    Yields (emails, next_page_token) for each page of messages matching the list filters (q,
+    labelIds). The next page (list call plus batched metadata fetch) is requested on a background
+    thread while the caller handles the current one, and at most two pages are held at a time,
+    so walking tens of thousands of messages runs in constant memory.
+    """
+    service_factory = service_factory or get_gmail_service
+
+    def fetch(token):
+        # Runs on the prefetch thread, which gets its own service (see google_client)
+        service = service_factory()
+        response = service.users().messages().list(
+            userId="me", maxResults=min(page_size, LIST_PAGE_SIZE), pageToken=token, **filters
+        ).execute()
+        message_ids = [m["id"] for m in response.get("messages", [])]
+        emails = _fetch_emails(service, message_ids, parse)["emails"] if message_ids else []
+        return emails, response.get("nextPageToken")
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="gmail-prefetch") as executor:
+        future = executor.submit(fetch, page_token)
+        while future is not None:
+            emails, next_token = future.result()
+            future = executor.submit(fetch, next_token) if next_token else None
+            yield emails, next_token
+
+def iter_emails(query: str = "", page_size: int = 100, **filters):
+    """Yields every message matching `query` (newest first), one page in memory at a time."""
+    for emails, _ in iter_email_pages(page_size=page_size, q=query, **filters):
+        yield from emails
+
+def _encode_cursor(query: str, page_token: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"q": query, "t": page_token}).encode()).decode()
+
+def get_emails_page(query: str = '', page_size: int = 25, cursor: str = '') -> dict:
+    """
+    Retrieve one page of emails matching a Gmail search query, for walking large result sets.
+    - query: Gmail search string (ignored when cursor is given; the cursor remembers it)
+    - page_size: emails per page (max 500)
+    - cursor: next_cursor from the previous call, to get the following page
+    Returns the emails and next_cursor ("" when there are no more pages).
+    """
+    try:
+        page_token = None
+        if cursor:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            query, page_token = state["q"], state["t"]
+        service = get_gmail_service()
+        response = service.users().messages().list(
+            userId="me", maxResults=min(page_size, LIST_PAGE_SIZE), pageToken=page_token, q=query
+        ).execute()
+        result = _fetch_emails(service, [m["id"] for m in response.get("messages", [])])
+        next_token = response.get("nextPageToken")
+        result["next_cursor"] = _encode_cursor(query, next_token) if next_token else ""
+        return result
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# messages.send costs 100 of the 250 quota units a user may spend per second; leave headroom for reads
+GMAIL_SEND_RATE = float(os.getenv("GMAIL_SEND_RATE", "2"))
+GMAIL_SEND_WORKERS = int(os.getenv("GMAIL_SEND_WORKERS", "4"))
+GMAIL_SEND_MAX_ATTEMPTS = 5
+# First retry delay in seconds; doubles per attempt, with jitter
+GMAIL_SEND_BACKOFF_SECONDS = 2.0
+_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+_send_bucket = None
+_send_bucket_lock = threading.Lock()
+
+def _get_send_bucket() -> TokenBucket:
+    """Process-wide limiter shared by send_gmail and bulk sends."""
+    global _send_bucket
+    with _send_bucket_lock:
+        if _send_bucket is None:
+            _send_bucket = TokenBucket(GMAIL_SEND_RATE, capacity=GMAIL_SEND_WORKERS)
+        return _send_bucket
+
+def _build_message(recipient: str, subject: str, body: str) -> dict:
+    message = MIMEText(body)
+    message["to"] = recipient
+    message["subject"] = subject
+    return {"raw": base64.urlsafe_b64encode(message.as_bytes()).decode()}
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """403 answers are only retried when Gmail reports a rate limit (other 403s are permission errors)."""
+    if not isinstance(error, HttpError) or error.resp.status != 403:
+        return False
+    return any(d.get("reason") in _RATE_LIMIT_REASONS for d in (error.error_details or []) if isinstance(d, dict))
+
+def _send_raw(service, message_body: dict) -> dict:
+    return service.users().messages().send(userId="me", body=message_body).execute()
+
+def _send_with_retry(message_body: dict, should_stop=None) -> tuple:
+    """
+    Sends through the shared rate limiter (see call_with_retry), retrying rate-limit answers only:
+    after a server error the message may have been sent, and resending could deliver it twice.
+    Returns (sent message, attempts).
+    """
+    attempts = 0
+
+    def send():
+        nonlocal attempts
+        attempts += 1
+        return _send_raw(get_gmail_service(), message_body)
+
+    sent_message = call_with_retry(send, _get_send_bucket(), retry_statuses=(429,),
+                                   is_retryable=_is_rate_limit_error, max_attempts=GMAIL_SEND_MAX_ATTEMPTS,
+                                   backoff_seconds=GMAIL_SEND_BACKOFF_SECONDS, should_stop=should_stop)
+    return sent_message, attempts
+
+def _is_unknown_outcome(error: Exception) -> bool:
+    """A 5xx answer to messages.send does not say whether the message went out."""
+    return isinstance(error, HttpError) and error.resp.status >= 500
+
+def _unknown_outcome(error: Exception) -> dict:
+    return {"status": "unknown",
+            "message": f"Gmail answered {error.resp.status}; the message may or may not have been sent. "
+                       "Check the Sent folder before sending it again."}
 
 def send_gmail(recipient: str, subject: str, body: str) -> dict:
     """Send an email via Gmail using the Gmail API."""
     try:
-        service = get_gmail_service()
-        message = MIMEText(body)
-        message["to"] = recipient
-        message["subject"] = subject
-        raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        message_body = {"raw": raw}
-        sent_message = (
-            service.users().messages().send(userId="me", body=message_body).execute()
-        )
+        sent_message, _ = _send_with_retry(_build_message(recipient, subject, body))
         return {"status": "success", "id": sent_message["id"]}
     except Exception as e:
+        if _is_unknown_outcome(e):
+            return _unknown_outcome(e)
         return {"status": "error", "message": str(e)}
 
-def get_recent_emails(max_results: int = 5) -> dict:
-    """Retrieve the most recent emails from the user's Gmail inbox."""
+def _recipient_fields(recipient) -> dict:
+    """Template fields for a recipient given as 'Name <address>' / 'address' or as a dict with 'email'."""
+    if isinstance(recipient, dict):
+        fields = dict(recipient)
+        name = fields.get("name", "")
+    else:
+        name, address = parseaddr(recipient)
+        fields = {"email": address}
+    fields.setdefault("name", name)
+    fields.setdefault("first_name", name.split()[0] if name else "")
+    if not fields.get("email") or "@" not in fields["email"]:
+        raise ValueError(f"Invalid recipient: {recipient!r}")
+    return fields
+
+def send_bulk_emails(recipients: list, subject_template: str, body_template: str, on_result=None, should_stop=None) -> dict:
+    """
+    Sends one templated message per recipient from a bounded worker pool (GMAIL_SEND_WORKERS)
+    through the shared rate limiter. Templates use str.format fields from the recipient:
+    {email}, {name}, {first_name} and any extra keys of dict recipients.
+    on_result(done, total, result) is called from this thread after each recipient; should_stop()
+    makes workers skip recipients not yet sent.
+    """
+    def send_one(recipient) -> dict:
+        entry = {"recipient": recipient if isinstance(recipient, str) else recipient.get("email")}
+        if should_stop and should_stop():
+            return dict(entry, status="skipped")
+        try:
+            fields = _recipient_fields(recipient)
+            message_body = _build_message(fields["email"], subject_template.format_map(fields), body_template.format_map(fields))
+        except (KeyError, ValueError, IndexError) as e:
+            return dict(entry, status="error", message=f"Could not build message: {e!r}", attempts=0)
+        try:
+            sent_message, attempts = _send_with_retry(message_body, should_stop)
+            return dict(entry, status="sent", id=sent_message["id"], attempts=attempts)
+        except Exception as e:
+            if _is_unknown_outcome(e):
+                return dict(entry, **_unknown_outcome(e))
+            return dict(entry, status="error", message=str(e))
+
+    results = [None] * len(recipients)
+    with ThreadPoolExecutor(max_workers=GMAIL_SEND_WORKERS, thread_name_prefix="gmail-send") as executor:
+        futures = {executor.submit(send_one, recipient): i for i, recipient in enumerate(recipients)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if on_result:
+                on_result(done, len(recipients), results[futures[future]])
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("sent", "error", "skipped", "unknown")}
+    summary = {"status": "success" if counts["sent"] == len(recipients) else "error", **counts, "results": results}
+    if summary["status"] == "error":
+        summary["message"] = f"{len(recipients) - counts['sent']} of {len(recipients)} messages were not confirmed as sent."
+        if counts["unknown"]:
+            summary["message"] += (f" {counts['unknown']} got a server error and may have been sent;"
+                                   " check the Sent folder before sending them again.")
+    return summary
+
+def send_bulk_gmail(recipients: list[str], subject_template: str, body_template: str) -> dict:
+    """
+    Send a personalised email to each recipient (up to about 100; use start_bulk_gmail_job for more).
+    - recipients: addresses, optionally with names ("Jane Doe <jane@example.com>")
+    - subject_template / body_template: text with {email}, {name} or {first_name} placeholders
+    Returns per-recipient results and sent/error/unknown counts; "unknown" means Gmail answered with a
+    server error, so the message may have been sent and is not resent automatically.
+    """
     try:
-        service = get_gmail_service()
-        results = service.users().messages().list(userId="me", maxResults=max_results, labelIds=["INBOX"]).execute()
-        messages = results.get("messages", [])
-        emails = []
-        for msg in messages:
-            msg_detail = service.users().messages().get(userId="me", id=msg["id"]).execute()
-            headers = msg_detail.get("payload", {}).get("headers", [])
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "(Unknown Sender)")
-            snippet = msg_detail.get("snippet", "")
-            emails.append({
-                "id": msg["id"],
-                "subject": subject,
-                "from": sender,
-                "snippet": snippet
-            })
-        return {"status": "success", "emails": emails}
+        return send_bulk_emails(recipients, subject_template, body_template)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def send_bulk_gmail_job(job, recipients: list, subject_template: str, body_template: str) -> dict:
+    """Background job (manager.utils.jobs) version of send_bulk_gmail, with progress and cancellation."""
+    def on_result(done, total, result):
+        if done % 10 == 0 or done == total:
+            job.progress(done / total, f"Processed {done} of {total} recipients")
+    return send_bulk_emails(recipients, subject_template, body_template, on_result=on_result,
+                            should_stop=lambda: job.cancelled)
 
-def get_many_emails(query: str = '', max_results: int = 20) -> dict:
+def start_bulk_gmail_job(recipients: list[str], subject_template: str, body_template: str, tool_context: ToolContext = None) -> dict:
     """
-    Retrieve emails matching a Gmail search query (e.g., subject or keyword).
-    - query: Gmail search string (e.g., 'subject:"DRC Order Receipt"')
-    - max_results: maximum number of emails to return
+    Starts sending a personalised email to each recipient as a background job and returns a job ID.
+    Use this for large recipient lists; check progress and results with get_job_status.
+    - recipients: addresses, optionally with names ("Jane Doe <jane@example.com>")
+    - subject_template / body_template: text with {email}, {name} or {first_name} placeholders
     """
     try:
-        service = get_gmail_service()
-        results = service.users().messages().list(userId="me", maxResults=max_results, q=query).execute()
-        messages = results.get("messages", [])
-        emails = []
-        for msg in messages:
-            msg_detail = service.users().messages().get(userId="me", id=msg["id"]).execute()
-            headers = msg_detail.get("payload", {}).get("headers", [])
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "(Unknown Sender)")
-            snippet = msg_detail.get("snippet", "")
-            emails.append({
-                "id": msg["id"],
-                "subject": subject,
-                "from": sender,
-                "snippet": snippet
-            })
-        return {"status": "success", "emails": emails}
+        job = get_job_manager().submit("gmail_bulk_send", {"recipients": recipients, "subject_template": subject_template,
+                                                           "body_template": body_template}, user=job_user(tool_context))
+        return job_handle(job)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def get_recent_emails(max_results: int = 5) -> dict:
+    """Retrieve the most recent emails from the user's Gmail inbox."""
+    return _list_emails(max_results, labelIds=["INBOX"])
+
+
+def get_many_emails(query: str = '', max_results: int = 20, refresh: bool = False) -> dict:
+    """
+    Retrieve emails matching a Gmail search query (e.g., subject or keyword).
+    - query: Gmail search string (e.g., 'subject:"DRC Order Receipt"')
+    - max_results: maximum number of emails to return
+    - refresh: sync the local mailbox index with Gmail before searching it
+    Searches made only of from:, subject:, is:, in: and label: terms are answered from the local
+    mailbox index when it holds enough matches (see mail_index); the result then has source "local_index".
+    """
+    from manager.sub_agents.google_agent.tools.mail_index import search_indexed
+    result = search_indexed(query, max_results, get_gmail_service, refresh=refresh)
+    if result is not None:
+        return result
+    return _list_emails(max_results, q=query)
+
 def reply_to_email(message_id: str, body: str, subject: str = "") -> dict:
     """Reply to an email by message ID. Optionally override the subject."""
     try:
@@ -129,33 +372,16 @@ def reply_to_email(message_id: str, body: str, subject: str = "") -> dict:
             msg[k] = v
         raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
         message_body = {"raw": raw, "threadId": thread_id}
-        sent_message = service.users().messages().send(userId="me", body=message_body).execute()
+        sent_message, _ = _send_with_retry(message_body)
         return {"status": "success", "id": sent_message["id"]}
     except Exception as e:
+        if _is_unknown_outcome(e):
+            return _unknown_outcome(e)
         return {"status": "error", "message": str(e)}
 
 def get_unread_emails(max_results: int = 5) -> dict:
     """Retrieve the most recent unread emails from the user's Gmail inbox."""
-    try:
-        service = get_gmail_service()
-        results = service.users().messages().list(userId="me", maxResults=max_results, labelIds=["INBOX", "UNREAD"]).execute()
-        messages = results.get("messages", [])
-        emails = []
-        for msg in messages:
-            msg_detail = service.users().messages().get(userId="me", id=msg["id"]).execute()
-            headers = msg_detail.get("payload", {}).get("headers", [])
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "(Unknown Sender)")
-            snippet = msg_detail.get("snippet", "")
-            emails.append({
-                "id": msg["id"],
-                "subject": subject,
-                "from": sender,
-                "snippet": snippet
-            })
-        return {"status": "success", "emails": emails}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return _list_emails(max_results, labelIds=["INBOX", "UNREAD"])
 
 def delete_email(message_id: str) -> dict:
     """Delete an email from the user's Gmail account by message ID."""
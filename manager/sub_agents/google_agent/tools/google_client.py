@@ -0,0 +1,167 @@
+"""
+Shared Google API client factory for the Gmail, Sheets, Drive, Calendar and YouTube tools.
+
+token.json is read once per scope set (and again only when the file changes), expired tokens are
+refreshed once under a lock, and built service objects are cached per thread: httplib2
+connections are not thread-safe, so every tool thread gets its own service whose HTTP transport
+keeps its connections open across calls.
+
+Services are built from discovery documents pinned in google_agent/discovery, so building a
+client never fetches a discovery document over the network. Each document is read once per
+process and parsed once per thread, because googleapiclient fixes up method descriptions in place
+on first use and threads must not share those dicts. Refresh the pinned documents from the
+installed google-api-python-client with:
+
+    python -m manager.sub_agents.google_agent.tools.google_client --pin
+"""
+import argparse
+import json
+import os
+import threading
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+
+_AGENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
+DISCOVERY_DIR = os.path.join(_AGENT_DIR, "discovery")
+# APIs used by the Google tools; their discovery documents are pinned in DISCOVERY_DIR
+PINNED_APIS = [("gmail", "v1"), ("sheets", "v4"), ("drive", "v3"), ("calendar", "v3"), ("youtube", "v3")]
+
+# (frozenset(scopes)) -> (token path, token file mtime, Credentials)
+_credentials = {}
+_lock = threading.Lock()
+_local = threading.local()
+# (api, version) -> discovery document JSON text, shared by all threads (parsed copies are per thread)
+_document_texts = {}
+
+
+def find_token_path() -> str:
+    """
+    Locates the OAuth token file: GOOGLE_TOKEN_PATH, then YOUTUBE_TOKEN_PATH, then token.json in
+    the working directory, the google_agent directory and the project root.
+    """
+    candidates = [
+        os.getenv("GOOGLE_TOKEN_PATH"),
+        os.getenv("YOUTUBE_TOKEN_PATH"),
+        os.path.abspath("token.json"),
+        os.path.join(_AGENT_DIR, "token.json"),
+        os.path.join(_PROJECT_ROOT, "token.json"),
+    ]
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    raise FileNotFoundError(
+        "token.json not found. Set GOOGLE_TOKEN_PATH or complete the OAuth2 flow "
+        f"(looked in the working directory, {_AGENT_DIR} and {_PROJECT_ROOT})."
+    )
+
+
+def get_credentials(scopes: list) -> Credentials:
+    """Cached user credentials for `scopes`, refreshed if expired."""
+    key = frozenset(scopes)
+    path = find_token_path()
+    mtime = os.path.getmtime(path)
+    cached = _credentials.get(key)
+    if cached and cached[:2] == (path, mtime) and cached[2].valid:
+        return cached[2]
+    with _lock:
+        cached = _credentials.get(key)
+        if cached and cached[:2] == (path, mtime):
+            creds = cached[2]
+        else:
+            creds = Credentials.from_authorized_user_file(path, list(scopes))
+        if not creds.valid:
+            if not creds.refresh_token:
+                raise Exception(f"Credentials in {path} are expired and have no refresh token. Please re-run the OAuth2 flow.")
+            creds.refresh(Request())
+        _credentials[key] = (path, mtime, creds)
+        return creds
+
+
+def _library_document_path(api: str, version: str) -> str:
+    import googleapiclient.discovery_cache
+    return os.path.join(os.path.dirname(googleapiclient.discovery_cache.__file__), "documents", f"{api}.{version}.json")
+
+
+def _document_text(api: str, version: str) -> str:
+    key = (api, version)
+    text = _document_texts.get(key)
+    if text is not None:
+        return text
+    for path in (os.path.join(DISCOVERY_DIR, f"{api}.{version}.json"), _library_document_path(api, version)):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            break
+    else:
+        raise FileNotFoundError(f"No discovery document for {api} {version}. Pin it with `google_client --pin`.")
+    return _document_texts.setdefault(key, text)
+
+
+def load_discovery_document(api: str, version: str) -> dict:
+    """
+    The parsed discovery document for api/version: the pinned copy in DISCOVERY_DIR, else the
+    static copy shipped with google-api-python-client. Never fetched over the network.
+    Each thread gets its own parsed copy: googleapiclient fixes up method descriptions in place
+    on first use, which must not race with another thread reading the same dicts.
+    """
+    documents = getattr(_local, "documents", None)
+    if documents is None:
+        documents = _local.documents = {}
+    key = (api, version)
+    document = documents.get(key)
+    if document is None:
+        document = documents[key] = json.loads(_document_text(api, version))
+    return document
+
+
+def build_service(api: str, version: str, **kwargs):
+    """Like googleapiclient's build(), but from the pinned discovery document."""
+    return build_from_document(load_discovery_document(api, version), **kwargs)
+
+
+def pin_discovery_documents(apis: list = PINNED_APIS) -> list:
+    """Copies (minified) discovery documents from the installed google-api-python-client into DISCOVERY_DIR."""
+    os.makedirs(DISCOVERY_DIR, exist_ok=True)
+    pinned = []
+    for api, version in apis:
+        with open(_library_document_path(api, version), encoding="utf-8") as f:
+            document = json.load(f)
+        with open(os.path.join(DISCOVERY_DIR, f"{api}.{version}.json"), "w", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"), sort_keys=True)
+        pinned.append({"api": api, "version": version, "revision": document.get("revision")})
+    return pinned
+
+
+def get_service(api: str, version: str, scopes: list):
+    """A built API client for this thread, reused across tool calls while the credentials stay the same."""
+    creds = get_credentials(scopes)
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    key = (api, version, frozenset(scopes))
+    cached = services.get(key)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    service = build_service(api, version, credentials=creds)
+    services[key] = (creds, service)
+    return service
+
+
+def clear_cache() -> None:
+    """Forgets cached credentials (services built on them are rebuilt on next use)."""
+    with _lock:
+        _credentials.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the pinned Google API discovery documents.")
+    parser.add_argument("--pin", action="store_true", help="Copy the documents from the installed google-api-python-client")
+    args = parser.parse_args()
+    if args.pin:
+        for entry in pin_discovery_documents():
+            print(f"[GoogleClient] Pinned {entry['api']} {entry['version']} (revision {entry['revision']})")
+    else:
+        for api, version in PINNED_APIS:
+            print(f"{api} {version}: revision {load_discovery_document(api, version).get('revision')}")
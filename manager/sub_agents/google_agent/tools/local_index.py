@@ -0,0 +1,95 @@
+"""
+Base class of the local SQLite indexes of Google data (mail_index, sheets_index).
+
+A LocalIndex owns one SQLite database in WAL mode with one connection per thread, a `meta`
+key/value table, and the sync protocol both indexes follow: a full sync the first time, then
+incremental syncs from a cursor the API handed out (a Gmail historyId, a Drive page token), and a
+rebuild when the API no longer accepts the cursor. Subclasses provide the schema, full_sync and
+incremental_sync, and call _finish_sync with the new cursor.
+"""
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from googleapiclient.errors import HttpError
+
+
+class LocalIndex(ABC):
+    """SQLite-backed index kept current from an API change feed. Thread-safe; syncs are serialized."""
+
+    # Meta key of the change-feed cursor, and the HTTP statuses meaning the API rejected it
+    cursor_key = "cursor"
+    rebuild_statuses = (404,)
+    sync_interval_seconds = 60.0
+
+    def __init__(self, db_path: str, schema: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(schema + "\nCREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_meta(self, key: str):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn, **values) -> None:
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         [(k, str(v)) for k, v in values.items()])
+
+    @property
+    def cursor(self):
+        return self._get_meta(self.cursor_key)
+
+    @property
+    def last_sync(self):
+        last_sync = self._get_meta("last_sync")
+        return float(last_sync) if last_sync else None
+
+    def _finish_sync(self, cursor) -> None:
+        """Stores the cursor the next incremental sync starts from, and the sync time."""
+        with self._conn() as conn:
+            self._set_meta(conn, **{self.cursor_key: cursor, "last_sync": time.time()})
+
+    # --- Sync ---
+
+    @abstractmethod
+    def full_sync(self, service) -> dict:
+        """(Re)builds the index from a complete listing; ends with _finish_sync."""
+
+    @abstractmethod
+    def incremental_sync(self, service) -> dict:
+        """Applies the changes since the stored cursor; ends with _finish_sync."""
+
+    def _after_sync(self, result: dict) -> dict:
+        """Hook run under the sync lock after every full or incremental sync."""
+        return result
+
+    def sync(self, service, force: bool = False) -> dict:
+        """
+        Brings the index up to date: a full sync the first time or when the API rejects the stored
+        cursor, otherwise an incremental one (skipped if the last sync is recent, unless force).
+        """
+        with self._sync_lock:
+            last_sync = self.last_sync
+            if not force and last_sync and time.time() - last_sync < self.sync_interval_seconds:
+                return {"mode": "skipped"}
+            if self.cursor is None:
+                result = self.full_sync(service)
+            else:
+                try:
+                    result = self.incremental_sync(service)
+                except HttpError as e:
+                    if e.resp.status not in self.rebuild_statuses:
+                        raise
+                    print(f"[{type(self).__name__}] {self.cursor_key} {self.cursor} rejected; rebuilding the index")
+                    result = self.full_sync(service)
+            return self._after_sync(result)
@@ -0,0 +1,316 @@
+"""
+Local full-text index of Gmail message metadata (subject, sender, snippet, labels) in SQLite FTS5.
+
+The index is filled once from the newest messages (bounded by MAIL_INDEX_MAX_MESSAGES and
+MAIL_INDEX_MAX_AGE_DAYS) and then kept current with incremental history.list syncs from the
+last seen historyId; if Gmail no longer has that history, the index is rebuilt. get_many_emails
+answers from the index only what the index can answer exactly: from:, subject:, is:, in: and
+label: terms (label names resolved through users.labels.list) and their negations, with enough
+matches that no message older than the index could be among the results. Bare words (Gmail also
+searches message bodies, which are not indexed) and everything else go to the Gmail API.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from manager.utils.data_dir import data_path
+from manager.sub_agents.google_agent.tools.gmail_tools import _fetch_emails, _header, _list_message_ids
+from manager.sub_agents.google_agent.tools.local_index import LocalIndex
+
+# How often a search triggers an incremental sync (seconds); refresh=True syncs regardless
+SYNC_INTERVAL_SECONDS = float(os.getenv("MAIL_INDEX_SYNC_SECONDS", "60"))
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+_TOKEN_RE = re.compile(r'(-?)(?:(\w+):)?("[^"]*"|\S+)')
+_FIELD_COLUMNS = {"from": "sender", "subject": "subject"}
+# Spam and trash are not listed by full syncs, so in:spam and in:trash go to the API
+_LABEL_OPERATORS = {
+    "is": {"unread": "UNREAD", "starred": "STARRED", "important": "IMPORTANT"},
+    "in": {"inbox": "INBOX", "sent": "SENT", "drafts": "DRAFT"},
+}
+# Gmail search leaves these out unless asked for
+_HIDDEN_LABELS = ("SPAM", "TRASH")
+
+
+def label_key(name: str) -> str:
+    """A label name as Gmail search matches it: case-insensitive, spaces and slashes written as dashes."""
+    return re.sub(r"[\s/]+", "-", name.strip()).lower()
+
+
+def parse_query(query: str, label_ids: dict = None):
+    """
+    Translates a Gmail search string into (FTS5 match expression or None, required labels,
+    excluded labels). label_ids maps label_key(name) to label ID for label: terms (see
+    MailIndex.label_ids). Returns None when the index cannot answer the query exactly: bare
+    words, unknown label names, from:me, or syntax it does not translate.
+    """
+    terms, negated, labels, excluded = [], [], set(), set()
+    for negate, operator, value in _TOKEN_RE.findall(query or ""):
+        text = value[1:-1] if value.startswith('"') else value
+        operator = operator.lower()
+        if not operator or any(c in value for c in "(){}") or not text.strip():
+            return None
+        if operator in _LABEL_OPERATORS or operator == "label":
+            if operator == "label":
+                label = (label_ids or {}).get(label_key(text))
+            else:
+                label = _LABEL_OPERATORS[operator].get(text.lower())
+            if label is None:
+                return None
+            (excluded if negate else labels).add(label)
+            continue
+        if operator not in _FIELD_COLUMNS:
+            return None
+        if operator == "from" and text.strip().lower() == "me":
+            # Gmail reads from:me as the user's own address, which the index does not know
+            return None
+        term = f"{_FIELD_COLUMNS[operator]} : " + '"' + text.replace('"', '""') + '"'
+        (negated if negate else terms).append(term)
+    if negated and not terms:
+        # FTS5 NOT needs a positive side
+        return None
+    expression = " AND ".join(terms) + "".join(f" NOT {term}" for term in negated) if terms else None
+    excluded |= {label for label in _HIDDEN_LABELS if label not in labels}
+    return expression, labels, excluded
+
+
+def _index_row(message: dict) -> tuple:
+    headers = message.get("payload", {}).get("headers", [])
+    return (message["id"], message.get("threadId"), int(message.get("internalDate", 0)),
+            _header(headers, "Subject", "(No Subject)"), _header(headers, "From", "(Unknown Sender)"),
+            message.get("snippet", ""), " " + " ".join(message.get("labelIds", [])) + " ")
+
+
+class MailIndex(LocalIndex):
+    """Message metadata of one mailbox in SQLite (WAL mode) with an FTS5 index over subject, sender and snippet."""
+
+    cursor_key = "history_id"
+    # Gmail answers 404 when it no longer has the history since the stored historyId
+    rebuild_statuses = (404,)
+    sync_interval_seconds = SYNC_INTERVAL_SECONDS
+
+    def __init__(self, db_path: str, max_messages: int = 5000, max_age_days: int = 365):
+        self.max_messages = max_messages
+        self.max_age_days = max_age_days
+        super().__init__(db_path, """
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                thread_id TEXT,
+                internal_date INTEGER NOT NULL,
+                subject TEXT,
+                sender TEXT,
+                snippet TEXT,
+                labels TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_date ON messages(internal_date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                subject, sender, snippet, content='messages', content_rowid='rowid'
+            );
+            CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts(rowid, subject, sender, snippet) VALUES (new.rowid, new.subject, new.sender, new.snippet);
+            END;
+            CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts(messages_fts, rowid, subject, sender, snippet) VALUES ('delete', old.rowid, old.subject, old.sender, old.snippet);
+            END;
+            CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+                INSERT INTO messages_fts(messages_fts, rowid, subject, sender, snippet) VALUES ('delete', old.rowid, old.subject, old.sender, old.snippet);
+                INSERT INTO messages_fts(rowid, subject, sender, snippet) VALUES (new.rowid, new.subject, new.sender, new.snippet);
+            END;
+        """)
+
+    @property
+    def history_id(self):
+        return self.cursor
+
+    def label_ids(self) -> dict:
+        """label_key(name) -> ID of every label of the mailbox, as of the last sync."""
+        labels = self._get_meta("labels")
+        return json.loads(labels) if labels else {}
+
+    def upsert(self, rows: list) -> None:
+        """Inserts or replaces (id, thread_id, internal_date, subject, sender, snippet, labels) rows."""
+        with self._conn() as conn:
+            conn.executemany("""
+                INSERT INTO messages (id, thread_id, internal_date, subject, sender, snippet, labels)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET thread_id = excluded.thread_id, internal_date = excluded.internal_date,
+                    subject = excluded.subject, sender = excluded.sender, snippet = excluded.snippet, labels = excluded.labels
+            """, rows)
+
+    def delete(self, message_ids) -> None:
+        with self._conn() as conn:
+            conn.executemany("DELETE FROM messages WHERE id = ?", [(m,) for m in message_ids])
+
+    def known_ids(self, message_ids) -> set:
+        message_ids = list(message_ids)
+        known = set()
+        for start in range(0, len(message_ids), 500):
+            chunk = message_ids[start:start + 500]
+            rows = self._conn().execute(
+                f"SELECT id FROM messages WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+            known.update(row[0] for row in rows)
+        return known
+
+    def evict(self) -> int:
+        """Drops messages older than max_age_days and all but the newest max_messages."""
+        cutoff = int((time.time() - self.max_age_days * 86400) * 1000)
+        with self._conn() as conn:
+            removed = conn.execute("DELETE FROM messages WHERE internal_date < ?", (cutoff,)).rowcount
+            removed += conn.execute("""
+                DELETE FROM messages WHERE id IN (
+                    SELECT id FROM messages ORDER BY internal_date DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_messages,)).rowcount
+        return removed
+
+    def search(self, query: str, max_results: int = 20):
+        """Newest-first matches as email summaries, or None if the query needs the Gmail API."""
+        parsed = parse_query(query, self.label_ids())
+        if parsed is None:
+            return None
+        expression, labels, excluded = parsed
+        sql = "SELECT m.id, m.subject, m.sender, m.snippet FROM messages m"
+        params = []
+        if expression:
+            sql += " JOIN messages_fts f ON f.rowid = m.rowid WHERE messages_fts MATCH ?"
+            params.append(expression)
+        else:
+            sql += " WHERE 1"
+        for label in labels:
+            sql += " AND m.labels LIKE ?"
+            params.append(f"% {label} %")
+        for label in excluded:
+            sql += " AND m.labels NOT LIKE ?"
+            params.append(f"% {label} %")
+        sql += " ORDER BY m.internal_date DESC LIMIT ?"
+        params.append(max_results)
+        rows = self._conn().execute(sql, params).fetchall()
+        return [{"id": r[0], "subject": r[1], "from": r[2], "snippet": r[3]} for r in rows]
+
+    def stats(self) -> dict:
+        count, oldest = self._conn().execute("SELECT COUNT(*), MIN(internal_date) FROM messages").fetchone()
+        return {"messages": count, "history_id": self.history_id,
+                "oldest": datetime.fromtimestamp(oldest / 1000, timezone.utc).isoformat() if oldest else None,
+                "last_sync": self.last_sync}
+
+    # --- Sync ---
+
+    def _fetch_rows(self, service, message_ids: list) -> list:
+        result = _fetch_emails(service, message_ids, parse=_index_row)
+        return result["emails"]
+
+    def _sync_labels(self, service) -> None:
+        """Stores the label names and IDs (label: terms name labels, the index holds IDs)."""
+        response = service.users().labels().list(userId="me").execute()
+        labels = {label_key(label["name"]): label["id"] for label in response.get("labels", [])}
+        with self._conn() as conn:
+            self._set_meta(conn, labels=json.dumps(labels))
+
+    def full_sync(self, service) -> dict:
+        """(Re)builds the index from the newest messages within the size and age bounds."""
+        history_id = service.users().getProfile(userId="me").execute()["historyId"]
+        ids = _list_message_ids(service, self.max_messages, q=f"newer_than:{self.max_age_days}d")
+        known = self.known_ids(ids)
+        missing = [m for m in ids if m not in known]
+        rows = self._fetch_rows(service, missing)
+        with self._conn() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_ids (id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM current_ids")
+            conn.executemany("INSERT OR IGNORE INTO current_ids (id) VALUES (?)", [(m,) for m in ids])
+            removed = conn.execute("DELETE FROM messages WHERE id NOT IN (SELECT id FROM current_ids)").rowcount
+        self.upsert(rows)
+        self._sync_labels(service)
+        self._finish_sync(history_id)
+        return {"mode": "full", "added": len(rows), "removed": removed}
+
+    def incremental_sync(self, service) -> dict:
+        """Applies history.list changes since the stored historyId."""
+        added, deleted, relabeled = set(), set(), set()
+        page_token, history_id = None, self.history_id
+        while True:
+            response = service.users().history().list(
+                userId="me", startHistoryId=self.history_id, historyTypes=HISTORY_TYPES,
+                maxResults=500, pageToken=page_token
+            ).execute()
+            for record in response.get("history", []):
+                for change in record.get("messagesAdded", []):
+                    added.add(change["message"]["id"])
+                    deleted.discard(change["message"]["id"])
+                for change in record.get("messagesDeleted", []):
+                    deleted.add(change["message"]["id"])
+                    added.discard(change["message"]["id"])
+                for change in record.get("labelsAdded", []) + record.get("labelsRemoved", []):
+                    relabeled.add(change["message"]["id"])
+            history_id = response.get("historyId", history_id)
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        # Label changes only matter for messages we hold; they are refetched (one batched call per 50)
+        refetch = added | (self.known_ids(relabeled) - deleted)
+        rows = self._fetch_rows(service, list(refetch))
+        self.upsert(rows)
+        self.delete(deleted)
+        self._sync_labels(service)
+        self._finish_sync(history_id)
+        return {"mode": "incremental", "added": len(added), "fetched": len(rows), "removed": len(deleted)}
+
+    def _after_sync(self, result: dict) -> dict:
+        result["evicted"] = self.evict()
+        return result
+
+    def background_sync(self, service_factory) -> None:
+        """Runs sync() on a daemon thread (services are per thread, so the thread builds its own)."""
+        def run():
+            try:
+                result = self.sync(service_factory(), force=True)
+                print(f"[MailIndex] Sync finished: {result}")
+            except Exception as e:
+                print(f"[MailIndex] Sync failed: {e}")
+        if not self._sync_lock.locked():
+            threading.Thread(target=run, name="mail-index-sync", daemon=True).start()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_mail_index():
+    """The process-wide index, or None when MAIL_INDEX_ENABLED is false."""
+    global _index
+    if os.getenv("MAIL_INDEX_ENABLED", "true").lower() != "true":
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = MailIndex(
+                os.getenv("MAIL_INDEX_PATH") or data_path("mail_index.db"),
+                max_messages=int(os.getenv("MAIL_INDEX_MAX_MESSAGES", "5000")),
+                max_age_days=int(os.getenv("MAIL_INDEX_MAX_AGE_DAYS", "365")),
+            )
+        return _index
+
+
+def search_indexed(query: str, max_results: int, service_factory, refresh: bool = False):
+    """
+    Answers a Gmail search from the local index, syncing it first when stale (or when refresh).
+    Returns None when the caller should ask the Gmail API instead: the query is not supported
+    locally, the index is disabled or still being built, syncing failed, or the index has fewer
+    than max_results matches (older messages that are not indexed might match too).
+    """
+    index = get_mail_index()
+    if index is None or parse_query(query, index.label_ids()) is None:
+        return None
+    if index.history_id is None:
+        # First use: build the index in the background and answer this query from the API
+        index.background_sync(service_factory)
+        return None
+    try:
+        index.sync(service_factory(), force=refresh)
+    except Exception as e:
+        print(f"[MailIndex] Sync failed, falling back to the Gmail API: {e}")
+        return None
+    emails = index.search(query, max_results)
+    if emails is None or len(emails) < max_results:
+        return None
+    return {"status": "success", "emails": emails, "source": "local_index", "indexed_since": index.stats()["oldest"]}
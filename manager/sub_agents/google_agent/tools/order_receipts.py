@@ -0,0 +1,222 @@
+"""
+Incremental extraction of order receipts from Gmail into a Google Sheet.
+
+Each run only looks at messages matching the query that arrived after the last processed one
+(remembered per spreadsheet, tab and query in SQLite), fetches the oldest of them in full format
+with batched gets, and parses subject and body text with precompiled extractors. Order numbers already in the
+tab (read through the sheet cache, so an unchanged tab costs one version check) and within the
+run are skipped, and all new rows are appended with one write. Re-running on an unchanged inbox
+costs one message list call besides the cached sheet lookups.
+"""
+import html
+import os
+import re
+import sqlite3
+import sys
+import threading
+from manager.utils.data_dir import data_path
+from manager.sub_agents.google_agent.tools.gmail_tools import _fetch_emails, _header, _list_message_ids, get_gmail_service
+from manager.sub_agents.google_agent.tools.gmail_attachments import _decode_inline, walk_parts
+from manager.sub_agents.google_agent.tools.sheets_index import find_sheets_by_name
+from manager.sub_agents.google_agent.tools.sheets_tools import (
+    _invalidate, _quote_sheet_title, append_sheet, describe_sheet, get_sheets_service, read_sheet, write_sheet,
+)
+from manager.sub_agents.google_agent.tools.sheets_writes import column_letter
+
+DEFAULT_HEADERS = ["Order Number", "Order Date", "Order Total"]
+
+# Column -> pattern whose first group is the value, e.g. "Order #123-4567890-1234567 on May 1, 2025 Total $12.34"
+EXTRACTORS = {
+    "Order Number": re.compile(r"\border\s*(?:number|no\.?|id)?\s*[#:]?\s*#?\s*([A-Z0-9][A-Z0-9-]*\d[A-Z0-9-]*)", re.I),
+    "Order Date": re.compile(r"\b(?:on|order date:?|ordered on:?)\s+([A-Za-z]+ \d{1,2}, \d{4})", re.I),
+    "Order Total": re.compile(r"\b(?:order\s+)?total[:\s]*(?:USD\s*)?\$\s?([\d,]+(?:\.\d{2})?)", re.I),
+}
+_TAG_RE = re.compile(r"<(?:style|script)\b.*?</(?:style|script)>|<[^>]+>", re.I | re.S)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def parse_order(text: str) -> dict:
+    """Order fields found in a receipt's text, keyed by column name."""
+    order = {}
+    for column, pattern in EXTRACTORS.items():
+        match = pattern.search(text)
+        if match:
+            order[column] = match.group(1)
+    return order
+
+
+def _receipt_text(message: dict) -> dict:
+    """Id, internalDate and searchable text (subject, plain body or de-tagged HTML, snippet) of a full-format message."""
+    payload = message.get("payload", {})
+    texts = {}
+    for part in walk_parts(payload):
+        if part["data"] and not part["is_attachment"] and part["mime_type"] in ("text/plain", "text/html"):
+            texts.setdefault(part["mime_type"], []).append(_decode_inline(part["data"]))
+    body = " ".join(texts.get("text/plain") or [])
+    if not body and texts.get("text/html"):
+        body = html.unescape(_TAG_RE.sub(" ", " ".join(texts["text/html"])))
+    subject = _header(payload.get("headers", []), "Subject", "")
+    return {"id": message["id"], "internal_date": int(message.get("internalDate", 0)),
+            "text": _SPACE_RE.sub(" ", f"{subject} {body} {message.get('snippet', '')}")}
+
+
+class ReceiptState:
+    """Per (spreadsheet, tab, query) position of the newest processed message."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS receipt_cursor (
+                    spreadsheet_id TEXT NOT NULL,
+                    tab TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    last_internal_date INTEGER NOT NULL,
+                    last_ids TEXT NOT NULL,
+                    PRIMARY KEY (spreadsheet_id, tab, query)
+                )
+            """)
+
+    def get(self, spreadsheet_id: str, tab: str, query: str):
+        """(last internalDate in ms, IDs of the messages processed at that time) or None before the first run."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT last_internal_date, last_ids FROM receipt_cursor WHERE spreadsheet_id = ? AND tab = ? AND query = ?",
+                (spreadsheet_id, tab, query)).fetchone()
+        return (row[0], set(row[1].split())) if row else None
+
+    def set(self, spreadsheet_id: str, tab: str, query: str, last_internal_date: int, last_ids) -> None:
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT OR REPLACE INTO receipt_cursor VALUES (?, ?, ?, ?, ?)",
+                         (spreadsheet_id, tab, query, last_internal_date, " ".join(sorted(last_ids))))
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_receipt_state() -> ReceiptState:
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = ReceiptState(os.getenv("RECEIPT_STATE_PATH") or data_path("order_receipts.db"))
+        return _state
+
+
+def _ensure_tab(sheet_id: str, sheet_tab: str) -> list:
+    """Header row of the tab, creating the tab with DEFAULT_HEADERS when it does not exist."""
+    desc = describe_sheet(sheet_id, mode="headers")
+    if desc["status"] != "success":
+        raise RuntimeError(f"Could not describe sheet: {desc['message']}")
+    columns = next((s["columns"] for s in desc["sheets"] if s["sheet_name"] == sheet_tab), None)
+    if columns:
+        return columns
+    available_tabs = [s["sheet_name"] for s in desc["sheets"]]
+    try:
+        if columns is None:
+            get_sheets_service().spreadsheets().batchUpdate(
+                spreadsheetId=sheet_id,
+                body={"requests": [{"addSheet": {"properties": {"title": sheet_tab}}}]}
+            ).execute()
+            _invalidate(sheet_id)
+        result = write_sheet(sheet_id, f"{_quote_sheet_title(sheet_tab)}!A1", [DEFAULT_HEADERS])
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+    except Exception as e:
+        raise RuntimeError(f"Tab '{sheet_tab}' has no header row. Available tabs: {available_tabs}. "
+                           f"Tried to create it but failed: {e}")
+    return DEFAULT_HEADERS
+
+
+def _logged_order_numbers(sheet_id: str, sheet_tab: str, columns: list) -> set:
+    """Order numbers already in the tab (one column read, served from the sheet cache when unchanged)."""
+    if "Order Number" not in columns:
+        return set()
+    letter = column_letter(columns.index("Order Number") + 1)
+    result = read_sheet(sheet_id, f"{_quote_sheet_title(sheet_tab)}!{letter}2:{letter}")
+    if result["status"] != "success":
+        raise RuntimeError(f"Could not read logged orders: {result['message']}")
+    return {row[0].strip() for row in result["values"] if row and row[0].strip()}
+
+
+def extract_and_log_order_receipts(sheet_name: str, sheet_tab: str = "Sheet1", email_query: str = "order receipt", max_emails: int = 10) -> dict:
+    """
+    Extract order receipts from Gmail and append them to the specified Google Sheet.
+    Only emails newer than the last run (for the same sheet, tab and query) are read, and orders
+    whose Order Number is already in the tab are skipped, so it is safe to run repeatedly.
+    - sheet_name: Name of the Google Sheet (not ID)
+    - sheet_tab: Name of the tab within the sheet
+    - email_query: Gmail search query (e.g., subject or label)
+    - max_emails: Max emails to process per run (oldest new emails first); on the first run, the newest max_emails
+    """
+    try:
+        # 1. Find the sheet ID and header row
+        matches = find_sheets_by_name(sheet_name)
+        if not matches:
+            return {"status": "error", "message": f"Sheet '{sheet_name}' not found."}
+        sheet_id = matches[0]["id"]
+        columns = _ensure_tab(sheet_id, sheet_tab)
+
+        # 2. List messages since the last processed one (newest first)
+        state = get_receipt_state()
+        cursor = state.get(sheet_id, sheet_tab, email_query)
+        service = get_gmail_service()
+        if cursor is None:
+            message_ids = _list_message_ids(service, max_emails, q=email_query)
+        else:
+            # after: takes seconds and the cursor is in ms; messages of that second already processed are dropped below.
+            # Every ID since the cursor is listed (IDs only, 500 per call), so the oldest max_emails are taken
+            # even when a backlog has built up; the next run continues from the newest of them.
+            query = f"({email_query}) after:{cursor[0] // 1000 - 1}"
+            message_ids = _list_message_ids(service, sys.maxsize, q=query)
+            message_ids = [m for m in message_ids if m not in cursor[1]][-max_emails:]
+        if not message_ids:
+            return {"status": "success", "appended_rows": 0, "processed_emails": 0, "skipped_duplicates": 0}
+
+        # 3. Full messages, one batched round trip per 50
+        fetched = _fetch_emails(service, message_ids, parse=_receipt_text, format="full")
+        receipts = sorted(fetched["emails"], key=lambda r: r["internal_date"])
+        # Messages deleted since they were listed (404) count as processed; other failures are retried next run
+        failed = [f for f in fetched.get("failed", []) if f.get("status") != 404]
+        if cursor is not None:
+            receipts = [r for r in receipts if r["internal_date"] >= cursor[0]]
+
+        # 4. Parse, dropping orders that are already logged
+        logged = _logged_order_numbers(sheet_id, sheet_tab, columns)
+        rows_to_append, duplicates, unparsed = [], 0, 0
+        for receipt in receipts:
+            order = parse_order(receipt["text"])
+            number = order.get("Order Number")
+            if not number:
+                unparsed += 1
+                continue
+            if number in logged:
+                duplicates += 1
+                continue
+            logged.add(number)
+            rows_to_append.append([order.get(col, "") for col in columns])
+
+        # 5. One append, then move the cursor past the processed messages
+        details = None
+        if rows_to_append:
+            details = append_sheet(sheet_id, f"{_quote_sheet_title(sheet_tab)}!A1", rows_to_append)
+            if details["status"] != "success":
+                return {"status": "error", "message": f"Could not append rows: {details['message']}"}
+        # Messages that could not be fetched keep the cursor in place; the next run retries them
+        if receipts and not failed:
+            newest = receipts[-1]["internal_date"]
+            last_ids = {r["id"] for r in receipts if r["internal_date"] == newest}
+            if cursor is not None and cursor[0] == newest:
+                last_ids |= cursor[1]
+            state.set(sheet_id, sheet_tab, email_query, newest, last_ids)
+
+        result = {"status": "success", "appended_rows": len(rows_to_append), "processed_emails": len(receipts),
+                  "skipped_duplicates": duplicates, "without_order_number": unparsed}
+        if details:
+            result["details"] = details
+        if failed:
+            result["failed"] = failed
+        return result
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
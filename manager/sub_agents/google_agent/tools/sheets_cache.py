@@ -0,0 +1,122 @@
+"""
+In-memory cache of Google Sheets values, revalidated against the Drive file version.
+
+Entries are keyed by spreadsheet ID and a request key (a range, or a describe_sheet mode) and
+remember the Drive `version` of the spreadsheet they were read at. A lookup first asks Drive for
+the current version (`files.get(fields=version)`, a few hundred bytes), and returns the cached
+values when it has not changed; any edit to the spreadsheet, from this process or elsewhere, bumps
+the version. The version itself is remembered for SHEETS_CACHE_REVALIDATE_SECONDS so bursts of
+reads share one check. Values are kept JSON-encoded, so every hit returns a fresh copy that the
+caller may modify. Entries are evicted least recently used first, beyond SHEETS_CACHE_MAX_ENTRIES
+entries or SHEETS_CACHE_MAX_BYTES of encoded values.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class SheetCache:
+    """LRU cache of sheet values with per-spreadsheet version checks. Thread-safe."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, revalidate_seconds: float = 2.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries = OrderedDict()  # (spreadsheet_id, key) -> (version, size, JSON-encoded value)
+        self._versions = {}  # spreadsheet_id -> (version, checked_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _current_version(self, spreadsheet_id: str, get_version) -> str:
+        with self._lock:
+            known = self._versions.get(spreadsheet_id)
+            if known and time.monotonic() - known[1] < self.revalidate_seconds:
+                return known[0]
+        version = str(get_version(spreadsheet_id))
+        with self._lock:
+            self._versions[spreadsheet_id] = (version, time.monotonic())
+        return version
+
+    def get(self, spreadsheet_id: str, key: str, fetch, get_version):
+        """
+        Returns the values for (spreadsheet_id, key), calling fetch() only when nothing is cached
+        for the spreadsheet's current version. get_version(spreadsheet_id) returns that version;
+        if it fails (e.g. no Drive access), the values are fetched and not cached. Cached values
+        come back as a new copy on every call.
+        """
+        try:
+            version = self._current_version(spreadsheet_id, get_version)
+        except Exception as e:
+            print(f"[SheetCache] Version check failed for {spreadsheet_id}, reading uncached: {e}")
+            return fetch()
+        entry_key = (spreadsheet_id, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                encoded = entry[2]
+            else:
+                encoded = None
+                self.misses += 1
+        if encoded is not None:
+            return json.loads(encoded)
+        # The version was read before the values, so an edit in between only makes the entry stale early
+        value = fetch()
+        self._store(entry_key, version, value)
+        return value
+
+    def _store(self, entry_key, version: str, value) -> None:
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        size = len(encoded)
+        with self._lock:
+            old = self._entries.pop(entry_key, None)
+            if old:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[entry_key] = (version, size, encoded)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def invalidate(self, spreadsheet_id: str) -> None:
+        """Drops everything cached for a spreadsheet (called after writing to it)."""
+        with self._lock:
+            self._versions.pop(spreadsheet_id, None)
+            for entry_key in [k for k in self._entries if k[0] == spreadsheet_id]:
+                self._bytes -= self._entries.pop(entry_key)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_sheet_cache():
+    """The process-wide sheet cache, or None when SHEETS_CACHE_ENABLED is off."""
+    global _cache
+    if os.getenv("SHEETS_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SheetCache(
+                max_entries=int(os.getenv("SHEETS_CACHE_MAX_ENTRIES", "256")),
+                max_bytes=int(os.getenv("SHEETS_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+                revalidate_seconds=float(os.getenv("SHEETS_CACHE_REVALIDATE_SECONDS", "2")),
+            )
+        return _cache
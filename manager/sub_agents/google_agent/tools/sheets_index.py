@@ -0,0 +1,156 @@
+"""
+Local name -> ID index of the user's Google Sheets in SQLite.
+
+The index is filled once by listing every spreadsheet in Drive (all pages) and then kept current
+with the Drive changes feed (changes.list from the stored page token), which reports created,
+renamed, trashed and deleted files. Lookups are an indexed query on the case-folded name, so
+resolving a name no longer lists the whole Drive. Several spreadsheets may share a name; lookups
+return all of them, most recently modified first.
+"""
+import os
+import threading
+from manager.utils.data_dir import data_path
+from manager.sub_agents.google_agent.tools.local_index import LocalIndex
+from manager.sub_agents.google_agent.tools.sheets_tools import (
+    SPREADSHEET_MIME_TYPE, get_drive_service, iter_spreadsheet_files,
+)
+
+# How often a lookup triggers an incremental sync (seconds); refresh=True syncs regardless
+SYNC_INTERVAL_SECONDS = float(os.getenv("SHEET_INDEX_SYNC_SECONDS", "60"))
+CHANGE_FIELDS = "nextPageToken, newStartPageToken, changes(fileId, removed, file(name, mimeType, trashed, modifiedTime))"
+
+
+def _name_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class SheetIndex(LocalIndex):
+    """Spreadsheet IDs, names and modification times of one Drive, in SQLite (WAL mode)."""
+
+    cursor_key = "page_token"
+    # Drive answers 400 or 404 for a page token it no longer accepts
+    rebuild_statuses = (400, 404)
+    sync_interval_seconds = SYNC_INTERVAL_SECONDS
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path, """
+            CREATE TABLE IF NOT EXISTS sheets (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                modified_time TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_sheets_name_key ON sheets(name_key);
+        """)
+
+    @property
+    def page_token(self):
+        return self.cursor
+
+    def upsert(self, files: list) -> None:
+        """Inserts or replaces Drive file dicts (id, name, modifiedTime)."""
+        with self._conn() as conn:
+            conn.executemany("""
+                INSERT INTO sheets (id, name, name_key, modified_time) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET name = excluded.name, name_key = excluded.name_key,
+                    modified_time = excluded.modified_time
+            """, [(f["id"], f["name"], _name_key(f["name"]), f.get("modifiedTime")) for f in files])
+
+    def delete(self, file_ids) -> None:
+        with self._conn() as conn:
+            conn.executemany("DELETE FROM sheets WHERE id = ?", [(f,) for f in file_ids])
+
+    def lookup(self, name: str) -> list:
+        """Spreadsheets named `name` (case and whitespace insensitive), exact-case matches and then newest first."""
+        rows = self._conn().execute(
+            "SELECT id, name, modified_time FROM sheets WHERE name_key = ?", (_name_key(name),)).fetchall()
+        rows.sort(key=lambda r: r[2] or "", reverse=True)
+        rows.sort(key=lambda r: r[1] != name)
+        return [{"id": r[0], "name": r[1], "modified_time": r[2]} for r in rows]
+
+    def stats(self) -> dict:
+        count = self._conn().execute("SELECT COUNT(*) FROM sheets").fetchone()[0]
+        return {"sheets": count, "last_sync": self.last_sync}
+
+    # --- Sync ---
+
+    def full_sync(self, service) -> dict:
+        """(Re)builds the index from a listing of every spreadsheet."""
+        # Taken before listing, so changes made during the listing are replayed by the next sync
+        page_token = service.changes().getStartPageToken().execute()["startPageToken"]
+        files = list(iter_spreadsheet_files(service, fields="id, name, modifiedTime"))
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sheets")
+        self.upsert(files)
+        self._finish_sync(page_token)
+        return {"mode": "full", "sheets": len(files)}
+
+    def incremental_sync(self, service) -> dict:
+        """Applies Drive changes since the stored page token."""
+        page_token, updated, removed = self.page_token, {}, set()
+        while True:
+            response = service.changes().list(
+                pageToken=page_token, pageSize=1000, spaces="drive", includeRemoved=True, fields=CHANGE_FIELDS
+            ).execute()
+            for change in response.get("changes", []):
+                file_id, file = change.get("fileId"), change.get("file") or {}
+                if not file_id:
+                    # Shared drive changes (changeType "drive") carry no fileId
+                    continue
+                if change.get("removed") or file.get("trashed") or file.get("mimeType") != SPREADSHEET_MIME_TYPE:
+                    # Also covers files that are not spreadsheets, which are not in the index anyway
+                    removed.add(file_id)
+                    updated.pop(file_id, None)
+                else:
+                    updated[file_id] = dict(file, id=file_id)
+                    removed.discard(file_id)
+            if "newStartPageToken" in response:
+                page_token = response["newStartPageToken"]
+                break
+            page_token = response["nextPageToken"]
+        self.upsert(list(updated.values()))
+        self.delete(removed)
+        self._finish_sync(page_token)
+        return {"mode": "incremental", "updated": len(updated), "removed": len(removed)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_sheet_index() -> SheetIndex:
+    """The process-wide index (SHEET_INDEX_PATH, default $LENOAI_DATA_DIR/sheet_index.db)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SheetIndex(os.getenv("SHEET_INDEX_PATH") or data_path("sheet_index.db"))
+        return _index
+
+
+def find_sheets_by_name(name: str, refresh: bool = False, service_factory=get_drive_service) -> list:
+    """
+    Spreadsheets with the given name, most relevant first (see SheetIndex.lookup). The index is
+    synced when stale; on a miss it is synced once more, so a sheet created moments ago is found.
+    """
+    index = get_sheet_index()
+    service = service_factory()
+    result = index.sync(service, force=refresh)
+    matches = index.lookup(name)
+    if not matches and result["mode"] == "skipped":
+        index.sync(service, force=True)
+        matches = index.lookup(name)
+    return matches
+
+
+def find_sheet(name: str) -> dict:
+    """
+    Find Google Sheets by name (not case-sensitive) and return their IDs.
+    Several spreadsheets can share a name; all are returned, the most recently modified first.
+    """
+    try:
+        matches = find_sheets_by_name(name)
+        if not matches:
+            return {"status": "error", "message": f"Sheet '{name}' not found."}
+        return {"status": "success", "id": matches[0]["id"], "matches": matches}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
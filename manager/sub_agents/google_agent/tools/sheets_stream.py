@@ -0,0 +1,131 @@
+"""
+Streaming reads of large Google Sheets tabs.
+
+iter_sheet_rows splits a tab into bands of rows (`'Tab'!1001:2000`) and fetches up to
+SHEETS_READ_CONCURRENCY bands at once, each on its own thread and service object. Rows are
+yielded strictly in sheet order, and only the bands in flight are held in memory, so reading a
+100k-row tab needs memory for a few bands rather than the whole tab. All band requests of the
+process go through a token bucket of SHEETS_READ_RATE requests per second (the Sheets API allows
+60 read requests per minute per user) and retry 429/5xx answers.
+
+read_sheet_page is the tool form: one band per call and a cursor for the next one.
+"""
+import base64
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from manager.utils.rate_limit import TokenBucket, call_with_retry
+from manager.sub_agents.google_agent.tools.sheets_tools import get_sheets_service, _quote_sheet_title
+
+SHEETS_READ_RATE = float(os.getenv("SHEETS_READ_RATE", "1"))
+SHEETS_READ_CONCURRENCY = int(os.getenv("SHEETS_READ_CONCURRENCY", "4"))
+SHEETS_READ_BAND_ROWS = int(os.getenv("SHEETS_READ_BAND_ROWS", "2000"))
+SHEETS_READ_MAX_ATTEMPTS = 5
+SHEETS_READ_BACKOFF_SECONDS = 2.0
+# Largest page read_sheet_page returns to the agent
+MAX_PAGE_ROWS = 500
+
+_read_bucket = None
+_read_bucket_lock = threading.Lock()
+
+
+def _get_read_bucket() -> TokenBucket:
+    global _read_bucket
+    with _read_bucket_lock:
+        if _read_bucket is None:
+            # No burst allowance: a full bucket on top of the steady rate would exceed the per-minute quota
+            _read_bucket = TokenBucket(SHEETS_READ_RATE, capacity=1.0)
+        return _read_bucket
+
+
+def _execute_read(request):
+    """Executes a Sheets read through the shared read limiter, retrying quota and server errors."""
+    return call_with_retry(request, _get_read_bucket(), retry_statuses=(429, 500, 502, 503, 504),
+                           max_attempts=SHEETS_READ_MAX_ATTEMPTS, backoff_seconds=SHEETS_READ_BACKOFF_SECONDS)
+
+
+def get_row_count(spreadsheet_id: str, sheet_name: str, service=None) -> int:
+    """Grid row count of one tab (including empty rows at the end)."""
+    service = service or get_sheets_service()
+    meta = _execute_read(service.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, ranges=[_quote_sheet_title(sheet_name)],
+        fields="sheets(properties(title,gridProperties(rowCount)))"
+    ))
+    for sheet in meta.get("sheets", []):
+        if sheet["properties"]["title"] == sheet_name:
+            return sheet["properties"].get("gridProperties", {}).get("rowCount", 0)
+    raise ValueError(f"Tab '{sheet_name}' not found.")
+
+
+def read_band(spreadsheet_id: str, sheet_name: str, first_row: int, last_row: int, service=None) -> list:
+    """Rows first_row..last_row (1-based, inclusive) of a tab. Empty rows at the end of the band are omitted."""
+    service = service or get_sheets_service()
+    result = _execute_read(service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=f"{_quote_sheet_title(sheet_name)}!{first_row}:{last_row}",
+        majorDimension="ROWS", fields="values"
+    ))
+    return result.get("values", [])
+
+
+def iter_sheet_rows(spreadsheet_id: str, sheet_name: str, start_row: int = 1, end_row: int = None,
+                    band_rows: int = None, concurrency: int = None, service_factory=get_sheets_service):
+    """
+    Yields (row_number, row) for each row of a tab from start_row to end_row (default: the last
+    grid row), in order. The API leaves out empty rows at the end of each band, so some empty
+    rows are skipped; row numbers are always exact.
+    """
+    band_rows = band_rows or SHEETS_READ_BAND_ROWS
+    concurrency = concurrency or SHEETS_READ_CONCURRENCY
+    if end_row is None:
+        end_row = get_row_count(spreadsheet_id, sheet_name, service_factory())
+    bands = ((first, min(first + band_rows - 1, end_row)) for first in range(start_row, end_row + 1, band_rows))
+
+    def fetch(band):
+        # Runs on a pool thread, which gets its own service (see google_client)
+        return band[0], read_band(spreadsheet_id, sheet_name, band[0], band[1], service_factory())
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sheets-read") as executor:
+        in_flight = deque()
+        for band in bands:
+            in_flight.append(executor.submit(fetch, band))
+            if len(in_flight) < concurrency:
+                continue
+            first, rows = in_flight.popleft().result()
+            yield from enumerate(rows, start=first)
+        while in_flight:
+            first, rows = in_flight.popleft().result()
+            yield from enumerate(rows, start=first)
+
+
+def _encode_cursor(sheet_name: str, next_row: int, row_count: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"s": sheet_name, "r": next_row, "n": row_count}).encode()).decode()
+
+
+def read_sheet_page(spreadsheet_id: str, sheet_name: str = "", page_rows: int = 200, cursor: str = "") -> dict:
+    """
+    Read one page of rows from a (large) sheet tab, for walking it without loading it whole.
+    - sheet_name: tab to read (ignored when cursor is given; the cursor remembers it)
+    - page_rows: rows per page (max 500)
+    - cursor: next_cursor from the previous call, to get the following rows
+    Returns first_row (1-based sheet row of the first returned row), rows and next_cursor
+    ("" after the last row).
+    """
+    try:
+        page_rows = max(1, min(page_rows, MAX_PAGE_ROWS))
+        service = get_sheets_service()
+        if cursor:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            sheet_name, first_row, row_count = state["s"], state["r"], state["n"]
+        else:
+            if not sheet_name:
+                return {"status": "error", "message": "sheet_name is required for the first page."}
+            first_row, row_count = 1, get_row_count(spreadsheet_id, sheet_name, service)
+        last_row = min(first_row + page_rows - 1, row_count)
+        rows = read_band(spreadsheet_id, sheet_name, first_row, last_row, service) if first_row <= last_row else []
+        next_cursor = _encode_cursor(sheet_name, last_row + 1, row_count) if last_row < row_count else ""
+        return {"status": "success", "sheet_name": sheet_name, "first_row": first_row, "rows": rows,
+                "next_cursor": next_cursor}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,222 @@
+"""
+Coalesced writes to Google Sheets.
+
+SheetWriteBuffer collects range and cell updates for one spreadsheet and sends them in queue
+order: each run of consecutive updates becomes one `values.batchUpdate`, and each run of
+consecutive appends to the same range one `values.append`, so a write never overtakes an earlier
+one (e.g. an update of a row appended before it).
+A flush happens when SHEETS_WRITE_BATCH_SIZE writes are pending, SHEETS_WRITE_MAX_DELAY_SECONDS
+after the first pending write, or when the buffer is closed (use it as a context manager around a
+workflow). Every write gets a handle whose result is filled in by the flush that sent it.
+
+Flushes of all buffers in the process share a token bucket of SHEETS_WRITE_RATE requests per
+second without bursts (the Sheets API allows 60 write requests per minute per user). Updates are
+retried on 429/5xx answers with exponential backoff; appends only on 429, since an append that
+failed with a server error may have been applied and would be duplicated by a retry.
+"""
+import os
+import re
+import threading
+from itertools import groupby
+from manager.utils.rate_limit import TokenBucket, call_with_retry
+from manager.sub_agents.google_agent.tools.sheets_cache import get_sheet_cache
+from manager.sub_agents.google_agent.tools.sheets_tools import get_sheets_service, _quote_sheet_title
+
+SHEETS_WRITE_RATE = float(os.getenv("SHEETS_WRITE_RATE", "1"))
+SHEETS_WRITE_BATCH_SIZE = int(os.getenv("SHEETS_WRITE_BATCH_SIZE", "500"))
+SHEETS_WRITE_MAX_DELAY_SECONDS = float(os.getenv("SHEETS_WRITE_MAX_DELAY_SECONDS", "5"))
+SHEETS_WRITE_MAX_ATTEMPTS = 5
+SHEETS_WRITE_BACKOFF_SECONDS = 2.0
+
+_write_bucket = None
+_write_bucket_lock = threading.Lock()
+
+
+def _get_write_bucket() -> TokenBucket:
+    global _write_bucket
+    with _write_bucket_lock:
+        if _write_bucket is None:
+            # No burst allowance: a full bucket on top of the steady rate would exceed the per-minute quota
+            _write_bucket = TokenBucket(SHEETS_WRITE_RATE, capacity=1.0)
+        return _write_bucket
+
+
+def _execute_write(request, retry_statuses=(429, 500, 502, 503, 504)):
+    """Executes a Sheets write through the shared write limiter, retrying quota (and by default server) errors."""
+    return call_with_retry(request, _get_write_bucket(), retry_statuses=retry_statuses,
+                           max_attempts=SHEETS_WRITE_MAX_ATTEMPTS, backoff_seconds=SHEETS_WRITE_BACKOFF_SECONDS)
+
+
+def column_letter(column: int) -> str:
+    """1 -> A, 27 -> AA."""
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def cell_range(sheet: str, row: int, column: int) -> str:
+    """A1 reference of one cell, e.g. ('My Tab', 2, 3) -> "'My Tab'!C2". An empty sheet means the first tab."""
+    cell = f"{column_letter(column)}{row}"
+    return f"{_quote_sheet_title(sheet)}!{cell}" if sheet else cell
+
+
+class PendingWrite:
+    """Handle for one buffered write; `result` is set when the flush that sends it completes."""
+
+    def __init__(self, kind: str, range_: str, values: list):
+        self.kind = kind
+        self.range = range_
+        self.values = values
+        self.result = None
+        self._done = threading.Event()
+
+    def _set(self, result: dict) -> None:
+        self.result = result
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> dict:
+        """Blocks until the write has been flushed and returns its result (None on timeout)."""
+        self._done.wait(timeout)
+        return self.result
+
+
+class SheetWriteBuffer:
+    """Buffers writes to one spreadsheet and sends them in as few API calls as possible. Thread-safe."""
+
+    def __init__(self, spreadsheet_id: str, max_pending: int = None, max_delay: float = None,
+                 value_input_option: str = "RAW", service_factory=get_sheets_service):
+        self.spreadsheet_id = spreadsheet_id
+        self.max_pending = max_pending or SHEETS_WRITE_BATCH_SIZE
+        self.max_delay = SHEETS_WRITE_MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.value_input_option = value_input_option
+        self.service_factory = service_factory
+        self.requests_sent = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def update(self, range_: str, values: list) -> PendingWrite:
+        """Queues an overwrite of `range_` with a 2D list of values."""
+        return self._add(PendingWrite("update", range_, values))
+
+    def update_cell(self, sheet: str, row: int, column: int, value) -> PendingWrite:
+        """Queues an overwrite of one cell (1-based row and column)."""
+        return self.update(cell_range(sheet, row, column), [[value]])
+
+    def append(self, range_: str, rows: list) -> PendingWrite:
+        """Queues rows to append after the table found in `range_`."""
+        return self._add(PendingWrite("append", range_, rows))
+
+    def _add(self, write: PendingWrite) -> PendingWrite:
+        with self._lock:
+            self._pending.append(write)
+            full = len(self._pending) >= self.max_pending
+            if not full and self._timer is None and self.max_delay > 0:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return write
+
+    def flush(self) -> list:
+        """Sends every pending write. Returns their results in the order they were queued."""
+        with self._flush_lock:
+            with self._lock:
+                writes, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not writes:
+                return []
+            try:
+                service = self.service_factory()
+            except Exception as e:
+                for write in writes:
+                    write._set({"status": "error", "message": str(e)})
+                return [w.result for w in writes]
+            # Runs of consecutive updates, or of consecutive appends to one range, in queue order
+            for (kind, range_), run in groupby(writes, key=lambda w: (w.kind, w.range if w.kind == "append" else None)):
+                if kind == "update":
+                    self._send_updates(service, list(run))
+                else:
+                    self._send_appends(service, range_, list(run))
+            cache = get_sheet_cache()
+            if cache is not None:
+                cache.invalidate(self.spreadsheet_id)
+            return [w.result for w in writes]
+
+    def _send_updates(self, service, updates: list) -> None:
+        body = {
+            "valueInputOption": self.value_input_option,
+            "data": [{"range": w.range, "values": w.values} for w in updates],
+        }
+        try:
+            response = _execute_write(
+                service.spreadsheets().values().batchUpdate(spreadsheetId=self.spreadsheet_id, body=body))
+            self.requests_sent += 1
+        except Exception as e:
+            for write in updates:
+                write._set({"status": "error", "message": str(e)})
+            return
+        responses = response.get("responses", [])
+        for i, write in enumerate(updates):
+            answer = responses[i] if i < len(responses) else {}
+            write._set({"status": "success", "updatedRange": answer.get("updatedRange", write.range),
+                        "updatedCells": answer.get("updatedCells", 0)})
+
+    def _send_appends(self, service, range_: str, group: list) -> None:
+        rows = [row for write in group for row in write.values]
+        try:
+            # Not retried on 5xx: the rows may have been appended already
+            response = _execute_write(service.spreadsheets().values().append(
+                spreadsheetId=self.spreadsheet_id, range=range_, valueInputOption=self.value_input_option,
+                insertDataOption="INSERT_ROWS", body={"values": rows}), retry_statuses=(429,))
+            self.requests_sent += 1
+        except Exception as e:
+            for write in group:
+                write._set({"status": "error", "message": str(e)})
+            return
+        updated = response.get("updates", {}).get("updatedRange", "")
+        match = re.search(r"(\d+)(?::[A-Z]+\d+)?$", updated)
+        first_row = int(match.group(1)) if match else None
+        for write in group:
+            result = {"status": "success", "appendedRows": len(write.values)}
+            if first_row is not None:
+                result["firstRow"] = first_row
+                first_row += len(write.values)
+            write._set(result)
+
+    def close(self) -> list:
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def write_sheet_cells(spreadsheet_id: str, cells: list[str], values: list[str]) -> dict:
+    """
+    Write many individual cells of a Google Sheet in one request.
+    - cells: A1 references, e.g. ["Sheet1!B2", "Sheet1!D7"]
+    - values: the value for each cell, in the same order
+    Returns a result for each cell.
+    """
+    if len(cells) != len(values):
+        return {"status": "error", "message": f"Got {len(cells)} cells but {len(values)} values."}
+    try:
+        with SheetWriteBuffer(spreadsheet_id, max_pending=len(cells) + 1, max_delay=0) as buffer:
+            writes = [buffer.update(cell, [[value]]) for cell, value in zip(cells, values)]
+        results = [dict(w.result, cell=w.range) for w in writes]
+        failed = [r for r in results if r["status"] != "success"]
+        if failed:
+            return {"status": "error", "message": failed[0]["message"], "results": results}
+        return {"status": "success", "results": results}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
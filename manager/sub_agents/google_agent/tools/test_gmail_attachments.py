@@ -0,0 +1,102 @@
+import base64
+import io
+import json
+import os
+import random
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from manager.sub_agents.google_agent.tools import gmail_attachments
+from manager.sub_agents.google_agent.tools.gmail_attachments import Base64UrlDecoder, iter_json_string_field, walk_parts
+
+
+def _chunks(data: bytes, rng: random.Random):
+    i = 0
+    while i < len(data):
+        size = rng.randint(1, 37)
+        yield data[i:i + size]
+        i += size
+
+
+def test_streamed_json_field_decodes_in_arbitrary_chunks():
+    rng = random.Random(7)
+    for length in (0, 1, 2, 3, 100, 4097):
+        payload = bytes(rng.getrandbits(8) for _ in range(length))
+        encoded = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+        response = json.dumps({"size": length, "data": encoded, "attachmentId": "x"}, indent=1).encode()
+        decoder = Base64UrlDecoder()
+        out = b"".join(decoder.decode(piece) for piece in iter_json_string_field(_chunks(response, rng), "data"))
+        assert out + decoder.flush() == payload
+
+
+def test_stream_attachment_writes_decoded_bytes(monkeypatch):
+    payload = os.urandom(300000)
+    body = json.dumps({"data": base64.urlsafe_b64encode(payload).decode()}).encode()
+
+    class Response:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            return (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+
+    class Session:
+        def get(self, url, **kwargs):
+            assert url.endswith("/messages/m1/attachments/a1") and kwargs["stream"]
+            return Response()
+
+    out = io.BytesIO()
+    assert gmail_attachments.stream_attachment("m1", "a1", out, session=Session()) == len(payload)
+    assert out.getvalue() == payload
+
+
+def test_walk_parts_finds_nested_attachments():
+    payload = {"mimeType": "multipart/mixed", "parts": [
+        {"partId": "0", "mimeType": "multipart/alternative", "parts": [
+            {"partId": "0.0", "mimeType": "text/plain", "body": {"data": "aGk", "size": 2}},
+            {"partId": "0.1", "mimeType": "text/html", "body": {"data": "PGI-aGk8L2I-", "size": 9}},
+        ]},
+        {"partId": "1", "mimeType": "application/pdf", "filename": "receipt.pdf",
+         "body": {"attachmentId": "att-1", "size": 52000}},
+    ]}
+    parts = list(walk_parts(payload))
+    assert [p["part_id"] for p in parts] == ["0.0", "0.1", "1"]
+    assert [p["is_attachment"] for p in parts] == [False, False, True]
+    assert gmail_attachments._decode_inline(parts[0]["data"]) == "hi"
+    assert parts[2]["attachment_id"] == "att-1"
+
+
+def test_download_keeps_attachments_that_share_a_filename(tmp_path, monkeypatch):
+    payload = {"mimeType": "multipart/mixed", "parts": [
+        {"partId": "1", "mimeType": "image/png", "filename": "image.png", "body": {"data": "Zmlyc3Q", "size": 5}},
+        {"partId": "2", "mimeType": "image/png", "filename": "image.png", "body": {"data": "c2Vjb25k", "size": 6}},
+    ]}
+
+    class Gmail:
+        def users(self):
+            return self
+
+        def messages(self):
+            return self
+
+        def get(self, **kwargs):
+            return self
+
+        def execute(self):
+            return {"payload": payload}
+
+    monkeypatch.setattr(gmail_attachments, "get_gmail_service", lambda: Gmail())
+    monkeypatch.setattr(gmail_attachments, "get_credentials", lambda scopes: None)
+    monkeypatch.setattr(gmail_attachments, "AuthorizedSession", lambda credentials: None)
+    monkeypatch.setattr(gmail_attachments, "data_path", lambda name: str(tmp_path / name))
+
+    result = gmail_attachments.download_email_attachments("m1")
+
+    paths = [a["path"] for a in result["attachments"]]
+    assert [os.path.basename(p) for p in paths] == ["image.png", "image-part-2.png"]
+    assert [open(p, "rb").read() for p in paths] == [b"first", b"second"]
@@ -0,0 +1,112 @@
+import base64
+import email
+import json
+import os
+import re
+import sys
+import urllib.parse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+from manager.sub_agents.google_agent.tools import gmail_tools
+
+
+class GmailHttp(HttpMockSequence):
+    """Answers the list call from the sequence and batch calls with the matching `messages` entries."""
+
+    def __init__(self, iterable, messages: dict):
+        super().__init__(iterable)
+        self.messages = messages
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if not uri.endswith("/batch"):
+            return super().request(uri, method, body, headers, **kwargs)
+        self.request_sequence.append((uri, method, body, headers))
+        boundary, parts = "batch_boundary", []
+        for content_id in re.findall(r"Content-ID: <(.+?)>", body):
+            payload = json.dumps(self.messages[urllib.parse.unquote(content_id.rsplit("+", 1)[1].strip())])
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n{payload}\r\n"
+            )
+        headers = {"status": "200", "content-type": f"multipart/mixed; boundary={boundary}"}
+        return httplib2.Response(headers), ("".join(parts) + f"--{boundary}--").encode()
+
+
+def test_list_emails_fetches_metadata_in_one_batch(monkeypatch):
+    ids = [f"m{i}" for i in range(30)]
+    messages = [
+        {"id": m, "snippet": f"snippet {m}", "payload": {"headers": [{"name": "Subject", "value": f"Subject {m}"},
+                                                                   {"name": "from", "value": "a@example.com"}]}}
+        for m in ids
+    ]
+    http = GmailHttp([({"status": "200"}, json.dumps({"messages": [{"id": m} for m in ids]}))],
+                     {m["id"]: m for m in messages})
+    service = build("gmail", "v1", http=http, static_discovery=True)
+    monkeypatch.setattr(gmail_tools, "get_gmail_service", lambda: service)
+    monkeypatch.setenv("MAIL_INDEX_ENABLED", "false")
+
+    result = gmail_tools.get_many_emails("from:a@example.com", max_results=30)
+
+    assert result["status"] == "success" and "failed" not in result
+    assert [e["id"] for e in result["emails"]] == ids
+    assert result["emails"][0] == {"id": "m0", "subject": "Subject m0", "from": "a@example.com", "snippet": "snippet m0"}
+    # One list call and one batch call for all 30 messages, each asking for metadata only
+    assert len(http.request_sequence) == 2
+    batch_uri, _, batch_body, _ = http.request_sequence[1]
+    assert batch_uri.endswith("/batch")
+    assert batch_body.count("format=metadata") == 30 and "metadataHeaders=From" in batch_body
+
+
+def test_iter_email_pages_follows_page_tokens():
+    messages = {f"m{i}": {"id": f"m{i}", "snippet": "", "payload": {"headers": []}} for i in range(5)}
+    http = GmailHttp([
+        ({"status": "200"}, json.dumps({"messages": [{"id": "m0"}, {"id": "m1"}], "nextPageToken": "p2"})),
+        ({"status": "200"}, json.dumps({"messages": [{"id": "m2"}, {"id": "m3"}], "nextPageToken": "p3"})),
+        ({"status": "200"}, json.dumps({"messages": [{"id": "m4"}]})),
+    ], messages)
+    service = build("gmail", "v1", http=http, static_discovery=True)
+
+    pages = list(gmail_tools.iter_email_pages(page_size=2, service_factory=lambda: service, q="receipt"))
+
+    assert [[e["id"] for e in emails] for emails, _ in pages] == [["m0", "m1"], ["m2", "m3"], ["m4"]]
+    assert [token for _, token in pages] == ["p2", "p3", None]
+    list_uris = [uri for uri, *_ in http.request_sequence if "/messages?" in uri]
+    assert "pageToken=p2" in list_uris[1] and "pageToken=p3" in list_uris[2]
+    assert all("q=receipt" in uri for uri in list_uris)
+
+
+def test_bulk_send_retries_rate_limits_but_never_resends_after_server_errors(monkeypatch):
+    monkeypatch.setattr(gmail_tools, "GMAIL_SEND_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(gmail_tools, "_send_bucket", None)
+    monkeypatch.setattr(gmail_tools, "get_gmail_service", lambda: None)
+    sent, attempts = [], {}
+
+    def send_raw(service, message_body):
+        to = email.message_from_bytes(base64.urlsafe_b64decode(message_body["raw"]))["to"]
+        attempts[to] = attempts.get(to, 0) + 1
+        if to == "b@example.com" and attempts[to] == 1:
+            raise HttpError(httplib2.Response({"status": 429}), b"{}")
+        if to == "c@example.com":
+            raise HttpError(httplib2.Response({"status": 400}), b"{}")
+        if to == "d@example.com":
+            raise HttpError(httplib2.Response({"status": 503}), b"{}")
+        sent.append(message_body)
+        return {"id": f"id-{to}"}
+    monkeypatch.setattr(gmail_tools, "_send_raw", send_raw)
+
+    result = gmail_tools.send_bulk_gmail(
+        ["Ann Lee <a@example.com>", "b@example.com", "c@example.com", "d@example.com", "not-an-address"],
+        "Hello {first_name}", "Hi {name}, this went to {email}."
+    )
+
+    assert (result["sent"], result["error"], result["unknown"], result["status"]) == (2, 2, 1, "error")
+    statuses = [(r["recipient"], r["status"], r.get("attempts")) for r in result["results"]]
+    assert statuses == [("Ann Lee <a@example.com>", "sent", 1), ("b@example.com", "sent", 2),
+                        ("c@example.com", "error", None), ("d@example.com", "unknown", None),
+                        ("not-an-address", "error", 0)]
+    assert attempts["d@example.com"] == 1
+    first = email.message_from_bytes(base64.urlsafe_b64decode(sent[0]["raw"]))
+    assert first["subject"] == "Hello Ann" and "Hi Ann Lee, this went to a@example.com." in first.get_payload()
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from manager.sub_agents.google_agent.tools import google_client
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+
+def _write_token(path, token: str):
+    expiry = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    path.write_text(json.dumps({"token": token, "refresh_token": "refresh", "client_id": "id",
+                                "client_secret": "secret", "expiry": expiry}))
+
+
+def test_services_are_cached_per_thread_and_reloaded_when_token_changes(tmp_path, monkeypatch):
+    token_path = tmp_path / "token.json"
+    _write_token(token_path, "first")
+    monkeypatch.setenv("GOOGLE_TOKEN_PATH", str(token_path))
+    google_client.clear_cache()
+
+    service = google_client.get_service("sheets", "v4", SCOPES)
+    assert google_client.get_service("sheets", "v4", SCOPES) is service
+    assert google_client.get_credentials(SCOPES).token == "first"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(google_client.get_service("sheets", "v4", SCOPES)))
+    thread.start()
+    thread.join()
+    assert other[0] is not service
+
+    _write_token(token_path, "second")
+    os.utime(token_path, (0, os.path.getmtime(token_path) + 10))
+    assert google_client.get_credentials(SCOPES).token == "second"
+    assert google_client.get_service("sheets", "v4", SCOPES) is not service
+
+
+def test_every_api_builds_from_a_pinned_document():
+    for api, version in google_client.PINNED_APIS:
+        assert os.path.exists(os.path.join(google_client.DISCOVERY_DIR, f"{api}.{version}.json"))
+        document = google_client.load_discovery_document(api, version)
+        assert google_client.load_discovery_document(api, version) is document
+        assert google_client.build_service(api, version, developerKey="test")._rootDesc is document
+
+
+def test_each_thread_builds_from_its_own_parsed_document():
+    document = google_client.load_discovery_document("sheets", "v4")
+    other = []
+    thread = threading.Thread(target=lambda: other.append(google_client.load_discovery_document("sheets", "v4")))
+    thread.start()
+    thread.join()
+    assert other[0] is not document and other[0]["revision"] == document["revision"]
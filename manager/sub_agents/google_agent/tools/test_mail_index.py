@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from googleapiclient.http import HttpMockSequence
+from manager.sub_agents.google_agent.tools import google_client, mail_index
+from manager.sub_agents.google_agent.tools.mail_index import MailIndex, parse_query
+
+
+def _row(message_id, subject, sender, labels="INBOX", age_days=0):
+    internal_date = int((time.time() - age_days * 86400) * 1000)
+    return (message_id, "t" + message_id, internal_date, subject, sender, f"snippet of {subject}", f" {labels} ")
+
+
+def _message(message_id, subject, labels, age_days=0):
+    return {"id": message_id, "threadId": "t" + message_id, "labelIds": labels, "snippet": "",
+            "internalDate": str(int((time.time() - age_days * 86400) * 1000)),
+            "payload": {"headers": [{"name": "Subject", "value": subject}, {"name": "From", "value": "a@example.com"}]}}
+
+
+def test_parse_query_translates_supported_syntax_only():
+    assert parse_query('from:amazon subject:"Order Receipt" -subject:refund is:unread') == (
+        'sender : "amazon" AND subject : "Order Receipt" NOT subject : "refund"', {"UNREAD"}, {"SPAM", "TRASH"})
+    assert parse_query("label:Work-Projects -in:inbox", {"work-projects": "Label_7"}) == (
+        None, {"Label_7"}, {"INBOX", "SPAM", "TRASH"})
+    for unsupported in ["receipt", "-subject:only_negated", "after:2024/01/01", "a OR b", "has:attachment",
+                        "in:trash", "label:unknown", "from:me", "from:Me is:unread", "{a b}"]:
+        assert parse_query(unsupported) is None
+
+
+def test_search_labels_and_eviction(tmp_path):
+    index = MailIndex(str(tmp_path / "mail.db"), max_messages=3, max_age_days=30)
+    index.upsert([
+        _row("1", "Your DRC Order Receipt", "DRC <orders@drc.example>", age_days=3),
+        _row("2", "Order shipped", "Shop <ship@shop.example>", labels="INBOX UNREAD", age_days=2),
+        _row("3", "Receipt for your refund", "DRC <orders@drc.example>", labels="INBOX TRASH", age_days=1),
+        _row("4", "Old receipt", "DRC <orders@drc.example>", age_days=90),
+    ])
+    assert [e["id"] for e in index.search("subject:receipt")] == ["1", "4"]
+    assert [e["id"] for e in index.search("from:drc.example -subject:old")] == ["1"]
+    assert [e["id"] for e in index.search("subject:order is:unread")] == ["2"]
+
+    index.upsert([_row("2", "Order shipped", "Shop <ship@shop.example>", age_days=2)])
+    assert index.search("subject:order is:unread") == []
+
+    assert index.evict() == 1
+    index.upsert([_row("5", "Newest", "x@example.com")])
+    assert index.evict() == 1
+    assert index.known_ids(["1", "2", "3", "4", "5"]) == {"2", "3", "5"}
+    assert index.search("subject:receipt") == []
+
+
+def test_sync_builds_follows_history_and_rebuilds_when_history_expired(tmp_path, monkeypatch):
+    mailbox = {
+        "1": _message("1", "Quarterly plan", ["INBOX", "Label_7"], age_days=2),
+        "2": _message("2", "Lunch", ["INBOX"], age_days=1),
+        "3": _message("3", "Plan review", ["INBOX", "Label_7"]),
+    }
+    labels = {"labels": [{"id": "INBOX", "name": "INBOX"}, {"id": "Label_7", "name": "Work/Projects"}]}
+    fetched = []
+
+    def fetch(service, message_ids, parse):
+        fetched.append(sorted(message_ids))
+        return {"status": "success", "emails": [parse(mailbox[m]) for m in message_ids]}
+    monkeypatch.setattr(mail_index, "_fetch_emails", fetch)
+    http = HttpMockSequence([({"status": "200"}, json.dumps(r)) if isinstance(r, dict) else r for r in [
+        {"historyId": "100"},
+        {"messages": [{"id": "2"}, {"id": "1"}]},
+        labels,
+        {"history": [{"messagesAdded": [{"message": {"id": "3"}}]},
+                     {"messagesDeleted": [{"message": {"id": "2"}}]}], "historyId": "110"},
+        labels,
+        ({"status": "404"}, json.dumps({"error": {"code": 404, "message": "Requested entity was not found."}})),
+        {"historyId": "200"},
+        {"messages": [{"id": "3"}, {"id": "1"}]},
+        labels,
+    ]])
+    service = google_client.build_service("gmail", "v1", http=http)
+    index = MailIndex(str(tmp_path / "mail.db"), max_messages=10, max_age_days=30)
+
+    assert index.sync(service) == {"mode": "full", "added": 2, "removed": 0, "evicted": 0}
+    assert index.history_id == "100" and index.label_ids()["work-projects"] == "Label_7"
+    assert [e["id"] for e in index.search("label:work-projects")] == ["1"]
+    assert index.sync(service) == {"mode": "skipped"}
+
+    assert index.sync(service, force=True) == {"mode": "incremental", "added": 1, "fetched": 1, "removed": 1, "evicted": 0}
+    assert "startHistoryId=100" in http.request_sequence[3][0]
+    assert [e["id"] for e in index.search("label:work-projects")] == ["3", "1"]
+    assert index.known_ids(["1", "2", "3"]) == {"1", "3"}
+
+    # History 110 has expired: the index is rebuilt, fetching only the messages it does not hold
+    assert index.sync(service, force=True)["mode"] == "full"
+    assert index.history_id == "200" and fetched[-1] == []
+
+    monkeypatch.setenv("MAIL_INDEX_ENABLED", "true")
+    monkeypatch.setattr(mail_index, "_index", index)
+    answer = mail_index.search_indexed("label:work-projects", 2, lambda: service)
+    assert answer["source"] == "local_index" and [e["id"] for e in answer["emails"]] == ["3", "1"]
+    # Fewer local matches than asked for (older mail may match), bare words and unknown labels use the API
+    for query, max_results in [("label:work-projects", 5), ("plan", 1), ("label:personal", 1)]:
+        assert mail_index.search_indexed(query, max_results, lambda: service) is None
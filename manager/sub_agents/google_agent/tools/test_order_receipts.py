@@ -0,0 +1,99 @@
+import base64
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from manager.sub_agents.google_agent.tools import order_receipts
+
+
+def _message(message_id: str, internal_date: int, html: str) -> dict:
+    data = base64.urlsafe_b64encode(html.encode()).decode().rstrip("=")
+    return {"id": message_id, "internalDate": str(internal_date), "snippet": "",
+            "payload": {"headers": [{"name": "Subject", "value": "Your receipt"}],
+                        "parts": [{"partId": "0", "mimeType": "text/html", "body": {"data": data}}]}}
+
+
+def test_runs_append_only_new_orders_and_resume_after_the_last_message(tmp_path, monkeypatch):
+    inbox = {
+        "m1": _message("m1", 1000_000, "<p>Order #111-22 on May 1, 2025</p><b>Total $12.34</b>"),
+        "m2": _message("m2", 2000_000, "<p>Order #333-44</p><p>Order Total: $5.00</p>"),
+        "m3": _message("m3", 3000_000, "<p>Thanks for shopping</p>"),
+    }
+    listed = {"ids": ["m3", "m2", "m1"]}
+    calls = {"fetched": [], "appended": [], "queries": []}
+
+    def list_ids(service, max_results, q):
+        calls["queries"].append(q)
+        return listed["ids"][:max_results]
+
+    def fetch(service, ids, parse, format):
+        calls["fetched"].append(list(ids))
+        return {"status": "success", "emails": [parse(inbox[m]) for m in ids]}
+
+    monkeypatch.setattr(order_receipts, "get_receipt_state", lambda: order_receipts.ReceiptState(str(tmp_path / "r.db")))
+    monkeypatch.setattr(order_receipts, "find_sheets_by_name", lambda name: [{"id": "sid", "name": name}])
+    monkeypatch.setattr(order_receipts, "describe_sheet", lambda sid, mode: {
+        "status": "success", "sheets": [{"sheet_name": "Orders", "columns": order_receipts.DEFAULT_HEADERS}]})
+    monkeypatch.setattr(order_receipts, "read_sheet", lambda sid, range_: {"status": "success", "values": [["333-44"]]})
+    monkeypatch.setattr(order_receipts, "append_sheet",
+                        lambda sid, range_, rows: calls["appended"].append(rows) or {"status": "success"})
+    monkeypatch.setattr(order_receipts, "get_gmail_service", lambda: None)
+    monkeypatch.setattr(order_receipts, "_list_message_ids", list_ids)
+    monkeypatch.setattr(order_receipts, "_fetch_emails", fetch)
+
+    first = order_receipts.extract_and_log_order_receipts("Shop", "Orders", "from:shop", max_emails=10)
+
+    assert first["appended_rows"] == 1 and first["skipped_duplicates"] == 1 and first["without_order_number"] == 1
+    assert calls["appended"] == [[["111-22", "May 1, 2025", "12.34"]]]
+    assert calls["queries"] == ["from:shop"]
+
+    # Nothing new: the last message comes back from the after: query but is not fetched again
+    listed["ids"] = ["m3"]
+    again = order_receipts.extract_and_log_order_receipts("Shop", "Orders", "from:shop", max_emails=10)
+    assert again["appended_rows"] == 0 and len(calls["fetched"]) == 1
+    assert calls["queries"][-1] == "(from:shop) after:2999"
+
+
+def test_backlog_is_worked_through_oldest_first_and_deleted_messages_do_not_pin_the_cursor(tmp_path, monkeypatch):
+    inbox = {"m1": _message("m1", 1000_000, "<p>Order #1-1</p>")}
+    deleted = {"m3"}
+    fetched, appended = [], []
+
+    def list_ids(service, max_results, q):
+        # Newest first, honouring after:<seconds> like Gmail; deleted messages are no longer listed
+        after = int(q.rsplit("after:", 1)[1]) if "after:" in q else -1
+        ids = sorted((m for m in inbox if m not in deleted and int(inbox[m]["internalDate"]) // 1000 > after),
+                     key=lambda m: -int(inbox[m]["internalDate"]))
+        return ids[:max_results]
+
+    def fetch(service, ids, parse, format):
+        fetched.append(list(ids))
+        return {"status": "success", "emails": [parse(inbox[m]) for m in ids if m not in deleted],
+                "failed": [{"id": m, "error": "Not Found", "status": 404} for m in ids if m in deleted]}
+
+    monkeypatch.setattr(order_receipts, "get_receipt_state", lambda: order_receipts.ReceiptState(str(tmp_path / "r.db")))
+    monkeypatch.setattr(order_receipts, "find_sheets_by_name", lambda name: [{"id": "sid", "name": name}])
+    monkeypatch.setattr(order_receipts, "describe_sheet", lambda sid, mode: {
+        "status": "success", "sheets": [{"sheet_name": "Orders", "columns": order_receipts.DEFAULT_HEADERS}]})
+    monkeypatch.setattr(order_receipts, "read_sheet", lambda sid, range_: {"status": "success", "values": []})
+    monkeypatch.setattr(order_receipts, "append_sheet",
+                        lambda sid, range_, rows: appended.extend(r[0] for r in rows) or {"status": "success"})
+    monkeypatch.setattr(order_receipts, "get_gmail_service", lambda: None)
+    monkeypatch.setattr(order_receipts, "_list_message_ids", list_ids)
+    monkeypatch.setattr(order_receipts, "_fetch_emails", fetch)
+
+    order_receipts.extract_and_log_order_receipts("Shop", "Orders", "from:shop", max_emails=2)
+    for n in (2, 3, 4, 5):
+        inbox[f"m{n}"] = _message(f"m{n}", n * 1000_000, f"<p>Order #{n}-{n}</p>")
+    # m3 is listed by this run but deleted before it is fetched
+    deleted.clear()
+    listing = list_ids(None, 10, "(from:shop) after:999")
+    deleted.add("m3")
+    monkeypatch.setattr(order_receipts, "_list_message_ids", lambda service, max_results, q: listing)
+
+    second = order_receipts.extract_and_log_order_receipts("Shop", "Orders", "from:shop", max_emails=2)
+    assert fetched[-1] == ["m3", "m2"] and second["processed_emails"] == 1 and "failed" not in second
+
+    monkeypatch.setattr(order_receipts, "_list_message_ids", list_ids)
+    order_receipts.extract_and_log_order_receipts("Shop", "Orders", "from:shop", max_emails=2)
+    assert fetched[-1] == ["m5", "m4"]
+    assert appended == ["1-1", "2-2", "4-4", "5-5"]
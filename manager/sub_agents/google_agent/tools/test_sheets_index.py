@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from googleapiclient.http import HttpMockSequence
+from manager.sub_agents.google_agent.tools import google_client
+from manager.sub_agents.google_agent.tools.sheets_index import SheetIndex
+
+SHEET = "application/vnd.google-apps.spreadsheet"
+
+
+def _drive(responses):
+    http = HttpMockSequence([({"status": "200"}, json.dumps(r)) for r in responses])
+    return google_client.build_service("drive", "v3", http=http), http
+
+
+def test_index_lists_every_page_then_follows_the_changes_feed(tmp_path):
+    index = SheetIndex(str(tmp_path / "sheets.db"))
+    service, http = _drive([
+        {"startPageToken": "10"},
+        {"files": [{"id": "a", "name": "Orders", "modifiedTime": "2025-01-01T00:00:00Z"}], "nextPageToken": "p2"},
+        {"files": [{"id": "b", "name": "Budget", "modifiedTime": "2025-01-02T00:00:00Z"}]},
+        {"changes": [
+            {"fileId": "b", "removed": False, "file": {"name": "Budget", "mimeType": SHEET, "trashed": True}},
+            # Shared drive changes have no fileId and are skipped
+            {"changeType": "drive", "driveId": "d1", "removed": False},
+            {"fileId": "c", "removed": False, "file": {"name": "orders ", "mimeType": SHEET,
+                                                       "modifiedTime": "2025-03-01T00:00:00Z"}},
+        ], "nextPageToken": "11"},
+        {"changes": [{"fileId": "a", "removed": False,
+                      "file": {"name": "Orders", "mimeType": SHEET, "modifiedTime": "2025-02-01T00:00:00Z"}}],
+         "newStartPageToken": "12"},
+    ])
+
+    assert index.sync(service) == {"mode": "full", "sheets": 2}
+    assert "pageToken=p2" in http.request_sequence[2][0]
+    assert [m["id"] for m in index.lookup("budget")] == ["b"]
+    assert index.sync(service) == {"mode": "skipped"}
+
+    assert index.sync(service, force=True) == {"mode": "incremental", "updated": 2, "removed": 1}
+    assert index.page_token == "12"
+    assert index.lookup("Budget") == []
+    # Name collision: exact-case match first, then the most recently modified
+    assert [m["id"] for m in index.lookup("Orders")] == ["a", "c"]
+    assert [m["id"] for m in index.lookup("ORDERS")] == ["c", "a"]
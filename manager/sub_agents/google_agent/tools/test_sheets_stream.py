@@ -0,0 +1,65 @@
+import os
+import re
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from manager.sub_agents.google_agent.tools import sheets_stream
+
+
+class FakeSheets:
+    """Answers values.get for "'Tab'!first:last" with one-cell rows; earlier bands answer slower."""
+
+    def __init__(self, data_rows: int):
+        self.data_rows = data_rows
+        self.ranges = []
+        self.lock = threading.Lock()
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, **kwargs):
+        first, last = map(int, re.search(r"!(\d+):(\d+)$", kwargs["range"]).groups())
+        with self.lock:
+            self.ranges.append((first, last))
+        rows = [[f"r{n}"] for n in range(first, min(last, self.data_rows) + 1)]
+        return Request({"values": rows} if rows else {}, delay=0.05 if first == 1 else 0)
+
+
+class Request:
+    def __init__(self, response, delay):
+        self.response, self.delay = response, delay
+
+    def execute(self):
+        time.sleep(self.delay)
+        return self.response
+
+
+def test_rows_are_yielded_in_order_from_concurrent_bands(monkeypatch):
+    monkeypatch.setattr(sheets_stream, "SHEETS_READ_RATE", 100)
+    monkeypatch.setattr(sheets_stream, "_read_bucket", None)
+    fake = FakeSheets(data_rows=23)
+    rows = list(sheets_stream.iter_sheet_rows("sid", "Tab", end_row=30, band_rows=5, concurrency=3,
+                                              service_factory=lambda: fake))
+
+    assert [n for n, _ in rows] == list(range(1, 24))
+    assert rows[22] == (23, ["r23"])
+    assert sorted(fake.ranges) == [(1, 5), (6, 10), (11, 15), (16, 20), (21, 25), (26, 30)]
+
+
+def test_read_sheet_page_walks_the_tab_with_a_cursor(monkeypatch):
+    monkeypatch.setattr(sheets_stream, "SHEETS_READ_RATE", 100)
+    monkeypatch.setattr(sheets_stream, "_read_bucket", None)
+    fake = FakeSheets(data_rows=7)
+    monkeypatch.setattr(sheets_stream, "get_sheets_service", lambda: fake)
+    monkeypatch.setattr(sheets_stream, "get_row_count", lambda spreadsheet_id, sheet_name, service=None: 8)
+
+    first = sheets_stream.read_sheet_page("sid", "Tab", page_rows=5)
+    second = sheets_stream.read_sheet_page("sid", page_rows=5, cursor=first["next_cursor"])
+
+    assert first["rows"] == [[f"r{n}"] for n in range(1, 6)] and first["first_row"] == 1
+    assert second["first_row"] == 6 and second["rows"] == [["r6"], ["r7"]]
+    assert second["next_cursor"] == ""
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+from urllib.parse import parse_qs, urlsplit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from googleapiclient.http import HttpMockSequence
+from manager.sub_agents.google_agent.tools import google_client, sheets_tools
+from manager.sub_agents.google_agent.tools.sheets_cache import SheetCache
+
+META = {"sheets": [
+    {"properties": {"title": "Orders", "gridProperties": {"rowCount": 1000, "columnCount": 26}}},
+    {"properties": {"title": "Bob's tab", "gridProperties": {"rowCount": 50, "columnCount": 3}}},
+]}
+
+
+def _service(responses):
+    http = HttpMockSequence([({"status": "200"}, json.dumps(r)) for r in responses])
+    return google_client.build_service("sheets", "v4", http=http), http
+
+
+def _use_cache(monkeypatch, versions):
+    """Gives sheets_tools a fresh cache whose Drive versions are read from the `versions` dict."""
+    cache = SheetCache(revalidate_seconds=0)
+    monkeypatch.setattr(sheets_tools, "get_sheet_cache", lambda: cache)
+    monkeypatch.setattr(sheets_tools, "get_spreadsheet_version", lambda spreadsheet_id: versions[spreadsheet_id])
+    return cache
+
+
+def test_describe_sheet_reads_all_tabs_in_one_batch_get(monkeypatch):
+    values = {"valueRanges": [{"values": [["Order Number", "Total"], ["A1", "3"]]}, {"values": [["Name"]]}]}
+    service, http = _service([META, values])
+    monkeypatch.setattr(sheets_tools, "get_sheets_service", lambda: service)
+    _use_cache(monkeypatch, {"sid": "1"})
+
+    result = sheets_tools.describe_sheet("sid", mode="rows", max_rows=5)
+
+    assert result["status"] == "success"
+    assert result["sheets"][0] == {"sheet_name": "Orders", "row_count": 1000, "column_count": 26,
+                                   "columns": ["Order Number", "Total"], "rows": [["A1", "3"]]}
+    assert result["sheets"][1]["columns"] == ["Name"] and result["sheets"][1]["rows"] == []
+    assert len(http.request_sequence) == 2
+    query = parse_qs(urlsplit(http.request_sequence[1][0]).query)
+    assert query["ranges"] == ["'Orders'!1:6", "'Bob''s tab'!1:6"]
+
+
+def test_describe_sheet_counts_mode_reads_no_values(monkeypatch):
+    service, http = _service([META])
+    monkeypatch.setattr(sheets_tools, "get_sheets_service", lambda: service)
+    _use_cache(monkeypatch, {"sid": "1"})
+
+    result = sheets_tools.describe_sheet("sid", mode="counts")
+
+    assert [s["row_count"] for s in result["sheets"]] == [1000, 50]
+    assert "columns" not in result["sheets"][0] and len(http.request_sequence) == 1
+
+
+def test_reads_are_served_from_cache_until_the_version_changes(monkeypatch):
+    versions = {"sid": "7"}
+    service, http = _service([{"values": [["a"]]}, {"values": [["b"]]}, {"updatedCells": 1}, {"values": [["c"]]}])
+    monkeypatch.setattr(sheets_tools, "get_sheets_service", lambda: service)
+    cache = _use_cache(monkeypatch, versions)
+
+    assert sheets_tools.read_sheet("sid", "A1:A1")["values"] == [["a"]]
+    assert sheets_tools.read_sheet("sid", "A1:A1")["values"] == [["a"]]
+    assert len(http.request_sequence) == 1
+
+    versions["sid"] = "8"
+    assert sheets_tools.read_sheet("sid", "A1:A1")["values"] == [["b"]]
+    sheets_tools.write_sheet("sid", "A1", [["c"]])
+    assert cache.stats()["entries"] == 0
+    assert sheets_tools.read_sheet("sid", "A1:A1")["values"] == [["c"]]
+    assert cache.stats()["hits"] == 1 and len(http.request_sequence) == 4
+
+
+def test_cache_evicts_least_recently_used_entries_beyond_the_size_limit():
+    cache = SheetCache(max_entries=2, revalidate_seconds=60)
+    version = lambda spreadsheet_id: "1"
+    for key in ("a", "b"):
+        cache.get("sid", key, lambda: [[key]], version)
+    cache.get("sid", "a", lambda: None, version)
+    cache.get("sid", "c", lambda: [["c"]], version)
+    assert cache.get("sid", "a", lambda: "refetched", version) == [["a"]]
+    assert cache.get("sid", "b", lambda: "refetched", version) == "refetched"
+
+    small = SheetCache(max_bytes=20)
+    small.get("sid", "big", lambda: [["x" * 50]], version)
+    assert small.stats() == {"entries": 0, "bytes": 0, "hits": 0, "misses": 1}
+
+
+def test_cached_values_cannot_be_changed_by_callers():
+    cache = SheetCache(revalidate_seconds=60)
+    version = lambda spreadsheet_id: "1"
+    first = cache.get("sid", "values", lambda: {"values": [["a"]]}, version)
+    first["values"].append(["mutated"])
+    hit = cache.get("sid", "values", lambda: None, version)
+    hit["values"][0][0] = "changed"
+
+    assert cache.get("sid", "values", lambda: None, version) == {"values": [["a"]]}
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from googleapiclient.http import HttpMockSequence
+from manager.sub_agents.google_agent.tools import google_client, sheets_writes
+
+
+def test_buffer_sends_cell_updates_and_appends_in_one_request_each(monkeypatch):
+    monkeypatch.setattr(sheets_writes, "get_sheet_cache", lambda: None)
+    monkeypatch.setattr(sheets_writes, "SHEETS_WRITE_RATE", 100)
+    monkeypatch.setattr(sheets_writes, "_write_bucket", None)
+    http = HttpMockSequence([
+        ({"status": "200"}, json.dumps({"responses": [
+            {"updatedRange": "'Tab'!B2", "updatedCells": 1}, {"updatedRange": "'Tab'!AA10", "updatedCells": 1}]})),
+        ({"status": "200"}, json.dumps({"updates": {"updatedRange": "Log!A5:C7"}})),
+    ])
+    service = google_client.build_service("sheets", "v4", http=http)
+
+    with sheets_writes.SheetWriteBuffer("sid", max_delay=0, service_factory=lambda: service) as buffer:
+        first = buffer.update_cell("Tab", 2, 2, "a@example.com")
+        second = buffer.update_cell("Tab", 10, 27, "555")
+        log_a = buffer.append("Log!A1", [["1"], ["2"]])
+        log_b = buffer.append("Log!A1", [["3"]])
+        assert first.result is None
+
+    assert first.wait(1) == {"status": "success", "updatedRange": "'Tab'!B2", "updatedCells": 1}
+    assert second.result["updatedRange"] == "'Tab'!AA10"
+    assert log_a.result == {"status": "success", "appendedRows": 2, "firstRow": 5}
+    assert log_b.result == {"status": "success", "appendedRows": 1, "firstRow": 7}
+    assert buffer.requests_sent == 2 and len(http.request_sequence) == 2
+    batch_body = json.loads(http.request_sequence[0][2])
+    assert [d["range"] for d in batch_body["data"]] == ["'Tab'!B2", "'Tab'!AA10"]
+    assert json.loads(http.request_sequence[1][2])["values"] == [["1"], ["2"], ["3"]]
+
+
+def test_failed_flush_reports_an_error_for_every_write():
+    def no_service():
+        raise RuntimeError("no token")
+
+    buffer = sheets_writes.SheetWriteBuffer("sid", max_pending=2, max_delay=0, service_factory=no_service)
+    first = buffer.update("A1", [["x"]])
+    second = buffer.update("B1", [["y"]])
+
+    assert first.result == second.result == {"status": "error", "message": "no token"}
+
+
+def test_flush_keeps_queue_order_and_does_not_retry_failed_appends(monkeypatch):
+    monkeypatch.setattr(sheets_writes, "get_sheet_cache", lambda: None)
+    monkeypatch.setattr(sheets_writes, "SHEETS_WRITE_RATE", 100)
+    monkeypatch.setattr(sheets_writes, "_write_bucket", None)
+    http = HttpMockSequence([
+        ({"status": "200"}, json.dumps({"updates": {"updatedRange": "Log!A2:B2"}})),
+        ({"status": "200"}, json.dumps({"responses": [{"updatedRange": "Log!B2", "updatedCells": 1}]})),
+        ({"status": "503"}, json.dumps({"error": {"code": 503, "message": "backend error"}})),
+        ({"status": "200"}, json.dumps({"updates": {"updatedRange": "Log!A3:B3"}})),
+    ])
+    service = google_client.build_service("sheets", "v4", http=http)
+
+    with sheets_writes.SheetWriteBuffer("sid", max_delay=0, service_factory=lambda: service) as buffer:
+        added = buffer.append("Log!A1", [["1", ""]])
+        marked = buffer.update("Log!B2", [["done"]])
+        failed = buffer.append("Log!A1", [["2", ""]])
+
+    assert added.result["firstRow"] == 2 and marked.result["status"] == "success"
+    assert failed.result["status"] == "error"
+    # The failed append was sent once; the fourth response was never requested
+    assert len(http.request_sequence) == 3
+    assert [uri.split("?")[0].rsplit("/", 1)[-1] for uri, *_ in http.request_sequence] == [
+        "Log%21A1:append", "values:batchUpdate", "Log%21A1:append"]
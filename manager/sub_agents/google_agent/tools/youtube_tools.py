@@ -1,31 +1,18 @@
 import os
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from manager.sub_agents.google_agent.tools.google_client import find_token_path, get_service
+from google.adk.tools.tool_context import ToolContext
+from manager.utils.jobs import get_job_manager, job_handle, job_user
+
+YOUTUBE_SCOPES = ["https://www.googleapis.com/auth/youtube", "https://www.googleapis.com/auth/youtube.force-ssl"]
 
 # Helper to get an authenticated YouTube API client
 
 def get_token_path():
-    # Prefer environment variable if set
-    token_path = os.environ.get("YOUTUBE_TOKEN_PATH")
-    print(f"Checking YOUTUBE_TOKEN_PATH: {token_path}")
-    if token_path and os.path.exists(token_path):
-        print(f"Found token at YOUTUBE_TOKEN_PATH: {token_path}")
-        return token_path
-    # Default to project root
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../'))
-    default_path = os.path.join(project_root, "token.json")
-    print(f"Checking default path: {default_path}, exists: {os.path.exists(default_path)}")
-    if os.path.exists(default_path):
-        print(f"Found token at default path: {default_path}")
-        return default_path
-    raise FileNotFoundError("token.json not found in project root or YOUTUBE_TOKEN_PATH not set.")
+    # GOOGLE_TOKEN_PATH / YOUTUBE_TOKEN_PATH, else token.json (see google_client.find_token_path)
+    return find_token_path()
 
 def get_youtube_service():
-    creds = Credentials.from_authorized_user_file(
-        get_token_path(),
-        ["https://www.googleapis.com/auth/youtube", "https://www.googleapis.com/auth/youtube.force-ssl"]
-    )
-    return build("youtube", "v3", credentials=creds)
+    return get_service("youtube", "v3", YOUTUBE_SCOPES)
 
 # 1. Search videos
 # AFC-compatible wrappers for all YouTube tools
@@ -224,7 +211,10 @@ def youtube_unsubscribe_channel_afc(subscription_id: str):
     return youtube_unsubscribe_channel(subscription_id)
 
 # Original implementations (keep for internal use, not for AFC)
-def youtube_upload_video(file_path, title, description='', tags=None, privacy_status='private'):
+# Resumable upload chunk size when progress is reported (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+def youtube_upload_video(file_path, title, description='', tags=None, privacy_status='private', on_progress=None):
     from googleapiclient.http import MediaFileUpload
     service = get_youtube_service()
     body = {
@@ -237,11 +227,44 @@ def youtube_upload_video(file_path, title, description='', tags=None, privacy_st
             'privacyStatus': privacy_status
         }
     }
-    media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+    if on_progress is None:
+        media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+        request = service.videos().insert(part='snippet,status', body=body, media_body=media)
+        response = request.execute()
+        return {'videoId': response['id']}
+    # Upload in chunks so on_progress(fraction) can report (and a job can be cancelled) between them
+    media = MediaFileUpload(file_path, chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
     request = service.videos().insert(part='snippet,status', body=body, media_body=media)
-    response = request.execute()
+    response = None
+    while response is None:
+        status, response = request.next_chunk()
+        if status:
+            on_progress(status.progress())
     return {'videoId': response['id']}
 
+def youtube_upload_job(job, file_path, title, description='', tags=None, privacy_status='private'):
+    """Background job (manager.utils.jobs) version of youtube_upload_video, with upload progress."""
+    job.progress(0.0, f"Uploading {os.path.basename(file_path)}")
+    result = youtube_upload_video(file_path, title, description, tags, privacy_status,
+                                  on_progress=lambda fraction: job.progress(fraction, "Uploading"))
+    return dict(result, status='success')
+
+def youtube_upload_video_job_afc(file_path: str, title: str, description: str, tags: str, privacy_status: str, tool_context: ToolContext = None):
+    """
+    AFC-compatible: Start a YouTube upload as a background job and return immediately with a job ID.
+    Prefer this over youtube_upload_video_afc for large files; check progress with get_job_status.
+    tags: comma-separated string, privacy_status: 'private', 'public', or 'unlisted'
+    """
+    tag_list = [t.strip() for t in tags.split(",")] if tags else []
+    try:
+        job = get_job_manager().submit("youtube_upload", {
+            'file_path': file_path, 'title': title, 'description': description,
+            'tags': tag_list, 'privacy_status': privacy_status,
+        }, user=job_user(tool_context))
+        return job_handle(job)
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
 def youtube_update_video(video_id, title=None, description=None, tags=None):
     service = get_youtube_service()
     body = {'id': video_id, 'snippet': {}}
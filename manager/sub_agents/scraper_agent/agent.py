@@ -1,4 +1,5 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
 
 load_dotenv("../../.env")
@@ -10,14 +11,17 @@ from .scraper_tool import (
     selenium_scrape_headlines,
     simple_crawler,
     extract_linkedin_links_from_html,
-    scrape_linkedin_profile
+    scrape_linkedin_profile,
+    start_crawl_job,
+    start_linkedin_profile_job
 )
+from manager.utils.jobs import get_job_status, cancel_job
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "../../.env"))
 
 scraper_agent = LlmAgent(
     name="scraper_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "scraper_agent"),
     description="Handles advanced web scraping, crawling, and Google Custom Search using Selenium and custom tools.",
     instruction="""
 You are a scraper agent.
@@ -33,6 +37,8 @@ Available tools:
 - simple_crawler: Crawl web pages starting from a URL, returning all unique URLs found up to a given depth.
 - extract_linkedin_links_from_html: Extract all unique LinkedIn profile URLs from a block of HTML (e.g., Google search results).
 - scrape_linkedin_profile: Scrape a LinkedIn profile page and extract recruiter info (name, company, email, phone) using Selenium.
+- start_crawl_job / start_linkedin_profile_job: Same as simple_crawler / scrape_linkedin_profile, but run in the background and return a job ID immediately. Use them for deep crawls or when scraping several profiles.
+- get_job_status / cancel_job: Check on or cancel a background job by its job ID.
 
 Always explain what you are doing and report any errors to the user.
 """,
@@ -41,6 +47,10 @@ Always explain what you are doing and report any errors to the user.
         simple_crawler,
         extract_linkedin_links_from_html,
         scrape_linkedin_profile,
+        start_crawl_job,
+        start_linkedin_profile_job,
+        get_job_status,
+        cancel_job,
     ],
 )
 
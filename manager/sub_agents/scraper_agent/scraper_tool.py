@@ -27,6 +27,8 @@ def selenium_scrape_headlines(url: str) -> dict:
 import requests
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
+from google.adk.tools.tool_context import ToolContext
+from manager.utils.jobs import get_job_manager, job_handle, job_user
 
 def simple_crawler(start_url: str, max_depth: int = 2, same_domain_only: bool = True) -> dict:
     """
@@ -39,30 +41,61 @@ def simple_crawler(start_url: str, max_depth: int = 2, same_domain_only: bool =
         dict: { 'status': 'success', 'urls': [...] } or { 'status': 'error', 'message': ... }
     """
     try:
-        visited = set()
-        to_visit = [(start_url, 0)]
-        base_domain = urlparse(start_url).netloc if same_domain_only else None
-        while to_visit:
-            url, depth = to_visit.pop(0)
-            if url in visited or depth > max_depth:
-                continue
-            try:
-                resp = requests.get(url, timeout=10)
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                for link in soup.find_all('a', href=True):
-                    abs_url = urljoin(url, link['href'])
-                    parsed = urlparse(abs_url)
-                    if not parsed.scheme.startswith('http'):
-                        continue
-                    if same_domain_only and parsed.netloc != base_domain:
-                        continue
-                    if abs_url not in visited:
-                        to_visit.append((abs_url, depth + 1))
-            except Exception:
-                pass  # skip errors, keep crawling
-            visited.add(url)
-        return {'status': 'success', 'urls': sorted(visited)}
+        return {'status': 'success', 'urls': _crawl(start_url, max_depth, same_domain_only)}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+def _crawl(start_url, max_depth=2, same_domain_only=True, on_page=None):
+    # on_page(visited_count, remaining_count) is called after each page (used for job progress)
+    visited = set()
+    to_visit = [(start_url, 0)]
+    base_domain = urlparse(start_url).netloc if same_domain_only else None
+    while to_visit:
+        url, depth = to_visit.pop(0)
+        if url in visited or depth > max_depth:
+            continue
+        try:
+            resp = requests.get(url, timeout=10)
+            resp.raise_for_status()
+            soup = BeautifulSoup(resp.text, 'html.parser')
+            for link in soup.find_all('a', href=True):
+                abs_url = urljoin(url, link['href'])
+                parsed = urlparse(abs_url)
+                if not parsed.scheme.startswith('http'):
+                    continue
+                if same_domain_only and parsed.netloc != base_domain:
+                    continue
+                if abs_url not in visited:
+                    to_visit.append((abs_url, depth + 1))
+        except Exception:
+            pass  # skip errors, keep crawling
+        visited.add(url)
+        if on_page:
+            on_page(len(visited), len(to_visit))
+    return sorted(visited)
+
+def crawl_job(job, start_url: str, max_depth: int = 2, same_domain_only: bool = True) -> dict:
+    """Background job (manager.utils.jobs) version of simple_crawler, with progress and cancellation."""
+    def on_page(visited, remaining):
+        # The frontier keeps growing, so this is an estimate
+        job.progress(visited / (visited + remaining), f"Crawled {visited} pages, {remaining} queued")
+    return {'status': 'success', 'urls': _crawl(start_url, max_depth, same_domain_only, on_page=on_page)}
+
+def start_crawl_job(start_url: str, max_depth: int = 2, same_domain_only: bool = True, tool_context: ToolContext = None) -> dict:
+    """
+    Starts simple_crawler as a background job and returns immediately with a job ID.
+    Use this for deep or large crawls; check the result later with get_job_status.
+    Args:
+        start_url (str): The starting URL for the crawl.
+        max_depth (int): Maximum crawl depth (default: 2).
+        same_domain_only (bool): Only crawl links on the same domain (default: True).
+    Returns:
+        dict: { 'status': 'success', 'job_id': ..., 'message': ... } or { 'status': 'error', 'message': ... }
+    """
+    try:
+        job = get_job_manager().submit("crawl", {'start_url': start_url, 'max_depth': max_depth,
+                                                 'same_domain_only': same_domain_only}, user=job_user(tool_context))
+        return job_handle(job)
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
@@ -196,3 +229,22 @@ def scrape_linkedin_profile(url: str) -> dict:
             driver.quit()
         logging.exception('Error scraping LinkedIn profile:')
         return {'status': 'error', 'message': f'Scraping failed: {e}'}
+
+def scrape_linkedin_profile_job(job, url: str) -> dict:
+    """Background job (manager.utils.jobs) version of scrape_linkedin_profile."""
+    job.progress(None, f"Scraping {url}")
+    return scrape_linkedin_profile(url)
+
+def start_linkedin_profile_job(url: str, tool_context: ToolContext = None) -> dict:
+    """
+    Starts scrape_linkedin_profile as a background job and returns immediately with a job ID.
+    Check the result later with get_job_status.
+    Args:
+        url (str): The LinkedIn profile URL.
+    Returns:
+        dict: { 'status': 'success', 'job_id': ..., 'message': ... } or { 'status': 'error', 'message': ... }
+    """
+    try:
+        return job_handle(get_job_manager().submit("scrape_linkedin_profile", {'url': url}, user=job_user(tool_context)))
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
@@ -1,4 +1,5 @@
 from google.adk.agents import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
 from .sub_agents.linkedin_agent.agent import linkedin_agent
 from .utils.instructions_loader import load_instructions_from_file
@@ -7,7 +8,7 @@ load_dotenv("../../../.env")
 
 socialmedia_agent = LlmAgent(
     name="socialmedia_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "socialmedia_agent"),
     description="Handles social media operations, including LinkedIn interactions.",
     instruction=load_instructions_from_file("SOCIALMEDIA_AGENT_INSTRUCTIONS.md"),
     sub_agents=[linkedin_agent]
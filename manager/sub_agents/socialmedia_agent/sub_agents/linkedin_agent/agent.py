@@ -1,4 +1,5 @@
 from google.adk.agents import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from dotenv import load_dotenv
 from .utils.instructions_loader import load_instructions_from_file
 from .tools.linkedin_tools import (
@@ -16,7 +17,7 @@ load_dotenv("../../../.env")
 
 linkedin_agent = LlmAgent(
     name="linkedin_agent",
-    model="gemini-1.5-pro",
+    model=resolve_model("gemini-1.5-pro", "linkedin_agent"),
     description="Handles all LinkedIn-specific social media operations, including profile retrieval, posting, and organization event management.",
     instruction=load_instructions_from_file("LINKEDIN_AGENT_INSTRUCTIONS.md"),
     tools=[
@@ -1,4 +1,5 @@
 from google.adk.agents.llm_agent import LlmAgent
+from manager.utils.llm_backend import resolve_model
 from .tools.stock_tools import (
     get_realtime_quote,
     get_historical_data,
@@ -8,30 +9,30 @@ from .tools.stock_tools import (
     get_latest_news
 )
 from .utils.instructions_loader import load_instructions_from_file
-from google.adk.sessions import InMemorySessionService
-from google.adk.artifacts import InMemoryArtifactService
 from google.adk.runners import Runner
+from manager.utils.services import create_session_service, create_artifact_service
 from dotenv import load_dotenv
 import os
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "../../../.env"))
 
 # Session and artifact service setup
-artifact_service = InMemoryArtifactService()
-session_service = InMemorySessionService()
+artifact_service = create_artifact_service()
+session_service = create_session_service()
 
 # Runner
 runner = Runner(
     agent=None,  # Will be set after manager_agent is instantiated
     app_name="stock_agent",
-    session_service=session_service
+    session_service=session_service,
+    artifact_service=artifact_service
 )
 
 # Stock Agent
 
 stock_agent = LlmAgent(
     name="stock_agent",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash", "stock_agent"),
     description="Handles stock trading operations with the Alpaca API.",
     instruction=load_instructions_from_file("STOCK_AGENT_INSTRUCTIONS.md"),
     tools=[
@@ -42,4 +43,7 @@ stock_agent = LlmAgent(
         advise_diversification,
         get_latest_news
     ],
-)
\ No newline at end of file
+)
+
+# The stock runner drives stock_agent directly (e.g. to resume a pending trade confirmation)
+runner.agent = stock_agent
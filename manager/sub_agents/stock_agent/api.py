@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Query
-from manager.sub_agents.stock_agent.tools.stock_tools import get_realtime_quote
 
 router = APIRouter()
 
@@ -8,4 +7,6 @@ def realtime_quote(symbol: str = Query(..., description="Stock symbol, e.g. AAPL
     """
     Get a real-time quote for a given stock symbol.
     """
+    # Imported here so mounting the router doesn't load the stock agent package at server startup
+    from manager.sub_agents.stock_agent.tools.stock_tools import get_realtime_quote
     return get_realtime_quote(symbol)
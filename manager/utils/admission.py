@@ -0,0 +1,153 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't be admitted. Maps to an HTTP response with Retry-After."""
+
+    def __init__(self, status_code: int, reason: str, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A granted slot. Release it exactly once when the turn ends (extra calls are ignored)."""
+
+    def __init__(self, controller, user_id: str):
+        self._controller = controller
+        self.user_id = user_id
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+
+class AdmissionController:
+    """
+    Bounded admission for agent turns (one asyncio event loop, i.e. one uvicorn worker).
+
+    At most `max_concurrent` turns run at once. Further requests wait in a FIFO queue of at most
+    `max_queue` entries for up to `max_wait_seconds`; a full queue or a wait that runs out is
+    rejected with 503. Each user may have at most `max_per_user` requests running or queued;
+    more are rejected with 429. Rejections are immediate and carry a Retry-After estimate based
+    on recent turn durations.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_per_user: int = 4, max_queue: int = 32,
+                 max_wait_seconds: float = 10, wait_samples: int = 1000):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._running = 0
+        self._waiters = deque()
+        self._per_user = {}
+        self._wait_ms = deque(maxlen=wait_samples)
+        self._avg_turn_seconds = None
+        self._counters = {"admitted": 0, "peak_queued": 0,
+                          "rejected_user_limit": 0, "rejected_queue_full": 0, "rejected_wait_timeout": 0}
+
+    async def acquire(self, user_id: str) -> AdmissionTicket:
+        """Waits for a slot and returns a ticket, or raises AdmissionRejected."""
+        if self._per_user.get(user_id, 0) >= self.max_per_user:
+            self._counters["rejected_user_limit"] += 1
+            raise AdmissionRejected(429, "user_limit",
+                                    f"Too many requests in progress for this user (limit {self.max_per_user}).",
+                                    self._retry_after(0))
+        started = time.monotonic()
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected(503, "queue_full", "Server is busy, please retry shortly.",
+                                        self._retry_after(len(self._waiters)))
+            await self._wait_for_slot(user_id)
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self._counters["admitted"] += 1
+        self._wait_ms.append((time.monotonic() - started) * 1000)
+        return AdmissionTicket(self, user_id)
+
+    async def _wait_for_slot(self, user_id: str) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._counters["peak_queued"] = max(self._counters["peak_queued"], len(self._waiters))
+        # Count queued requests against the user too, so one client can't fill the queue
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        try:
+            # asyncio.wait doesn't cancel the future on timeout, so a slot handed over at the
+            # last moment is still seen (and used) below
+            await asyncio.wait([waiter], timeout=self.max_wait_seconds)
+        except asyncio.CancelledError:
+            # Client went away while queued; pass on a slot it was just given
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            self._decrement_user(user_id)
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            self._counters["rejected_wait_timeout"] += 1
+            raise AdmissionRejected(503, "wait_timeout", "Server is busy, please retry shortly.",
+                                    self._retry_after(len(self._waiters)))
+
+    def _decrement_user(self, user_id: str) -> None:
+        # Drop users at zero, so many distinct user IDs don't leave entries behind
+        self._per_user[user_id] -= 1
+        if not self._per_user[user_id]:
+            del self._per_user[user_id]
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        self._decrement_user(ticket.user_id)
+        duration = time.monotonic() - ticket.admitted_at
+        self._avg_turn_seconds = duration if self._avg_turn_seconds is None else (
+            0.9 * self._avg_turn_seconds + 0.1 * duration)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        # The freed slot goes straight to the oldest waiter, so `_running` doesn't change
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    def _retry_after(self, queued: int) -> int:
+        turn = self._avg_turn_seconds or 1.0
+        return max(1, math.ceil(turn * (queued + 1) / self.max_concurrent))
+
+    @asynccontextmanager
+    async def admit(self, user_id: str):
+        """`async with controller.admit(user_id):` holds a slot for the block."""
+        ticket = await self.acquire(user_id)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict:
+        """Current load, limits, counters and wait-time percentiles (ms, recent admissions)."""
+        waits = sorted(self._wait_ms)
+
+        def pct(p):
+            return waits[min(len(waits) - 1, int(round(p / 100 * (len(waits) - 1))))] if waits else 0.0
+        return {
+            "running": self._running,
+            "queued": len(self._waiters),
+            "limits": {"max_concurrent": self.max_concurrent, "max_per_user": self.max_per_user,
+                       "max_queue": self.max_queue, "max_wait_seconds": self.max_wait_seconds},
+            **self._counters,
+            "wait_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": waits[-1] if waits else 0.0},
+            "avg_turn_seconds": self._avg_turn_seconds,
+        }
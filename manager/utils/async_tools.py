@@ -0,0 +1,59 @@
+import os
+import asyncio
+import functools
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+# Sync tools (Gmail, Sheets, Selenium, ...) would otherwise run directly on the
+# event loop inside the ADK runner and stall every other request.
+TOOL_THREADS = int(os.getenv("MANAGER_TOOL_THREADS", "16"))
+
+_executor = None
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Returns the shared thread pool used to run blocking tool functions."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="agent-tool")
+    return _executor
+
+
+async def run_in_tool_thread(func, *args, **kwargs):
+    """
+    Runs a blocking callable on the tool thread pool and awaits its result.
+    The caller's context variables are carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_tool_executor(), call)
+
+
+def to_async_tool(func):
+    """
+    Wraps a synchronous tool function in a coroutine that runs it on the tool thread pool.
+    The wrapper keeps the original name, docstring and signature so ADK builds the same declaration.
+    """
+    if inspect.iscoroutinefunction(func) or getattr(func, "__offloaded__", False):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_tool_thread(func, *args, **kwargs)
+
+    wrapper.__offloaded__ = True
+    return wrapper
+
+
+def offload_sync_tools(agent) -> None:
+    """
+    Replaces plain-function tools on `agent` and all of its sub-agents with thread-pool wrappers.
+    BaseTool instances are left untouched.
+    """
+    tools = getattr(agent, "tools", None)
+    if tools:
+        agent.tools = [to_async_tool(t) if inspect.isfunction(t) else t for t in tools]
+    for sub_agent in getattr(agent, "sub_agents", []) or []:
+        offload_sync_tools(sub_agent)
@@ -0,0 +1,19 @@
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def data_path(filename: str, create: bool = True) -> str:
+    """
+    Returns the path of a local state file (SQLite databases, caches) inside the data directory.
+    The directory is LENOAI_DATA_DIR if set, otherwise `data/` in the project root; it is created on demand.
+    Args:
+        filename (str): File name within the data directory (e.g., 'task_history.db')
+        create (bool): Create the directory now; pass False when the file may never be written.
+    Returns:
+        str: Absolute path to the file.
+    """
+    base = os.path.abspath(os.getenv("LENOAI_DATA_DIR", os.path.join(PROJECT_ROOT, "data")))
+    if create:
+        os.makedirs(base, exist_ok=True)
+    return os.path.join(base, filename)
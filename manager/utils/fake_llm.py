@@ -0,0 +1,103 @@
+import asyncio
+import json
+import re
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Text reply used when an agent has no script entry for the message
+DEFAULT_REPLY = "[{agent}] fake reply to: {message}"
+
+
+def load_script(path: str) -> dict:
+    """
+    Reads a fake-LLM script. Format:
+        {
+          "default_reply": "optional template, {agent} and {message} are substituted",
+          "agents": {
+            "<agent name>": [
+              {"match": "optional regex on the user's message",
+               "steps": [{"function_call": {"name": "...", "args": {...}}},
+                         {"text": "...", "latency_ms": 50}]}
+            ]
+          }
+        }
+    The first entry whose `match` is found (or that has no `match`) is replayed: step N answers
+    the model call made after the agent's Nth tool result in the current turn.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        script = json.load(f)
+    for entries in script.get("agents", {}).values():
+        for entry in entries:
+            entry["_match"] = re.compile(entry["match"]) if entry.get("match") else None
+    return script
+
+
+def _last_user_text(llm_request: LlmRequest) -> str:
+    # Other agents' turns reach a sub-agent as "For context: ..." user messages; skip those
+    for content in reversed(llm_request.contents or []):
+        texts = [part.text for part in content.parts or [] if part.text]
+        if content.role == "user" and texts and not texts[0].startswith("For context:"):
+            return texts[-1]
+    return ""
+
+
+def _step_index(llm_request: LlmRequest) -> int:
+    # Number of tool results at the end of the conversation, i.e. how many steps already ran this turn
+    index = 0
+    for content in reversed(llm_request.contents or []):
+        parts = content.parts or []
+        if parts and all(part.function_response for part in parts):
+            index += 1
+        elif not (parts and all(part.function_call for part in parts)):
+            break
+    return index
+
+
+class FakeLlm(BaseLlm):
+    """
+    Deterministic stand-in for Gemini, for offline tests and benchmarks (LLM_BACKEND=fake).
+    Replays scripted function calls and text after `latency_ms`; with no script entry it
+    answers every message with DEFAULT_REPLY. Streaming calls yield the text in partial chunks
+    followed by the full response, like the Gemini SSE API.
+    """
+
+    agent_name: str = ""
+    latency_ms: float = 0
+    script: dict = {}
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+        message = _last_user_text(llm_request)
+        step = self._pick_step(message, _step_index(llm_request))
+        latency_ms = step.get("latency_ms", self.latency_ms)
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if "function_call" in step:
+            call = step["function_call"]
+            part = types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+            yield LlmResponse(content=types.Content(role="model", parts=[part]))
+            return
+
+        text = step["text"]
+        if stream:
+            chunk = max(1, len(text) // 3)
+            for start in range(0, len(text), chunk):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text[start:start + chunk])]),
+                                  partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+    def _pick_step(self, message: str, index: int) -> dict:
+        for entry in self.script.get("agents", {}).get(self.agent_name, []):
+            if entry["_match"] is None or entry["_match"].search(message):
+                steps = entry["steps"]
+                # Past the end of the script: repeat the final step if it is text, otherwise stop with a reply
+                if index < len(steps):
+                    return steps[index]
+                if "text" in steps[-1]:
+                    return steps[-1]
+                break
+        template = self.script.get("default_reply", DEFAULT_REPLY)
+        return {"text": template.format(agent=self.agent_name, message=message)}
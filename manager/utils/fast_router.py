@@ -0,0 +1,133 @@
+import json
+import os
+import re
+import threading
+
+# Rules shipped with the repo; ROUTER_RULES_PATH points at a replacement file
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), '..', 'router_rules.json')
+
+
+class FastRouter:
+    """
+    Deterministic pre-router that sends clearly scoped messages straight to a sub-agent,
+    skipping the manager LLM call that would otherwise only decide the transfer.
+
+    Rule types (see manager/router_rules.json):
+        state     routes while `key` is set (truthy) in the conversation's session state,
+                  e.g. a trade waiting for confirmation. Checked before message rules.
+        keywords  matches when the message contains any of `any` and all of `all`
+                  (case-insensitive, whole words/phrases) and none of `none`.
+        regex     matches when any pattern in `patterns` is found (use inline flags such as (?i)).
+
+    A message is routed only if its message rules all point at the same agent; anything matching
+    `skip_patterns` (multi-step requests) or rules for several agents falls through to the manager.
+    """
+
+    def __init__(self, config: dict):
+        self.skip_patterns = [re.compile(p) for p in config.get("skip_patterns", [])]
+        self.state_rules = []
+        self.message_rules = []
+        for rule in config.get("rules", []):
+            kind = rule.get("type")
+            if kind == "state":
+                self.state_rules.append(rule)
+            elif kind == "keywords":
+                self.message_rules.append(dict(rule, _match=self._compile_keywords(rule)))
+            elif kind == "regex":
+                patterns = [re.compile(p) for p in rule["patterns"]]
+                self.message_rules.append(dict(rule, _match=lambda text, ps=patterns: any(p.search(text) for p in ps)))
+            else:
+                raise ValueError(f"Unknown router rule type '{kind}' in rule '{rule.get('name')}'")
+        self._lock = threading.Lock()
+        self._stats = {"messages": 0, "routed": 0, "ambiguous": 0, "skipped": 0, "by_rule": {}}
+
+    @staticmethod
+    def _compile_keywords(rule: dict):
+        def words(key):
+            terms = rule.get(key, [])
+            if not terms:
+                return None
+            return [re.compile(r"(?<!\w)" + re.escape(t.lower()) + r"(?!\w)") for t in terms]
+        any_of, all_of, none_of = words("any"), words("all"), words("none")
+
+        def match(text):
+            text = text.lower()
+            return ((any_of is None or any(p.search(text) for p in any_of))
+                    and (all_of is None or all(p.search(text) for p in all_of))
+                    and not (none_of and any(p.search(text) for p in none_of)))
+        return match
+
+    @property
+    def needs_state(self) -> bool:
+        """True if any rule looks at session state (so callers can skip fetching the session otherwise)."""
+        return bool(self.state_rules)
+
+    def route(self, message: str, state: dict = None):
+        """
+        Returns (agent_name, rule_name) for the sub-agent that should handle the message directly,
+        or None to let the manager LLM decide.
+        Args:
+            message (str): The user's message.
+            state (dict): The conversation's session state (only needed for state rules).
+        """
+        result, outcome = self._route(message, state or {})
+        with self._lock:
+            self._stats["messages"] += 1
+            if outcome:
+                self._stats[outcome] += 1
+            if result:
+                self._stats["routed"] += 1
+                self._stats["by_rule"][result[1]] = self._stats["by_rule"].get(result[1], 0) + 1
+        return result
+
+    def _route(self, message: str, state: dict):
+        for rule in self.state_rules:
+            if state.get(rule["key"]):
+                return (rule["agent"], rule["name"]), None
+        if any(p.search(message) for p in self.skip_patterns):
+            return None, "skipped"
+        matches = [rule for rule in self.message_rules if rule["_match"](message)]
+        agents = {rule["agent"] for rule in matches}
+        if len(agents) > 1:
+            return None, "ambiguous"
+        if matches:
+            return (matches[0]["agent"], matches[0]["name"]), None
+        return None, None
+
+    def stats(self) -> dict:
+        """Routing counters; `hit_rate` is the share of messages that skipped the manager LLM call."""
+        with self._lock:
+            stats = dict(self._stats, by_rule=dict(self._stats["by_rule"]))
+        stats["manager_llm_calls_saved"] = stats["routed"]
+        stats["hit_rate"] = stats["routed"] / stats["messages"] if stats["messages"] else 0.0
+        return stats
+
+
+def load_router(path: str = None) -> FastRouter:
+    """Builds a router from a JSON rules file (ROUTER_RULES_PATH or the bundled router_rules.json)."""
+    path = path or os.getenv("ROUTER_RULES_PATH") or DEFAULT_RULES_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        return FastRouter(json.load(f))
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_fast_router():
+    """
+    Process-wide router, or None when FAST_ROUTER_ENABLED=false.
+    Loaded on first use; a broken rules file disables routing rather than failing every turn.
+    """
+    global _router
+    if os.getenv("FAST_ROUTER_ENABLED", "true").lower() != "true":
+        return None
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                try:
+                    _router = load_router()
+                except (OSError, ValueError, KeyError, re.error) as e:
+                    print(f"[FastRouter] Failed to load rules, routing disabled: {e}")
+                    _router = FastRouter({})
+    return _router
@@ -0,0 +1,336 @@
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from manager.utils.data_dir import data_path
+
+# Job kind -> "module:function". Functions are imported in the worker thread on first use and are
+# called as func(job: JobContext, **params) -> dict.
+JOB_KINDS = {
+    "crawl": "manager.sub_agents.scraper_agent.scraper_tool:crawl_job",
+    "scrape_linkedin_profile": "manager.sub_agents.scraper_agent.scraper_tool:scrape_linkedin_profile_job",
+    "youtube_upload": "manager.sub_agents.google_agent.tools.youtube_tools:youtube_upload_job",
+    "gmail_bulk_send": "manager.sub_agents.google_agent.tools.gmail_tools:send_bulk_gmail_job",
+}
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+_COLUMNS = ("id", "kind", "params", "user", "status", "progress", "message", "result", "error",
+            "cancel_requested", "owner", "created_at", "started_at", "finished_at", "updated_at")
+_JSON_COLUMNS = ("params", "result")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job (by JobContext) once cancellation has been requested."""
+
+
+class JobStore:
+    """Job records in SQLite (WAL mode), shared by every worker process using the same file."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    user TEXT,
+                    status TEXT NOT NULL,
+                    progress REAL,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(user, created_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> dict:
+        job = dict(zip(_COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, kind: str, params: dict, user: str, owner: str) -> dict:
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "kind": kind, "params": params, "user": user, "status": "queued",
+               "progress": 0.0, "message": None, "result": None, "error": None, "cancel_requested": False,
+               "owner": owner, "created_at": now, "started_at": None, "finished_at": None, "updated_at": now}
+        row = dict(job, params=json.dumps(params), cancel_requested=0)
+        with self._conn() as conn:
+            conn.execute(f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                         tuple(row[c] for c in _COLUMNS))
+        return job
+
+    def get(self, job_id: str):
+        row = self._conn().execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, user: str = None, status: str = None, limit: int = 50) -> list:
+        filters, params = [], []
+        for column, value in (("user", user), ("status", status)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs {where} ORDER BY created_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def update(self, job_id: str, only_if_status: tuple = None, **fields) -> bool:
+        """Updates fields (JSON-encoding params/result). Returns False if the job isn't in `only_if_status`."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        values = [json.dumps(v, default=str) if c in _JSON_COLUMNS and v is not None else v for c, v in fields.items()]
+        where = "id = ?"
+        if only_if_status:
+            where += f" AND status IN ({', '.join('?' * len(only_if_status))})"
+            values += [job_id, *only_if_status]
+        else:
+            values.append(job_id)
+        with self._conn() as conn:
+            return conn.execute(f"UPDATE jobs SET {assignments} WHERE {where}", values).rowcount > 0
+
+    def cancel_requested(self, job_id: str) -> bool:
+        row = self._conn().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def fail_abandoned(self, host: str, is_alive) -> int:
+        """Marks unfinished jobs owned by dead processes on this host as failed. Returns how many."""
+        rows = self._conn().execute(
+            "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running') AND owner LIKE ?", (f"{host}:%",)
+        ).fetchall()
+        abandoned = [job_id for job_id, owner in rows if not is_alive(int(owner.rsplit(":", 1)[1]))]
+        for job_id in abandoned:
+            self.update(job_id, only_if_status=("queued", "running"), status="failed",
+                        error="Interrupted: the worker running this job exited.", finished_at=time.time())
+        return len(abandoned)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobContext:
+    """Handle passed to a running job for reporting progress and checking for cancellation."""
+
+    # Seconds between database checks for a cancel requested through another worker
+    CANCEL_POLL_INTERVAL = 1.0
+
+    def __init__(self, manager, job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self._last_poll = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        event = self.manager._cancel_events.get(self.job_id)
+        if event is not None and event.is_set():
+            return True
+        now = time.monotonic()
+        if now - self._last_poll >= self.CANCEL_POLL_INTERVAL:
+            self._last_poll = now
+            if self.manager.store.cancel_requested(self.job_id):
+                if event is not None:
+                    event.set()
+                return True
+        return False
+
+    def check_cancelled(self) -> None:
+        """Raises JobCancelled if the job should stop. Call it between units of work."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, fraction: float = None, message: str = None) -> None:
+        """Records progress (0..1, or None if unknown) and a status message, then checks for cancellation."""
+        fields = {"message": message}
+        if fraction is not None:
+            fields["progress"] = max(0.0, min(1.0, fraction))
+        self.manager.store.update(self.job_id, only_if_status=("running",), **fields)
+        self.check_cancelled()
+
+
+class JobManager:
+    """
+    Runs long tool work (crawls, Selenium scrapes, uploads) on a local thread pool, outside any
+    HTTP request or agent turn. Job records are persisted in JobStore; cancellation is cooperative
+    (jobs call JobContext.progress / check_cancelled between steps).
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = 4):
+        self.store = store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._cancel_events = {}
+        abandoned = store.fail_abandoned(socket.gethostname(), _pid_alive)
+        if abandoned:
+            print(f"[JobManager] Marked {abandoned} job(s) from exited workers as failed.")
+
+    def submit(self, kind: str, params: dict = None, user: str = None) -> dict:
+        """
+        Records a job and queues it. Returns the job record immediately.
+        Raises ValueError for an unknown kind.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Known kinds: {', '.join(sorted(JOB_KINDS))}.")
+        job = self.store.create(kind, params or {}, user, self.owner)
+        self._cancel_events[job["id"]] = threading.Event()
+        self._executor.submit(self._run, job["id"], kind, params or {})
+        return job
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def list(self, user: str = None, status: str = None, limit: int = 50) -> list:
+        return self.store.list(user=user, status=status, limit=limit)
+
+    def cancel(self, job_id: str):
+        """
+        Requests cancellation. A queued job is cancelled at once; a running one stops at its next
+        progress/cancel check. Returns the updated job, or None if it doesn't exist.
+        """
+        if self.store.get(job_id) is None:
+            return None
+        self.store.update(job_id, only_if_status=("queued", "running"), cancel_requested=1)
+        self.store.update(job_id, only_if_status=("queued",), status="cancelled", finished_at=time.time())
+        event = self._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+        return self.store.get(job_id)
+
+    def shutdown(self) -> None:
+        """Stops accepting work, asks running jobs to stop and marks unfinished local jobs as failed."""
+        for event in list(self._cancel_events.values()):
+            event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for job_id in list(self._cancel_events):
+            self.store.update(job_id, only_if_status=("queued", "running"), status="failed",
+                              error="Interrupted: server shut down.", finished_at=time.time())
+
+    def _run(self, job_id: str, kind: str, params: dict) -> None:
+        try:
+            # Claim the job; it may have been cancelled while queued
+            if not self.store.update(job_id, only_if_status=("queued",), status="running", started_at=time.time()):
+                return
+            context = JobContext(self, job_id)
+            try:
+                module_name, func_name = JOB_KINDS[kind].split(":")
+                func = getattr(importlib.import_module(module_name), func_name)
+                context.check_cancelled()
+                result = func(context, **params)
+            except JobCancelled:
+                self.store.update(job_id, only_if_status=("running",), status="cancelled", finished_at=time.time())
+                return
+            except Exception as e:
+                print(f"[JobManager] Job {job_id} ({kind}) failed: {e}")
+                self.store.update(job_id, only_if_status=("running",), status="failed", error=str(e),
+                                  finished_at=time.time())
+                return
+            # Tools report failures as {"status": "error", "message": ...} rather than raising
+            if isinstance(result, dict) and result.get("status") == "error":
+                self.store.update(job_id, only_if_status=("running",), status="failed", result=result,
+                                  error=result.get("message"), finished_at=time.time())
+            else:
+                self.store.update(job_id, only_if_status=("running",), status="succeeded", result=result,
+                                  progress=1.0, finished_at=time.time())
+        finally:
+            self._cancel_events.pop(job_id, None)
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager (JOBS_DB_PATH or data/jobs.db, JOB_WORKERS threads), created on first use."""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(
+                    JobStore(os.getenv("JOBS_DB_PATH") or data_path("jobs.db")),
+                    max_workers=int(os.getenv("JOB_WORKERS", "4")),
+                )
+    return _job_manager
+
+
+def shutdown_job_manager() -> None:
+    """Shuts down the job manager if this process created one."""
+    if _job_manager is not None:
+        _job_manager.shutdown()
+
+
+def job_user(tool_context) -> str:
+    """User ID of the conversation a tool is running in (None outside an agent turn)."""
+    # ToolContext doesn't expose the user publicly in this ADK version
+    invocation = getattr(tool_context, "_invocation_context", None)
+    return invocation.user_id if invocation is not None else None
+
+
+def job_handle(job: dict) -> dict:
+    """What an agent tool returns instead of blocking: the job ID and where to follow it."""
+    return {
+        "status": "success",
+        "job_id": job["id"],
+        "job_status": job["status"],
+        "message": f"Started background job {job['id']} ({job['kind']}). "
+                   f"Check it with get_job_status or follow /api/jobs/{job['id']}/events.",
+    }
+
+
+def get_job_status(job_id: str) -> dict:
+    """
+    Returns the status of a background job started by one of the *_job tools.
+    Args:
+        job_id (str): The job ID returned when the job was started.
+    Returns:
+        dict: {"status": "success", "job": {...}} with job status, progress, message and result, or {"status": "error", "message": ...}
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return {"status": "error", "message": f"No job with ID {job_id}."}
+    return {"status": "success", "job": {k: job[k] for k in ("id", "kind", "status", "progress", "message", "result", "error")}}
+
+
+def cancel_job(job_id: str) -> dict:
+    """
+    Cancels a queued or running background job.
+    Args:
+        job_id (str): The job ID returned when the job was started.
+    Returns:
+        dict: {"status": "success", "job_status": ...} or {"status": "error", "message": ...}
+    """
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return {"status": "error", "message": f"No job with ID {job_id}."}
+    return {"status": "success", "job_status": job["status"]}
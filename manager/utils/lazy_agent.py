@@ -0,0 +1,45 @@
+from typing import AsyncGenerator
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.events.event import Event
+
+from manager import agent_registry
+from manager.utils.async_tools import run_in_tool_thread
+
+
+class LazyAgent(LlmAgent):
+    """
+    Placeholder for a registered sub-agent (see manager.agent_registry).
+
+    It carries only the name and description the parent needs for agent transfer. The real agent
+    module is imported the first time the placeholder runs, and the run is delegated to it.
+    It subclasses LlmAgent so the runner still treats it as transferable and can resume a
+    conversation directly with the sub-agent that answered last.
+    """
+
+    @classmethod
+    def from_registry(cls, name: str) -> "LazyAgent":
+        return cls(name=name, description=agent_registry.SUB_AGENTS[name]["description"])
+
+    async def _load(self):
+        agent = agent_registry.get_loaded(self.name)
+        if agent is None:
+            # Importing can take a while (selenium, googleapiclient, ...), so keep it off the event loop
+            agent = await run_in_tool_thread(agent_registry.load_sub_agent, self.name)
+        return agent
+
+    async def run_async(self, parent_context: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = await self._load()
+        async for event in agent.run_async(parent_context):
+            yield event
+
+    async def run_live(self, parent_context: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = await self._load()
+        async for event in agent.run_live(parent_context):
+            yield event
+
+    def find_sub_agent(self, name: str):
+        # Nested agents (e.g. linkedin_agent) are only reachable once the real agent is loaded
+        agent = agent_registry.get_loaded(self.name)
+        return agent.find_sub_agent(name) if agent is not None else None
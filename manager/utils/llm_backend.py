@@ -0,0 +1,27 @@
+import os
+
+_fake_script = None
+
+
+def resolve_model(model: str, agent_name: str):
+    """
+    Returns the `model` argument for an LlmAgent: the model name itself, or a FakeLlm
+    when LLM_BACKEND=fake (script from FAKE_LLM_SCRIPT, delay from FAKE_LLM_LATENCY_MS).
+    """
+    global _fake_script
+    # Read at call time: agent modules load .env themselves, possibly after this module is imported
+    backend = os.getenv("LLM_BACKEND", "gemini").lower()
+    if backend == "gemini":
+        return model
+    if backend != "fake":
+        raise ValueError(f"Unknown LLM_BACKEND '{backend}'. Use 'gemini' or 'fake'.")
+    from manager.utils.fake_llm import FakeLlm, load_script
+    if _fake_script is None:
+        script_path = os.getenv("FAKE_LLM_SCRIPT")
+        _fake_script = load_script(script_path) if script_path else {}
+    return FakeLlm(
+        model=model,
+        agent_name=agent_name,
+        latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+        script=_fake_script,
+    )
@@ -0,0 +1,240 @@
+"""
+In-process metrics in the Prometheus text exposition format (no client library needed).
+
+Counters and histograms are kept per worker process and served by /api/metrics. Recording an
+observation is a perf_counter() call, a dict lookup and a short locked update.
+"""
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+# Seconds; covers fast local tools up to multi-minute scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    parts = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labelvalues, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (e.g. current queue depth)."""
+
+    def __init__(self, name: str, documentation: str, read):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def render(self) -> list:
+        try:
+            value = self.read()
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+_metrics = []
+
+
+def _register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_gauge(name: str, documentation: str, read) -> Gauge:
+    """Adds a gauge whose value is `read()` at scrape time."""
+    return _register(Gauge(name, documentation, read))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format."""
+    lines = []
+    for metric in list(_metrics):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+TOOL_CALLS = _register(Counter("lenoai_tool_calls_total", "Tool calls by agent, tool and outcome.", ("agent", "tool", "outcome")))
+TOOL_DURATION = _register(Histogram("lenoai_tool_duration_seconds", "Tool call latency, including thread pool wait.", ("agent", "tool")))
+LLM_CALLS = _register(Counter("lenoai_llm_calls_total", "Model calls by agent and outcome.", ("agent", "outcome")))
+LLM_DURATION = _register(Histogram("lenoai_llm_duration_seconds", "Model call latency (request to complete response).", ("agent",)))
+TRANSFERS = _register(Counter("lenoai_agent_transfers_total", "Control transfers between agents (from=router for fast-path routes).", ("from_agent", "to_agent")))
+TRANSFER_DURATION = _register(Histogram("lenoai_agent_transfer_seconds", "Time from a transfer until the target agent produces its first event.", ("to_agent",)))
+TURNS = _register(Counter("lenoai_turns_total", "Chat turns by outcome.", ("outcome",)))
+TURN_DURATION = _register(Histogram("lenoai_turn_duration_seconds", "End-to-end turn latency.", ()))
+
+
+class TurnObserver:
+    """Records turn latency/outcome and agent transfers from the events of one turn."""
+
+    def __init__(self, routed_to: str = None):
+        self.started = time.perf_counter()
+        self._transfer_target = None
+        self._transfer_started = None
+        if routed_to:
+            TRANSFERS.inc("router", routed_to)
+            self._transfer_target, self._transfer_started = routed_to, self.started
+
+    def event(self, event) -> None:
+        now = time.perf_counter()
+        if self._transfer_target and event.author == self._transfer_target:
+            TRANSFER_DURATION.observe(now - self._transfer_started, self._transfer_target)
+            self._transfer_target = None
+        target = event.actions.transfer_to_agent if event.actions else None
+        if target:
+            TRANSFERS.inc(event.author, target)
+            self._transfer_target, self._transfer_started = target, now
+
+    def finish(self, outcome: str) -> None:
+        TURNS.inc(outcome)
+        TURN_DURATION.observe(time.perf_counter() - self.started)
+
+
+def _is_error(result) -> bool:
+    # Tools report failures as {"status": "error", ...} (or {"error": ...} from ADK arg validation)
+    return isinstance(result, dict) and (result.get("status") == "error" or set(result) == {"error"})
+
+
+def instrument_tool(func, agent_name: str):
+    """Wraps an (async) tool function to record call counts, errors and latency. Keeps the signature."""
+    if getattr(func, "__instrumented__", False):
+        return func
+    tool_name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                if not _is_error(result):
+                    outcome = "success"
+                return result
+            finally:
+                TOOL_DURATION.observe(time.perf_counter() - started, agent_name, tool_name)
+                TOOL_CALLS.inc(agent_name, tool_name, outcome)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                if not _is_error(result):
+                    outcome = "success"
+                return result
+            finally:
+                TOOL_DURATION.observe(time.perf_counter() - started, agent_name, tool_name)
+                TOOL_CALLS.inc(agent_name, tool_name, outcome)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+# (invocation_id, agent_name) -> model call start; one call per agent is in flight per invocation
+_llm_started = {}
+
+
+def _before_model(callback_context, llm_request):
+    if len(_llm_started) > 10000:
+        # Entries of calls that raised (no after-callback) would otherwise pile up
+        _llm_started.clear()
+    _llm_started[(callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    if llm_response.partial:
+        return None
+    started = _llm_started.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if started is not None:
+        LLM_DURATION.observe(time.perf_counter() - started, callback_context.agent_name)
+    LLM_CALLS.inc(callback_context.agent_name, "error" if llm_response.error_code else "success")
+    return None
+
+
+def add_agent_callback(agent, field: str, callback) -> None:
+    """Appends `callback` to an agent callback field (None, one callable or a list) unless it is already there."""
+    existing = getattr(agent, field)
+    callbacks = existing if isinstance(existing, list) else ([existing] if existing else [])
+    if callback not in callbacks:
+        setattr(agent, field, callbacks + [callback])
+
+
+def instrument_agent(agent) -> None:
+    """
+    Instruments `agent` and its sub-agents: every plain-function tool is wrapped with
+    instrument_tool, and model calls are timed with before/after model callbacks.
+    """
+    tools = getattr(agent, "tools", None)
+    if tools:
+        agent.tools = [instrument_tool(t, agent.name) if inspect.isfunction(t) else t for t in tools]
+    if hasattr(agent, "before_model_callback"):
+        add_agent_callback(agent, "before_model_callback", _before_model)
+        add_agent_callback(agent, "after_model_callback", _after_model)
+    for sub_agent in getattr(agent, "sub_agents", []) or []:
+        instrument_agent(sub_agent)
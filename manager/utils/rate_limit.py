@@ -0,0 +1,81 @@
+"""
+Token-bucket rate limiting for calls to quota-limited APIs, shared by every thread of a process,
+and call_with_retry for sending API requests through a bucket with exponential backoff.
+"""
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average with bursts of up to `capacity`.
+    Thread-safe; acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            return
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        """Takes `tokens`, waiting as needed. Returns False if that would take longer than `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = max(self._paused_until - now, (tokens - self._tokens) / self.rate)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hands out no tokens for `seconds` (e.g. after the API answered 429); refilling restarts after the pause."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+def _status(error: Exception):
+    """HTTP status of an API error (googleapiclient's HttpError keeps the response in .resp), else None."""
+    return getattr(getattr(error, "resp", None), "status", None)
+
+
+def call_with_retry(request, bucket: TokenBucket, retry_statuses=(429,), is_retryable=None,
+                    max_attempts: int = 5, backoff_seconds: float = 2.0, should_stop=None):
+    """
+    Executes `request` (an API request with execute(), or a function without arguments), taking a
+    token from `bucket` before every attempt. Errors whose HTTP status is in `retry_statuses`, or
+    for which is_retryable(error) is true, are retried up to max_attempts in total with exponential
+    backoff and jitter, starting at backoff_seconds; other errors are raised at once. Rate-limit
+    answers (429 and retried 403s) also pause the bucket, so every caller sharing it backs off.
+    should_stop() is checked before each retry; when it returns true the last error is raised.
+    """
+    execute = getattr(request, "execute", request)
+    for attempt in range(1, max_attempts + 1):
+        bucket.acquire()
+        try:
+            return execute()
+        except Exception as e:
+            status = _status(e)
+            retryable = status in retry_statuses or bool(is_retryable and is_retryable(e))
+            if attempt == max_attempts or not retryable or (should_stop and should_stop()):
+                raise
+            delay = backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            if status in (403, 429):
+                bucket.pause(delay)
+            time.sleep(delay)
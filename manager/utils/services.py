@@ -0,0 +1,37 @@
+import os
+from google.adk.sessions import InMemorySessionService
+from google.adk.artifacts import InMemoryArtifactService
+from manager.utils.data_dir import data_path
+
+# "memory" keeps everything in-process (single worker only); "sqlite" shares a local database file
+# between uvicorn workers; "database" uses ADK's DatabaseSessionService with SESSION_DB_URL.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+ARTIFACT_BACKEND = os.getenv("ARTIFACT_BACKEND", "sqlite" if SESSION_BACKEND != "memory" else "memory").lower()
+
+
+def sessions_are_shared() -> bool:
+    """True when the session store is shared with other processes (not in-memory)."""
+    return SESSION_BACKEND != "memory"
+
+
+def create_session_service():
+    """Returns the session service selected by SESSION_BACKEND."""
+    if SESSION_BACKEND == "sqlite":
+        from manager.utils.sqlite_session_service import SqliteSessionService
+        return SqliteSessionService(os.getenv("SESSION_DB_PATH") or data_path("sessions.db"))
+    if SESSION_BACKEND == "database":
+        from google.adk.sessions import DatabaseSessionService
+        return DatabaseSessionService(os.environ["SESSION_DB_URL"])
+    if SESSION_BACKEND != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}'. Use 'memory', 'sqlite' or 'database'.")
+    return InMemorySessionService()
+
+
+def create_artifact_service():
+    """Returns the artifact service selected by ARTIFACT_BACKEND."""
+    if ARTIFACT_BACKEND == "sqlite":
+        from manager.utils.sqlite_artifact_service import SqliteArtifactService
+        return SqliteArtifactService(os.getenv("ARTIFACT_DB_PATH") or data_path("artifacts.db"))
+    if ARTIFACT_BACKEND != "memory":
+        raise ValueError(f"Unknown ARTIFACT_BACKEND '{ARTIFACT_BACKEND}'. Use 'memory' or 'sqlite'.")
+    return InMemoryArtifactService()
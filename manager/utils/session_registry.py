@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Fallbacks for callers (CLI, scripts) that don't identify the user or conversation.
+# The server imports these at startup, so this module doesn't import ADK at the top level.
+DEFAULT_USER_ID = "user_1"
+DEFAULT_CONVERSATION_ID = "session_001"
+
+
+
+def _existence_check_config():
+    from google.adk.sessions.base_session_service import GetSessionConfig
+    # Only checks the session exists; don't load the whole event history
+    return GetSessionConfig(num_recent_events=1)
+
+
+class SessionRegistry:
+    """
+    Maps (user_id, conversation_id) pairs to ADK sessions.
+
+    Existing sessions are reused instead of being recreated on every message. Sessions idle for
+    longer than `ttl_seconds` expire, and at most `max_sessions` are kept (least recently used
+    are evicted first). Expired and evicted sessions are deleted from the session service so
+    memory stays bounded no matter how many conversations have been seen.
+
+    With `shared=True` the session service is shared with other worker processes (e.g. SQLite), so
+    another worker may still be using a session this one evicts. LRU eviction then only forgets the
+    local entry, and an expired session is deleted only if the store shows it idle as well.
+    """
+
+    def __init__(self, session_service, app_name: str, ttl_seconds: float = 3600, max_sessions: int = 1000,
+                 shared: bool = False):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.shared = shared
+        # (user_id, session_id) -> last used (monotonic seconds), oldest first
+        self._last_used = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, user_id: str, conversation_id: str) -> str:
+        """
+        Returns the session ID for the conversation, creating the session if it does not exist.
+        Args:
+            user_id (str): ID of the user owning the conversation.
+            conversation_id (str): Client-provided conversation ID (used as the session ID).
+        Returns:
+            str: The session ID to pass to the runner.
+        """
+        key = (user_id, conversation_id)
+        now = time.monotonic()
+        with self._lock:
+            expired = self._pop_expired(now)
+            known = key in self._last_used
+            if known:
+                self._last_used[key] = now
+                self._last_used.move_to_end(key)
+        self._delete(expired, expired=True)
+        if known:
+            return conversation_id
+
+        session = self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=conversation_id,
+            config=_existence_check_config(),
+        )
+        if session is None:
+            self.session_service.create_session(
+                app_name=self.app_name, user_id=user_id, session_id=conversation_id
+            )
+        with self._lock:
+            self._last_used[key] = now
+            self._last_used.move_to_end(key)
+            evicted = []
+            while len(self._last_used) > self.max_sessions:
+                evicted.append(self._last_used.popitem(last=False)[0])
+        self._delete(evicted)
+        return conversation_id
+
+    def expire_idle(self) -> int:
+        """Deletes every session idle for longer than the TTL. Returns the number removed."""
+        with self._lock:
+            expired = self._pop_expired(time.monotonic())
+        self._delete(expired, expired=True)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._last_used)
+
+    def _pop_expired(self, now: float) -> list:
+        # Entries are kept in last-used order, so expired ones are always at the front
+        expired = []
+        while self._last_used:
+            key, last_used = next(iter(self._last_used.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            self._last_used.popitem(last=False)
+            expired.append(key)
+        return expired
+
+    def _delete(self, keys: list, expired: bool = False) -> None:
+        if self.shared and not expired:
+            return
+        for user_id, session_id in keys:
+            try:
+                if self.shared:
+                    # Keep sessions another worker touched recently
+                    session = self.session_service.get_session(
+                        app_name=self.app_name, user_id=user_id, session_id=session_id,
+                        config=_existence_check_config(),
+                    )
+                    if session is None or time.time() - session.last_update_time <= self.ttl_seconds:
+                        continue
+                self.session_service.delete_session(
+                    app_name=self.app_name, user_id=user_id, session_id=session_id
+                )
+            except Exception as e:
+                print(f"[SessionRegistry] Failed to delete session {session_id} for {user_id}: {e}")
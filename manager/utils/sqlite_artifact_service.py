@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+from typing import Optional
+
+from google.adk.artifacts.base_artifact_service import BaseArtifactService
+from google.genai import types
+
+from manager.utils.async_tools import run_in_tool_thread
+
+
+class SqliteArtifactService(BaseArtifactService):
+    """
+    ADK artifact service stored in a local SQLite database, shareable by several worker processes.
+    Every save adds a new version; `user:`-prefixed filenames are scoped to the user instead of the session.
+    Database calls run on the tool thread pool so they never block the event loop.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    part TEXT NOT NULL,
+                    PRIMARY KEY (app_name, user_id, scope, filename, version)
+                )
+            """)
+
+    @staticmethod
+    def _scope(session_id: str, filename: str) -> str:
+        # Same namespacing rule as InMemoryArtifactService
+        return "user" if filename.startswith("user:") else session_id
+
+    async def save_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                            artifact: types.Part) -> int:
+        return await run_in_tool_thread(
+            self._save, app_name, user_id, self._scope(session_id, filename), filename, artifact
+        )
+
+    async def load_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                            version: Optional[int] = None) -> Optional[types.Part]:
+        query = "SELECT part FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?"
+        params = [app_name, user_id, self._scope(session_id, filename), filename]
+        if version is None:
+            query += " ORDER BY version DESC LIMIT 1"
+        else:
+            query += " AND version = ?"
+            params.append(version)
+        row = await run_in_tool_thread(lambda: self._conn().execute(query, params).fetchone())
+        return types.Part.model_validate_json(row[0]) if row else None
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: str) -> list[str]:
+        rows = await run_in_tool_thread(lambda: self._conn().execute(
+            "SELECT DISTINCT filename FROM artifacts WHERE app_name = ? AND user_id = ? AND scope IN (?, 'user')",
+            (app_name, user_id, session_id),
+        ).fetchall())
+        return sorted(r[0] for r in rows)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> None:
+        def delete():
+            with self._conn() as conn:
+                conn.execute(
+                    "DELETE FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+                    (app_name, user_id, self._scope(session_id, filename), filename),
+                )
+        await run_in_tool_thread(delete)
+
+    async def list_versions(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> list[int]:
+        rows = await run_in_tool_thread(lambda: self._conn().execute(
+            "SELECT version FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ? ORDER BY version",
+            (app_name, user_id, self._scope(session_id, filename), filename),
+        ).fetchall())
+        return [r[0] for r in rows]
+
+    def _save(self, app_name: str, user_id: str, scope: str, filename: str, artifact: types.Part) -> int:
+        with self._conn() as conn:
+            # The INSERT ... SELECT picks the next version atomically, even across processes
+            conn.execute(
+                """INSERT INTO artifacts (app_name, user_id, scope, filename, version, part)
+                   SELECT ?, ?, ?, ?, COALESCE(MAX(version) + 1, 0), ? FROM artifacts
+                   WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?""",
+                (app_name, user_id, scope, filename, artifact.model_dump_json(exclude_none=True),
+                 app_name, user_id, scope, filename),
+            )
+            row = conn.execute(
+                "SELECT MAX(version) FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+                (app_name, user_id, scope, filename),
+            ).fetchone()
+        return row[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from google.adk.events.event import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListEventsResponse, ListSessionsResponse
+from google.adk.sessions.state import State
+
+
+def _split_state(state: dict) -> tuple:
+    """Splits a state dict into (app, user, session) parts by key prefix; temp: keys are dropped."""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    ADK session service stored in a local SQLite database (WAL mode).
+    Several worker processes can point at the same file, so sessions survive restarts and any
+    uvicorn worker can serve any conversation. No external database server is needed.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    update_time REAL NOT NULL,
+                    PRIMARY KEY (app_name, user_id, id)
+                );
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_events_session ON events(app_name, user_id, session_id, seq);
+                CREATE TABLE IF NOT EXISTS app_states (
+                    app_name TEXT PRIMARY KEY,
+                    state TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS user_states (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (app_name, user_id)
+                );
+            """)
+
+    def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                       session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state(state)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (app_name, user_id, id, state, update_time) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state), now),
+            )
+            conn.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._merge_scoped_state(conn, app_name, user_id, app_delta, user_delta)
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=now)
+        return self._with_scoped_state(conn, session)
+
+    def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                    config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        where = "app_name = ? AND user_id = ? AND session_id = ?"
+        params = [app_name, user_id, session_id]
+        if config and config.after_timestamp:
+            where += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        if config and config.num_recent_events:
+            # Newest N events, returned oldest first
+            query = f"SELECT data FROM (SELECT seq, data FROM events WHERE {where} ORDER BY seq DESC LIMIT ?) ORDER BY seq"
+            params.append(config.num_recent_events)
+        else:
+            query = f"SELECT data FROM events WHERE {where} ORDER BY seq"
+        events = [Event.model_validate_json(r[0]) for r in conn.execute(query, params).fetchall()]
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=json.loads(row[0]),
+            events=events,
+            last_update_time=row[1],
+        )
+        return self._with_scoped_state(conn, session)
+
+    def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        rows = self._conn().execute(
+            "SELECT id, update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=user_id, id=sid, last_update_time=updated)
+            for sid, updated in rows
+        ])
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            )
+
+    def list_events(self, *, app_name: str, user_id: str, session_id: str) -> ListEventsResponse:
+        session = self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        return ListEventsResponse(events=session.events if session else [])
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        app_delta, user_delta, session_delta = _split_state(
+            event.actions.state_delta if event.actions and event.actions.state_delta else {}
+        )
+        conn = self._conn()
+        with conn:
+            # IMMEDIATE takes the write lock up front so the state read-modify-write below
+            # can't interleave with another worker appending to the same session
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (session.app_name, session.user_id, session.id),
+            ).fetchone()
+            if row is None:
+                return event
+            state = json.loads(row[0])
+            state.update(session_delta)
+            conn.execute(
+                "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps(state), event.timestamp, session.app_name, session.user_id, session.id),
+            )
+            conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, event.timestamp, event.model_dump_json(exclude_none=True)),
+            )
+            self._merge_scoped_state(conn, session.app_name, session.user_id, app_delta, user_delta)
+        return event
+
+    def _merge_scoped_state(self, conn, app_name: str, user_id: str, app_delta: dict, user_delta: dict) -> None:
+        if app_delta:
+            row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            state = dict(json.loads(row[0]) if row else {}, **app_delta)
+            conn.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (app_name, json.dumps(state)))
+        if user_delta:
+            row = conn.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchone()
+            state = dict(json.loads(row[0]) if row else {}, **user_delta)
+            conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+
+    def _with_scoped_state(self, conn, session: Session) -> Session:
+        # Expose app- and user-scoped state under their prefixes, like InMemorySessionService
+        row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (session.app_name,)).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            session.state[State.APP_PREFIX + key] = value
+        row = conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (session.app_name, session.user_id)
+        ).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit mode so BEGIN IMMEDIATE is under our control
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
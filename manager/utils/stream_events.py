@@ -0,0 +1,52 @@
+import json
+
+
+def event_to_messages(event) -> list:
+    """
+    Converts one ADK runner event into the client-facing stream messages.
+    Message types:
+        text_delta      partial model text (append to the current reply)
+        text            complete text of one agent response
+        tool_call_start a tool (function) call issued by an agent
+        tool_call_end   the tool's result
+        agent_transfer  control handed to another (sub-)agent
+    Returns:
+        list of dicts, each with a "type" and the emitting agent under "author".
+    """
+    messages = []
+    author = event.author
+    for call in event.get_function_calls():
+        messages.append({
+            "type": "tool_call_start",
+            "author": author,
+            "id": call.id,
+            "name": call.name,
+            "args": call.args or {},
+        })
+    for response in event.get_function_responses():
+        messages.append({
+            "type": "tool_call_end",
+            "author": author,
+            "id": response.id,
+            "name": response.name,
+            "response": response.response,
+        })
+    if event.actions and event.actions.transfer_to_agent:
+        messages.append({
+            "type": "agent_transfer",
+            "author": author,
+            "to": event.actions.transfer_to_agent,
+        })
+    text = "".join(part.text for part in (event.content.parts if event.content and event.content.parts else []) if part.text)
+    if text:
+        messages.append({
+            "type": "text_delta" if event.partial else "text",
+            "author": author,
+            "text": text,
+        })
+    return messages
+
+
+def format_sse(message: dict) -> str:
+    """Serializes a stream message as a Server-Sent Events frame."""
+    return f"event: {message['type']}\ndata: {json.dumps(message, default=str)}\n\n"
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+_COLUMNS = ("id", "user", "request", "response", "timestamp", "status")
+PRUNE_EVERY = 100
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _id_bound(value: str) -> int:
+    """
+    Smallest entry ID appended at or after an ISO 8601 time (naive times are UTC, like the
+    stored timestamps). IDs are derived from the append time, see TaskHistoryStore._next_id.
+    """
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+class TaskHistoryStore:
+    """
+    Append-only chat task history backed by SQLite (WAL mode).
+
+    `append` never touches the database: entries go into a bounded in-memory ring buffer and a
+    background thread writes them in batches. Queries merge the not-yet-written entries with the
+    database and use keyset (cursor) pagination on the entry ID, so each page costs O(page size)
+    regardless of how many entries are stored. The table is capped at `max_rows` (oldest pruned).
+    """
+
+    def __init__(self, db_path: str, ring_size: int = 1000, batch_size: int = 200,
+                 flush_interval: float = 0.5, max_rows: int = 1_000_000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.dropped = 0
+        self._pending = deque(maxlen=ring_size)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._last_id = 0
+        self._writes = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    user TEXT NOT NULL,
+                    request TEXT,
+                    response TEXT,
+                    timestamp TEXT NOT NULL,
+                    status TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, id);
+                CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks(user, id);
+                -- Time filters use ID bounds; the old timestamp index only slowed down writes
+                DROP INDEX IF EXISTS idx_tasks_timestamp;
+            """)
+        self._writer = threading.Thread(target=self._write_loop, name="task-history-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, entry: dict) -> dict:
+        """
+        Queues an entry ({user, request, response, timestamp, status}) for writing and returns it with its ID.
+        Never blocks on disk I/O; if the ring buffer is full the oldest unwritten entry is dropped.
+        """
+        with self._cond:
+            entry = dict(entry, id=self._next_id())
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return entry
+
+    def query(self, limit: int = 50, cursor: int = None, status: str = None, user: str = None,
+              since: str = None, until: str = None) -> dict:
+        """
+        Returns one page of entries, newest first.
+        Args:
+            limit (int): Page size.
+            cursor (int): `next_cursor` from the previous page; omit for the first page.
+            status (str): Only entries with this status (e.g. 'completed', 'error').
+            user (str): Only entries for this user.
+            since (str): Only entries appended at or after this ISO 8601 time.
+            until (str): Only entries appended before this ISO 8601 time.
+        Returns:
+            dict: {"items": [...], "next_cursor": int or None}
+        Raises:
+            ValueError: If since or until is not an ISO 8601 time.
+        """
+        # Time bounds become ID bounds, so filtering and ordering both use the primary key
+        low = _id_bound(since) if since is not None else None
+        high = int(cursor) if cursor is not None else None
+        if until is not None:
+            high = min(high, _id_bound(until)) if high is not None else _id_bound(until)
+        filters, params = [], []
+        if low is not None:
+            filters.append("id >= ?")
+            params.append(low)
+        if high is not None:
+            filters.append("id < ?")
+            params.append(high)
+        for column, value in (("status", status), ("user", user)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM tasks {where} ORDER BY id DESC LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+        items = [dict(zip(_COLUMNS, row)) for row in rows]
+
+        def matches(entry):
+            return ((low is None or entry["id"] >= low)
+                    and (high is None or entry["id"] < high)
+                    and (status is None or entry["status"] == status)
+                    and (user is None or entry["user"] == user))
+
+        with self._cond:
+            pending = [e for e in self._pending if matches(e)]
+        if pending:
+            seen = {item["id"] for item in items}
+            items.extend(e for e in pending if e["id"] not in seen)
+            items.sort(key=lambda e: e["id"], reverse=True)
+        page = items[:limit]
+        next_cursor = page[-1]["id"] if len(items) > limit else None
+        return {"items": page, "next_cursor": next_cursor}
+
+    def flush(self) -> None:
+        """Writes all queued entries now."""
+        with self._cond:
+            batch = list(self._pending)
+        self._write(batch)
+        self._discard_written(batch)
+
+    def close(self) -> None:
+        """Stops the writer thread after writing everything still queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join(timeout=10)
+        self.flush()
+
+    def _next_id(self) -> int:
+        # Microsecond timestamp with the low digits taken from the PID: IDs sort by time and
+        # don't collide across worker processes sharing the same database file.
+        candidate = time.time_ns() // 1000 * 1000 + os.getpid() % 1000
+        if candidate <= self._last_id:
+            candidate = self._last_id + 1000
+        self._last_id = candidate
+        return candidate
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+                batch = list(self._pending)[:self.batch_size]
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"[TaskHistoryStore] Failed to write {len(batch)} entries: {e}")
+                time.sleep(self.flush_interval)
+                continue
+            self._discard_written(batch)
+
+    def _discard_written(self, batch: list) -> None:
+        if not batch:
+            return
+        with self._cond:
+            # Entries are queued in ID order, so everything up to the batch's last ID is on disk
+            while self._pending and self._pending[0]["id"] <= batch[-1]["id"]:
+                self._pending.popleft()
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO tasks ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(entry.get(c) for c in _COLUMNS) for entry in batch],
+            )
+            self._writes += 1
+            # Pruning walks max_rows index entries, so only do it every PRUNE_EVERY batches
+            if self.max_rows and self._writes % PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM tasks WHERE id < (SELECT id FROM tasks ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows - 1,),
+                )
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import pytest
+from manager.utils.admission import AdmissionController, AdmissionRejected
+
+
+def test_queues_then_hands_over_slot_in_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_per_user=5, max_queue=2, max_wait_seconds=5)
+        order = []
+
+        async def turn(name):
+            async with controller.admit("user"):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(turn("a"), turn("b"), turn("c"))
+        stats = controller.stats()
+        assert order == ["a", "b", "c"]
+        assert stats["running"] == 0 and stats["queued"] == 0
+        assert stats["admitted"] == 3 and stats["peak_queued"] == 2
+    asyncio.run(scenario())
+
+
+def test_rejects_per_user_queue_full_and_timeout():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_per_user=2, max_queue=1, max_wait_seconds=0.05)
+        held = await controller.acquire("alice")
+        # Second alice request queues, third exceeds her limit
+        queued = asyncio.create_task(controller.acquire("alice"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as user_limit:
+            await controller.acquire("alice")
+        assert user_limit.value.status_code == 429
+        # Queue (size 1) is full for everyone else
+        with pytest.raises(AdmissionRejected) as queue_full:
+            await controller.acquire("bob")
+        assert queue_full.value.status_code == 503 and queue_full.value.retry_after >= 1
+        # The queued request gives up after max_wait_seconds
+        with pytest.raises(AdmissionRejected) as timeout:
+            await queued
+        assert timeout.value.reason == "wait_timeout"
+        # A user whose only request timed out in the queue leaves no per-user entry behind
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("carol")
+        assert "carol" not in controller._per_user
+        held.release()
+        held.release()  # idempotent
+        assert controller.stats()["running"] == 0
+        (await controller.acquire("bob")).release()
+    asyncio.run(scenario())
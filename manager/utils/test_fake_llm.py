@@ -0,0 +1,35 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from manager.utils.fake_llm import FakeLlm, load_script
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fake_llm_script.json')
+
+
+def _generate(llm, contents, stream=False):
+    async def collect():
+        return [r async for r in llm.generate_content_async(LlmRequest(contents=contents), stream=stream)]
+    return asyncio.run(collect())
+
+
+def test_replays_function_call_then_text():
+    llm = FakeLlm(model="fake", agent_name="manager_agent", script=load_script(SCRIPT_PATH))
+    user = types.Content(role="user", parts=[types.Part(text="Please summarize the docs")])
+    first = _generate(llm, [user])[-1].content.parts[0]
+    assert first.function_call.name == "summarize_txt_file"
+
+    tool_result = types.Content(role="user", parts=[types.Part(
+        function_response=types.FunctionResponse(name="summarize_txt_file", response={"status": "success"}))])
+    second = _generate(llm, [user, types.Content(role="model", parts=[first]), tool_result])
+    assert second[-1].content.parts[0].text == "Here is a short summary of the ADK notes."
+
+
+def test_default_reply_streams_partial_chunks():
+    llm = FakeLlm(model="fake", agent_name="coding_agent")
+    responses = _generate(llm, [types.Content(role="user", parts=[types.Part(text="hello")])], stream=True)
+    assert all(r.partial for r in responses[:-1])
+    assert "".join(r.content.parts[0].text for r in responses[:-1]) == responses[-1].content.parts[0].text
+    assert responses[-1].content.parts[0].text == "[coding_agent] fake reply to: hello"
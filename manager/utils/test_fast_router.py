@@ -0,0 +1,27 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils.fast_router import load_router
+
+
+def test_bundled_rules_route_unambiguous_messages():
+    router = load_router()
+    assert router.route("AAPL quote") == ("stock_agent", "ticker_quote")
+    assert router.route("get me a quote for $tsla please") == ("stock_agent", "ticker_quote")
+    assert router.route("Show my unread emails") == ("google_agent", "gmail")
+    assert router.route("Give me a quote about courage") is None
+    # Rules for two different agents, or a multi-step request: leave it to the manager
+    assert router.route("Post my latest YouTube video on LinkedIn") is None
+    assert router.route("Check my inbox and then scrape example.com") is None
+
+
+def test_state_rule_takes_priority_and_stats():
+    router = load_router()
+    assert router.route("yes, go ahead", {"pending_trade_action": {"symbol": "AAPL"}}) == (
+        "stock_agent", "pending_trade_confirmation")
+    router.route("what's the weather?")
+    stats = router.stats()
+    assert stats["messages"] == 2
+    assert stats["routed"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["by_rule"] == {"pending_trade_confirmation": 1}
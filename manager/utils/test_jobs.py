@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils import jobs
+from manager.utils.jobs import JobManager, JobStore
+
+
+def _counting_job(job, steps: int, delay: float = 0.0) -> dict:
+    for i in range(steps):
+        time.sleep(delay)
+        job.progress((i + 1) / steps, f"step {i + 1}")
+    return {"status": "success", "steps": steps}
+
+
+def _wait_for(manager, job_id, statuses=jobs.TERMINAL_STATUSES, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job stuck in {manager.get(job_id)['status']}")
+
+
+def test_job_runs_and_records_result(tmp_path, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_KINDS, "count", "manager.utils.test_jobs:_counting_job")
+    manager = JobManager(JobStore(str(tmp_path / "jobs.db")), max_workers=2)
+    job = manager.submit("count", {"steps": 3}, user="alice")
+    assert job["status"] == "queued"
+    done = _wait_for(manager, job["id"])
+    assert done["status"] == "succeeded"
+    assert done["progress"] == 1.0 and done["result"] == {"status": "success", "steps": 3}
+    assert [j["id"] for j in manager.list(user="alice")] == [job["id"]]
+    manager.shutdown()
+
+
+def test_cancel_running_and_queued_jobs(tmp_path, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_KINDS, "count", "manager.utils.test_jobs:_counting_job")
+    manager = JobManager(JobStore(str(tmp_path / "jobs.db")), max_workers=1)
+    running = manager.submit("count", {"steps": 1000, "delay": 0.01})
+    queued = manager.submit("count", {"steps": 1})
+    _wait_for(manager, running["id"], statuses=("running",))
+    assert manager.cancel(queued["id"])["status"] == "cancelled"
+    manager.cancel(running["id"])
+    assert _wait_for(manager, running["id"])["status"] == "cancelled"
+    assert manager.get(queued["id"])["started_at"] is None
+    manager.shutdown()
@@ -0,0 +1,24 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils import metrics
+
+
+def test_instrumented_tool_counts_errors_and_renders_histogram():
+    async def lookup(symbol: str) -> dict:
+        """Looks up a symbol."""
+        if not symbol:
+            return {"status": "error", "message": "empty"}
+        return {"status": "success"}
+
+    tool = metrics.instrument_tool(lookup, "test_agent")
+    assert tool.__name__ == "lookup" and tool.__doc__ == lookup.__doc__
+    asyncio.run(tool("AAPL"))
+    asyncio.run(tool(""))
+
+    text = metrics.render()
+    assert 'lenoai_tool_calls_total{agent="test_agent",tool="lookup",outcome="success"} 1' in text
+    assert 'lenoai_tool_calls_total{agent="test_agent",tool="lookup",outcome="error"} 1' in text
+    assert 'lenoai_tool_duration_seconds_bucket{agent="test_agent",tool="lookup",le="+Inf"} 2' in text
+    assert 'lenoai_tool_duration_seconds_count{agent="test_agent",tool="lookup"} 2' in text
@@ -0,0 +1,54 @@
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils.rate_limit import TokenBucket, call_with_retry
+
+
+def test_bucket_allows_burst_then_limits_rate_across_threads():
+    bucket = TokenBucket(rate=50, capacity=5)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 15 tokens: a burst of 5, then 10 at 50/s
+    assert 0.18 <= time.monotonic() - started < 0.5
+    assert not bucket.acquire(timeout=0)
+
+
+def test_pause_blocks_acquisitions():
+    bucket = TokenBucket(rate=100, capacity=10)
+    bucket.pause(0.1)
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - started >= 0.1
+
+
+class FakeError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+def test_call_with_retry_retries_listed_statuses_only():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    answers = [FakeError(429), FakeError(503), "ok"]
+
+    def call():
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert call_with_retry(call, bucket, retry_statuses=(429, 503), backoff_seconds=0.001) == "ok"
+
+    answers[:] = [FakeError(500), "ok"]
+    try:
+        call_with_retry(call, bucket, retry_statuses=(429,), backoff_seconds=0.001)
+        assert False, "500 should not be retried"
+    except FakeError as e:
+        assert e.resp.status == 500
+    assert answers == ["ok"]
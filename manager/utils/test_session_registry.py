@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from google.adk.sessions import InMemorySessionService
+from manager.utils.session_registry import SessionRegistry
+
+
+class CountingSessionService(InMemorySessionService):
+    def __init__(self):
+        super().__init__()
+        self.created = 0
+
+    def create_session(self, **kwargs):
+        self.created += 1
+        return super().create_session(**kwargs)
+
+
+def test_reuses_existing_session():
+    service = CountingSessionService()
+    registry = SessionRegistry(service, app_name="test_app")
+    session_id = registry.get_or_create("alice", "conv-1")
+    assert registry.get_or_create("alice", "conv-1") == session_id
+    assert service.created == 1
+
+
+def test_adopts_session_created_elsewhere():
+    service = CountingSessionService()
+    service.create_session(app_name="test_app", user_id="alice", session_id="conv-1")
+    registry = SessionRegistry(service, app_name="test_app")
+    assert registry.get_or_create("alice", "conv-1") == "conv-1"
+    assert service.created == 1
+
+
+def test_sessions_isolated_per_user():
+    service = InMemorySessionService()
+    registry = SessionRegistry(service, app_name="test_app")
+    registry.get_or_create("alice", "conv-1")
+    registry.get_or_create("bob", "conv-1")
+    assert service.get_session(app_name="test_app", user_id="alice", session_id="conv-1") is not None
+    assert service.get_session(app_name="test_app", user_id="bob", session_id="conv-1") is not None
+    assert len(registry) == 2
+
+
+def test_lru_eviction_deletes_oldest():
+    service = InMemorySessionService()
+    registry = SessionRegistry(service, app_name="test_app", max_sessions=2)
+    registry.get_or_create("u", "a")
+    registry.get_or_create("u", "b")
+    registry.get_or_create("u", "a")  # touch "a" so "b" is least recently used
+    registry.get_or_create("u", "c")
+    assert len(registry) == 2
+    assert service.get_session(app_name="test_app", user_id="u", session_id="b") is None
+    assert service.get_session(app_name="test_app", user_id="u", session_id="a") is not None
+
+
+def test_idle_sessions_expire():
+    service = InMemorySessionService()
+    registry = SessionRegistry(service, app_name="test_app", ttl_seconds=0)
+    registry.get_or_create("u", "a")
+    assert registry.expire_idle() == 1
+    assert len(registry) == 0
+    assert service.get_session(app_name="test_app", user_id="u", session_id="a") is None
@@ -0,0 +1,51 @@
+import os
+import sys
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+from manager.utils.sqlite_session_service import SqliteSessionService
+from manager.utils.sqlite_artifact_service import SqliteArtifactService
+
+
+def _text_event(author, text, state_delta=None):
+    return Event(
+        author=author,
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def test_session_round_trip_across_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    service = SqliteSessionService(path)
+    session = service.create_session(app_name="app", user_id="u", session_id="s1", state={"a": 1})
+    service.append_event(session, _text_event("manager_agent", "hello", {"b": 2, "user:name": "Ada", "temp:x": 0}))
+    service.append_event(session, _text_event("manager_agent", "again"))
+
+    # A second instance (e.g. another uvicorn worker) sees the same session
+    other = SqliteSessionService(path)
+    loaded = other.get_session(app_name="app", user_id="u", session_id="s1")
+    assert [e.content.parts[0].text for e in loaded.events] == ["hello", "again"]
+    assert loaded.state == {"a": 1, "b": 2, "user:name": "Ada"}
+    recent = other.get_session(app_name="app", user_id="u", session_id="s1", config=GetSessionConfig(num_recent_events=1))
+    assert [e.content.parts[0].text for e in recent.events] == ["again"]
+
+    other.delete_session(app_name="app", user_id="u", session_id="s1")
+    assert service.get_session(app_name="app", user_id="u", session_id="s1") is None
+
+
+def test_artifact_versions(tmp_path):
+    service = SqliteArtifactService(str(tmp_path / "artifacts.db"))
+
+    async def scenario():
+        keys = dict(app_name="app", user_id="u", session_id="s1")
+        assert await service.save_artifact(filename="a.txt", artifact=types.Part(text="v0"), **keys) == 0
+        assert await service.save_artifact(filename="a.txt", artifact=types.Part(text="v1"), **keys) == 1
+        assert (await service.load_artifact(filename="a.txt", **keys)).text == "v1"
+        assert (await service.load_artifact(filename="a.txt", version=0, **keys)).text == "v0"
+        assert await service.list_versions(filename="a.txt", **keys) == [0, 1]
+        assert await service.list_artifact_keys(**keys) == ["a.txt"]
+
+    asyncio.run(scenario())
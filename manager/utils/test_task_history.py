@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+from datetime import datetime, timezone
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils.task_history import TaskHistoryStore
+
+
+def _entry(i, status="completed", user="user_1"):
+    return {
+        "user": user,
+        "request": f"request {i}",
+        "response": f"response {i}",
+        "timestamp": f"2025-01-01T00:00:{i:02d}",
+        "status": status,
+    }
+
+
+def test_pages_newest_first_across_buffer_and_disk(tmp_path):
+    store = TaskHistoryStore(str(tmp_path / "history.db"), flush_interval=60)
+    for i in range(5):
+        store.append(_entry(i))
+    store.flush()
+    for i in range(5, 8):
+        store.append(_entry(i))  # still in the ring buffer
+    first = store.query(limit=4)
+    assert [e["request"] for e in first["items"]] == ["request 7", "request 6", "request 5", "request 4"]
+    second = store.query(limit=4, cursor=first["next_cursor"])
+    assert [e["request"] for e in second["items"]] == ["request 3", "request 2", "request 1", "request 0"]
+    assert second["next_cursor"] is None
+    store.close()
+
+
+def test_filters_and_persistence(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = TaskHistoryStore(path, flush_interval=60)
+    store.append(_entry(1, status="error", user="alice"))
+    time.sleep(0.01)
+    start = datetime.now(timezone.utc)
+    store.append(_entry(2, user="alice"))
+    time.sleep(0.01)
+    end = datetime.now(timezone.utc)
+    store.append(_entry(3, user="bob"))
+    store.close()
+
+    reopened = TaskHistoryStore(path, flush_interval=60)
+    assert [e["request"] for e in reopened.query(status="error")["items"]] == ["request 1"]
+    assert [e["request"] for e in reopened.query(user="alice")["items"]] == ["request 2", "request 1"]
+    in_range = reopened.query(since=start.isoformat(), until=end.isoformat())["items"]
+    assert [e["request"] for e in in_range] == ["request 2"]
+    # Naive bounds are UTC, so both spellings of the same instant select the same entries
+    naive = reopened.query(since=start.replace(tzinfo=None).isoformat(), until=end.strftime("%Y-%m-%dT%H:%M:%S.%fZ"))
+    assert naive["items"] == in_range
+    reopened.close()
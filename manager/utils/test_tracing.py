@@ -0,0 +1,61 @@
+import asyncio
+import json
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from manager.utils import tracing
+from manager.utils.tracing import TraceStore
+
+
+def test_tool_spans_nest_under_agent_and_transfer(tmp_path, monkeypatch):
+    store = TraceStore(slow_turn_ms=0.001, slow_trace_path=str(tmp_path / "slow.jsonl"))
+    monkeypatch.setattr(tracing, "store", store)
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+
+    async def lookup(symbol: str, tool_context=None) -> dict:
+        """Looks up a symbol."""
+        await asyncio.sleep(0.01)
+        return {"status": "error", "message": "unknown"} if symbol == "?" else {"status": "success"}
+
+    tool = tracing.trace_tool(lookup, "stock_agent")
+    assert tool.__name__ == "lookup" and tool.__doc__ == lookup.__doc__
+
+    async def turn():
+        started = tracing.start_trace("chat.turn", user_id="alice")
+        tracing.record_transfer("manager", "stock_agent")
+        await tool("AAPL", tool_context=object())
+        await tool("?")
+        tracing.finish_trace(started, status="ok")
+    asyncio.run(turn())
+
+    [summary] = store.list()
+    trace = store.get(summary["trace_id"])
+    spans = {span["name"]: span for span in trace["spans"]}
+    assert summary["span_count"] == 5 and trace["attributes"]["user_id"] == "alice"
+    agent_span = spans["agent stock_agent"]
+    assert agent_span["parent_id"] == spans["agent manager"]["span_id"]
+    assert spans["agent manager"]["attributes"]["transferred_to"] == "stock_agent"
+    tool_spans = [span for span in trace["spans"] if span["name"] == "tool lookup"]
+    assert [span["parent_id"] for span in tool_spans] == [agent_span["span_id"]] * 2
+    assert json.loads(tool_spans[0]["attributes"]["args"]) == {"symbol": "AAPL"}
+    assert [span["status"] for span in tool_spans] == ["ok", "error"]
+
+    otlp_spans = tracing.to_otlp([trace])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {span["traceId"] for span in otlp_spans} == {trace["trace_id"]}
+    assert [span["status"]["code"] for span in otlp_spans if span["name"] == "tool lookup"] == [1, 2]
+
+    store.flush_slow()
+    with open(tmp_path / "slow.jsonl", encoding="utf-8") as f:
+        assert json.loads(f.readline())["trace_id"] == trace["trace_id"]
+
+
+def test_tool_without_trace_runs_untraced():
+    tool = tracing.trace_tool(lambda: {"status": "success"}, "agent")
+    assert tool() == {"status": "success"}
+
+
+def test_tool_arguments_are_redacted():
+    args = tracing.redact_args({"recipient": "bob@example.com", "subject": "Hi alice@example.com", "note": "x" * 500})
+    assert args["recipient"] == "[redacted, 17 bytes]"
+    assert args["subject"] == "Hi a***@example.com"
+    assert len(args["note"]) == tracing.MAX_ARG_VALUE_CHARS + len("...[truncated]")
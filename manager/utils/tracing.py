@@ -0,0 +1,479 @@
+"""
+Per-turn trace spans: the turn, each agent's share of it (including transfers), model calls,
+tool calls (redacted arguments and payload sizes) and outbound HTTP requests made by tools.
+
+Finished traces are kept in a bounded in-memory store (served by /api/traces as JSON or OTLP/JSON),
+turns slower than TRACE_SLOW_TURN_MS are appended to a JSONL file, and OTLP_TRACES_ENDPOINT
+(an OTLP/HTTP JSON collector URL) receives every trace when set.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from manager.utils.data_dir import data_path
+from manager.utils.metrics import add_agent_callback
+
+# Longest serialized tool arguments kept on a span, and longest single string argument
+MAX_ATTRIBUTE_CHARS = 1024
+MAX_ARG_VALUE_CHARS = 200
+# Tool arguments whose values are never recorded (message bodies, recipients, credentials), only their size
+REDACTED_ARG_NAMES = {"body", "body_template", "message", "text", "content", "html", "recipient", "recipients",
+                      "to", "cc", "bcc", "email", "password", "token", "api_key", "secret", "values"}
+_EMAIL_RE = re.compile(r"([\w.+-])[\w.+-]*@([\w-]+\.[\w.-]+)")
+
+_current_trace = contextvars.ContextVar("lenoai_trace", default=None)
+_current_span = contextvars.ContextVar("lenoai_span", default=None)
+
+
+def _json_size(value) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _redact_value(value):
+    if isinstance(value, str):
+        value = _EMAIL_RE.sub(r"\1***@\2", value)
+        return value if len(value) <= MAX_ARG_VALUE_CHARS else value[:MAX_ARG_VALUE_CHARS] + "...[truncated]"
+    if isinstance(value, dict):
+        return {k: _redact_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(v) for v in value]
+    return value
+
+
+def redact_args(args: dict) -> dict:
+    """Tool arguments as recorded on spans: sensitive names reduced to their size, long strings cut, addresses masked."""
+    return {name: f"[redacted, {_json_size(value)} bytes]" if name.lower() in REDACTED_ARG_NAMES else _redact_value(value)
+            for name, value in args.items()}
+
+
+def _truncate(value) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text if len(text) <= MAX_ATTRIBUTE_CHARS else text[:MAX_ATTRIBUTE_CHARS] + "...[truncated]"
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, trace, name: str, parent=None, kind: str = "internal", **attributes):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "ok"
+        trace.spans.append(self)
+
+    def end(self, status: str = None, **attributes) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+        if status:
+            self.status = status
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        end_ns = self.end_ns or time.time_ns()
+        return {
+            "span_id": self.span_id, "parent_id": self.parent_id, "name": self.name, "kind": self.kind,
+            "start_ns": self.start_ns, "end_ns": end_ns, "duration_ms": (end_ns - self.start_ns) / 1e6,
+            "status": self.status, "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """One turn's spans. Spans are appended from the event loop and from tool threads."""
+
+    def __init__(self, name: str, **attributes):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.root = Span(self, name, **attributes)
+        # Open spans per agent / per agent model call, so callbacks can find their parent
+        self._agent_spans = {}
+        self._agent_parent = {}
+        self._llm_spans = {}
+
+    def agent_span(self, agent_name: str) -> Span:
+        """The open span for the agent's current stretch of control (created on first use)."""
+        span = self._agent_spans.get(agent_name)
+        if span is None:
+            parent = self._agent_parent.pop(agent_name, self.root)
+            span = self._agent_spans[agent_name] = Span(self, f"agent {agent_name}", parent=parent, agent=agent_name)
+        return span
+
+    def transfer(self, from_agent: str, to_agent: str) -> None:
+        """Ends `from_agent`'s span; the target's span becomes its child."""
+        source = self.agent_span(from_agent)
+        source.end(transferred_to=to_agent)
+        del self._agent_spans[from_agent]
+        self._agent_parent[to_agent] = source
+
+    def to_dict(self) -> dict:
+        root = self.root.to_dict()
+        return {"trace_id": self.trace_id, "name": self.root.name, "start_ns": root["start_ns"],
+                "duration_ms": root["duration_ms"], "status": self.root.status,
+                "attributes": self.root.attributes, "spans": [span.to_dict() for span in self.spans]}
+
+
+class TraceStore:
+    """Bounded store of finished traces, plus a JSONL file of slow turns written by a background thread."""
+
+    def __init__(self, max_traces: int = 500, slow_turn_ms: float = 5000, slow_trace_path: str = None,
+                 slow_trace_max_bytes: int = 50 * 1024 * 1024):
+        self._traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self.slow_turn_ms = slow_turn_ms
+        self.slow_trace_path = slow_trace_path
+        self.slow_trace_max_bytes = slow_trace_max_bytes
+        self._slow_queue = None
+
+    def add(self, trace: dict) -> None:
+        with self._lock:
+            self._traces.append(trace)
+            if self.slow_trace_path and self.slow_turn_ms and trace["duration_ms"] >= self.slow_turn_ms:
+                if self._slow_queue is None:
+                    self._slow_queue = queue.Queue(maxsize=1000)
+                    threading.Thread(target=self._slow_loop, name="slow-trace-writer", daemon=True).start()
+                try:
+                    self._slow_queue.put_nowait(trace)
+                except queue.Full:
+                    pass  # Drop rather than slow down turns
+
+    def flush_slow(self) -> None:
+        """Waits until every queued slow trace has been written."""
+        if self._slow_queue is not None:
+            self._slow_queue.join()
+
+    def _slow_loop(self) -> None:
+        while True:
+            trace = self._slow_queue.get()
+            try:
+                self._save_slow(trace)
+            finally:
+                self._slow_queue.task_done()
+
+    def _save_slow(self, trace: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.slow_trace_path)), exist_ok=True)
+            if os.path.exists(self.slow_trace_path) and os.path.getsize(self.slow_trace_path) > self.slow_trace_max_bytes:
+                # Keep one previous file
+                os.replace(self.slow_trace_path, self.slow_trace_path + ".1")
+            with open(self.slow_trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace, default=str) + "\n")
+        except OSError as e:
+            print(f"[Tracing] Failed to save slow trace {trace['trace_id']}: {e}")
+
+    def list(self, limit: int = 50, min_duration_ms: float = 0) -> list:
+        """Newest-first trace summaries (no spans)."""
+        with self._lock:
+            traces = list(self._traces)
+        summaries = []
+        for trace in reversed(traces):
+            if trace["duration_ms"] >= min_duration_ms:
+                summaries.append({k: v for k, v in trace.items() if k != "spans"} | {"span_count": len(trace["spans"])})
+                if len(summaries) >= limit:
+                    break
+        return summaries
+
+    def get(self, trace_id: str):
+        with self._lock:
+            for trace in reversed(self._traces):
+                if trace["trace_id"] == trace_id:
+                    return trace
+        return None
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else json.dumps(value, default=str)}
+
+
+def to_otlp(traces: list) -> dict:
+    """Converts stored traces to an OTLP/JSON ExportTraceServiceRequest."""
+    kinds = {"internal": 1, "server": 2, "client": 3}
+    status_codes = {"ok": 1, "error": 2}
+    spans = []
+    for trace in traces:
+        for span in trace["spans"]:
+            otlp_span = {
+                "traceId": trace["trace_id"], "spanId": span["span_id"], "name": span["name"],
+                "kind": kinds.get(span["kind"], 1),
+                "startTimeUnixNano": str(span["start_ns"]), "endTimeUnixNano": str(span["end_ns"]),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+                "status": {"code": status_codes.get(span["status"], 0)},
+            }
+            if span["parent_id"]:
+                otlp_span["parentSpanId"] = span["parent_id"]
+            spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "lenoai-manager"}}]},
+        "scopeSpans": [{"scope": {"name": "manager.utils.tracing"}, "spans": spans}],
+    }]}
+
+
+class OtlpExporter:
+    """Posts finished traces to an OTLP/HTTP JSON endpoint from a background thread, in batches."""
+
+    def __init__(self, endpoint: str, batch_size: int = 50, interval: float = 2.0):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._loop, name="otlp-exporter", daemon=True).start()
+
+    def submit(self, trace: dict) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass  # Drop rather than slow down turns
+
+    def _loop(self) -> None:
+        import requests
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            token = _suppress_http.set(True)
+            try:
+                requests.post(self.endpoint, json=to_otlp(batch), timeout=10)
+            except Exception as e:
+                print(f"[Tracing] OTLP export of {len(batch)} traces failed: {e}")
+            finally:
+                _suppress_http.reset(token)
+
+
+store = TraceStore(
+    max_traces=int(os.getenv("TRACE_MAX_TRACES", "500")),
+    slow_turn_ms=float(os.getenv("TRACE_SLOW_TURN_MS", "5000")),
+    slow_trace_path=os.getenv("TRACE_SLOW_PATH") or data_path("slow_traces.jsonl", create=False),
+)
+_exporter = OtlpExporter(os.environ["OTLP_TRACES_ENDPOINT"]) if os.getenv("OTLP_TRACES_ENDPOINT") else None
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+
+def start_trace(name: str, **attributes):
+    """Starts a trace for the current context and returns (trace, token). None if tracing is disabled."""
+    if not TRACING_ENABLED:
+        return None
+    trace = Trace(name, **attributes)
+    return trace, (_current_trace.set(trace), _current_span.set(trace.root))
+
+
+def finish_trace(started, status: str = "ok", **attributes) -> None:
+    """Ends the trace from start_trace, stores it and restores the previous context."""
+    if started is None:
+        return
+    trace, (trace_token, span_token) = started
+    for span in trace.spans:
+        if span.end_ns is None and span is not trace.root:
+            span.end()
+    trace.root.end(status=status, **attributes)
+    record = trace.to_dict()
+    store.add(record)
+    if _exporter is not None:
+        _exporter.submit(record)
+    try:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+    except ValueError:
+        # Finished from another context (e.g. a generator closed by the garbage collector)
+        pass
+
+
+def record_transfer(from_agent: str, to_agent: str) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.transfer(from_agent, to_agent)
+
+
+# --- Model calls (before/after model callbacks) ---
+
+def _before_model(callback_context, llm_request):
+    trace = _current_trace.get()
+    if trace is not None:
+        agent = callback_context.agent_name
+        trace._llm_spans[agent] = Span(
+            trace, f"llm {agent}", parent=trace.agent_span(agent), kind="client", agent=agent,
+            model=llm_request.model or "", request_contents=len(llm_request.contents or []),
+            request_chars=sum(len(p.text or "") for c in llm_request.contents or [] for p in c.parts or []),
+        )
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    trace = _current_trace.get()
+    if trace is None or llm_response.partial:
+        return None
+    span = trace._llm_spans.pop(callback_context.agent_name, None)
+    if span is not None:
+        parts = llm_response.content.parts if llm_response.content and llm_response.content.parts else []
+        span.end(status="error" if llm_response.error_code else None,
+                 response_chars=sum(len(p.text or "") for p in parts),
+                 function_calls=",".join(p.function_call.name for p in parts if p.function_call),
+                 **({"error_code": str(llm_response.error_code)} if llm_response.error_code else {}))
+    return None
+
+
+# --- Tool calls ---
+
+def _tool_span(agent_name: str, tool_name: str, signature, args: tuple, kwargs: dict):
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    try:
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        arguments = kwargs
+    args = {k: v for k, v in arguments.items() if k != "tool_context"}
+    return Span(trace, f"tool {tool_name}", parent=trace.agent_span(agent_name), agent=agent_name, tool=tool_name,
+                args=_truncate(redact_args(args)), args_bytes=_json_size(args))
+
+
+def _end_tool_span(span, result=None, error: Exception = None) -> None:
+    if error is not None:
+        span.end(status="error", error=str(error))
+    else:
+        failed = isinstance(result, dict) and result.get("status") == "error"
+        span.end(status="error" if failed else None, result_bytes=_json_size(result))
+
+
+def trace_tool(func, agent_name: str):
+    """Wraps a tool function so each call becomes a span (args, payload sizes, outcome). Keeps the signature."""
+    if getattr(func, "__traced__", False):
+        return func
+    tool_name = func.__name__
+    signature = inspect.signature(func)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            span = _tool_span(agent_name, tool_name, signature, args, kwargs)
+            if span is None:
+                return await func(*args, **kwargs)
+            token = _current_span.set(span)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                _end_tool_span(span, error=e)
+                raise
+            finally:
+                _current_span.reset(token)
+            _end_tool_span(span, result)
+            return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span = _tool_span(agent_name, tool_name, signature, args, kwargs)
+            if span is None:
+                return func(*args, **kwargs)
+            token = _current_span.set(span)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _end_tool_span(span, error=e)
+                raise
+            finally:
+                _current_span.reset(token)
+            _end_tool_span(span, result)
+            return result
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def trace_agent(agent) -> None:
+    """Adds tool and model-call spans to `agent` and its sub-agents."""
+    tools = getattr(agent, "tools", None)
+    if tools:
+        agent.tools = [trace_tool(t, agent.name) if inspect.isfunction(t) else t for t in tools]
+    if hasattr(agent, "before_model_callback"):
+        add_agent_callback(agent, "before_model_callback", _before_model)
+        add_agent_callback(agent, "after_model_callback", _after_model)
+    for sub_agent in getattr(agent, "sub_agents", []) or []:
+        trace_agent(sub_agent)
+
+
+# --- Outbound HTTP (requests and httplib2, which googleapiclient uses) ---
+
+_suppress_http = contextvars.ContextVar("lenoai_suppress_http", default=False)
+_http_installed = False
+
+
+def _http_span(method: str, url: str):
+    parent = _current_span.get()
+    if parent is None or _suppress_http.get():
+        return None
+    parts = urlsplit(url)
+    # Query strings can carry tokens and personal data; keep scheme, host and path only
+    return Span(parent.trace, f"HTTP {method} {parts.netloc}", parent=parent, kind="client",
+                **{"http.method": method, "http.url": f"{parts.scheme}://{parts.netloc}{parts.path}"})
+
+
+def install_http_tracing() -> None:
+    """Patches requests and httplib2 (once) so calls made inside a traced tool become spans."""
+    global _http_installed
+    if _http_installed:
+        return
+    _http_installed = True
+
+    import requests
+    original_send = requests.Session.send
+
+    @functools.wraps(original_send)
+    def send(self, request, **kwargs):
+        span = _http_span(request.method, request.url)
+        if span is None:
+            return original_send(self, request, **kwargs)
+        try:
+            response = original_send(self, request, **kwargs)
+        except Exception as e:
+            span.end(status="error", error=str(e))
+            raise
+        span.end(status="error" if response.status_code >= 500 else None,
+                 **{"http.status_code": response.status_code,
+                    "http.response_bytes": int(response.headers.get("Content-Length") or 0)})
+        return response
+    requests.Session.send = send
+
+    try:
+        import httplib2
+    except ImportError:
+        return
+    original_request = httplib2.Http.request
+
+    @functools.wraps(original_request)
+    def request(self, uri, method="GET", *args, **kwargs):
+        span = _http_span(method, uri)
+        if span is None:
+            return original_request(self, uri, method, *args, **kwargs)
+        try:
+            response, content = original_request(self, uri, method, *args, **kwargs)
+        except Exception as e:
+            span.end(status="error", error=str(e))
+            raise
+        span.end(status="error" if response.status >= 500 else None,
+                 **{"http.status_code": response.status, "http.response_bytes": len(content or b"")})
+        return response, content
+    httplib2.Http.request = request
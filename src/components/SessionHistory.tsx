@@ -79,10 +79,11 @@ export const SessionHistory: React.FC = () => {
     async function fetchHistory() {
       setLoading(true);
       try {
-        const res = await fetch('/api/task_history');
+        // Paginated endpoint: items come back newest first
+        const res = await fetch('/api/task_history?limit=200');
         if (!res.ok) throw new Error('Failed to fetch task history');
         const data = await res.json();
-        setHistory(Array.isArray(data) ? data.reverse() : []);
+        setHistory(Array.isArray(data.items) ? data.items : []);
         setError(null);
       } catch (err: unknown) {
         if (typeof err === 'object' && err !== null && 'message' in err) {
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from "react";
-import { sendAgentMessage } from "../lib/agentApi";
+import { streamAgentMessage } from "../lib/agentApi";
 import { isActionableTask } from "../config/actionableTasksConfig";
 
 type ChatMessage = {
@@ -19,6 +19,19 @@ export type ActionLog = {
 
 const CHAT_STORAGE_KEY = "agent_chat_history";
 const ACTION_LOG_STORAGE_KEY = "agent_action_logs";
+const CONVERSATION_ID_STORAGE_KEY = "agent_conversation_id";
+
+function newConversationId(): string {
+  return `conv-${Date.now()}-${Math.random().toString(36).substr(2, 8)}`;
+}
+
+function loadConversationId(): string {
+  const stored = localStorage.getItem(CONVERSATION_ID_STORAGE_KEY);
+  if (stored) return stored;
+  const id = newConversationId();
+  localStorage.setItem(CONVERSATION_ID_STORAGE_KEY, id);
+  return id;
+}
 
 function loadMessagesFromStorage(): ChatMessage[] {
   try {
@@ -51,6 +64,8 @@ export function useAgentChat() {
   const [error, setError] = useState<string | null>(null);
   const [actionLogs, setActionLogs] = useState<ActionLog[]>(loadActionLogsFromStorage());
   const isFirstRender = useRef(true);
+  const conversationId = useRef<string>(loadConversationId());
+  const abortController = useRef<AbortController | null>(null);
 
   // Persist messages to localStorage whenever they change
   useEffect(() => {
@@ -70,6 +85,9 @@ export function useAgentChat() {
   const clearMessages = () => {
     setMessages([]);
     localStorage.removeItem(CHAT_STORAGE_KEY);
+    // Start a fresh server-side session for the next message
+    conversationId.current = newConversationId();
+    localStorage.setItem(CONVERSATION_ID_STORAGE_KEY, conversationId.current);
   };
 
   const addActionLog = (log: Omit<ActionLog, "id" | "timestamp"> & { id?: string; timestamp?: string }) => {
@@ -84,20 +102,39 @@ export function useAgentChat() {
   const sendMessage = async (userMessage: string) => {
     setLoading(true);
     setError(null);
+    const controller = new AbortController();
+    abortController.current = controller;
+    // Show the user message and an empty agent reply right away; the reply fills in as it streams
+    setMessages((msgs) => [
+      ...msgs,
+      { role: "user", content: userMessage },
+      { role: "agent", content: "" }
+    ]);
+    const setAgentContent = (content: string) =>
+      setMessages((msgs) => [...msgs.slice(0, -1), { role: "agent", content }]);
+    let streamed = "";
+    let agentContent = "";
     try {
-      const agentResponse = await sendAgentMessage(userMessage);
-      const agentContent =
-        typeof agentResponse === "string"
-          ? agentResponse
-          : agentResponse.reply ||
-            agentResponse.response ||
-            agentResponse.message ||
-            JSON.stringify(agentResponse);
-      setMessages((msgs) => [
-        ...msgs,
-        { role: "user", content: userMessage },
-        { role: "agent", content: agentContent }
-      ]);
+      await streamAgentMessage(
+        userMessage,
+        { conversation_id: conversationId.current },
+        (event) => {
+          if (event.type === "text_delta") {
+            streamed += event.text;
+            setAgentContent(streamed);
+          } else if (event.type === "text") {
+            streamed = "";
+            agentContent = event.text;
+            setAgentContent(agentContent);
+          } else if (event.type === "done") {
+            agentContent = event.reply;
+            setAgentContent(agentContent);
+          } else if (event.type === "error") {
+            setError(event.message);
+          }
+        },
+        controller.signal
+      );
 
       // Detect actionable task using custom matcher
       if (isActionableTask(agentContent)) {
@@ -109,15 +146,23 @@ export function useAgentChat() {
         });
       }
     } catch (err: unknown) {
-      if (typeof err === "object" && err !== null && "message" in err) {
+      if (controller.signal.aborted) {
+        setAgentContent(agentContent || streamed || "[Cancelled]");
+      } else if (typeof err === "object" && err !== null && "message" in err) {
         setError((err as { message?: string }).message || "Unknown error");
       } else {
         setError("Unknown error");
       }
     } finally {
+      abortController.current = null;
       setLoading(false);
     }
   };
 
-  return { messages, sendMessage, loading, error, clearMessages, actionLogs, addActionLog };
+  // Stops the running turn; the server cancels it when the stream is closed
+  const cancelMessage = () => {
+    abortController.current?.abort();
+  };
+
+  return { messages, sendMessage, cancelMessage, loading, error, clearMessages, actionLogs, addActionLog };
 }
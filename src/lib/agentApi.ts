@@ -1,11 +1,66 @@
 const API_BASE = import.meta.env.VITE_AGENT_API_URL || "http://localhost:3001/api";
 
+// Overload (429/503) responses carry {detail, retry_after}; surface them instead of a generic error
+async function apiError(response: Response) {
+  const body = await response.json().catch(() => null);
+  if (body?.detail && body?.retry_after) {
+    return new Error(`${body.detail} (retry in ${body.retry_after}s)`);
+  }
+  return new Error("Agent API error");
+}
+
 export async function sendAgentMessage(message: string, context: any = {}) {
   const response = await fetch(`${API_BASE}/chat`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ message, ...context }),
+    // context carries user_id / conversation_id so the server can keep one session per conversation
+    body: JSON.stringify({ message, context }),
   });
-  if (!response.ok) throw new Error("Agent API error");
+  if (!response.ok) throw await apiError(response);
   return response.json();
 }
+
+export type AgentStreamEvent =
+  | { type: "text_delta"; author: string; text: string }
+  | { type: "text"; author: string; text: string }
+  | { type: "tool_call_start"; author: string; id: string; name: string; args: Record<string, unknown> }
+  | { type: "tool_call_end"; author: string; id: string; name: string; response: unknown }
+  | { type: "agent_transfer"; author: string; to: string }
+  | { type: "done"; reply: string }
+  | { type: "error"; message: string };
+
+// Streams one turn from /chat/stream (Server-Sent Events). Abort the signal to cancel the turn.
+export async function streamAgentMessage(
+  message: string,
+  context: any = {},
+  onEvent: (event: AgentStreamEvent) => void,
+  signal?: AbortSignal
+) {
+  const response = await fetch(`${API_BASE}/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify({ message, context }),
+    signal,
+  });
+  if (!response.ok) throw await apiError(response);
+  if (!response.body) throw new Error("Agent API error");
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    // SSE frames are separated by a blank line; keep any trailing partial frame in the buffer
+    const frames = buffer.split("\n\n");
+    buffer = frames.pop() || "";
+    for (const frame of frames) {
+      const data = frame
+        .split("\n")
+        .filter((line) => line.startsWith("data: "))
+        .map((line) => line.slice(6))
+        .join("\n");
+      if (data) onEvent(JSON.parse(data));
+    }
+  }
+}
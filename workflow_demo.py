@@ -8,9 +8,8 @@ from google.adk.sessions import InMemorySessionService
 
 from manager.sub_agents.coding_agent.tools.github_tool import create_github_repo
 from manager.sub_agents.scraper_agent.scraper_tool import selenium_scrape_headlines
-from manager.sub_agents.google_agent.sheets_tools import append_sheet, list_sheets
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
+from manager.sub_agents.google_agent.tools.sheets_tools import append_sheet, get_sheets_service
+from manager.sub_agents.google_agent.tools.sheets_index import find_sheets_by_name
 from dotenv import load_dotenv
 
 load_dotenv(".env")
@@ -24,13 +23,9 @@ print("sys.path:", sys.path)
 
 def create_sheet(sheet_name: str) -> dict:
     """Create a new Google Sheet with the given name and return its ID."""
-    creds = None
-    if os.path.exists("token.json"):
-        creds = Credentials.from_authorized_user_file("token.json", ["https://www.googleapis.com/auth/spreadsheets"])
-    else:
-        return {"status": "error", "message": "token.json not found. Please complete OAuth2 flow for Google Sheets API."}
     try:
-        service = build("sheets", "v4", credentials=creds)
+        # Built from the pinned discovery document; no discovery fetch over the network
+        service = get_sheets_service()
         spreadsheet = {
             'properties': {
                 'title': sheet_name
@@ -74,37 +69,33 @@ print("-" * 40)
 SHEET_IDENTIFIER = "Demo Results"  # or your sheet ID
 sheet_range = "Sheet1!A1"
 
-# List all available Google Sheets for debugging and selection
-sheets_listing = list_sheets()
-if sheets_listing.get('status') == 'success':
-    print("Available Google Sheets:")
-    for s in sheets_listing['sheets']:
-        print(f"  - {s['name']} (ID: {s['id']})")
-else:
-    print(f"ERROR: Could not list Google Sheets: {sheets_listing.get('message')}")
-
 spreadsheet_id = SHEET_IDENTIFIER
 sheet_found = False
 if not (len(SHEET_IDENTIFIER) == 44 and '-' in SHEET_IDENTIFIER):  # crude check for ID
-    if sheets_listing.get('status') == 'success':
-        matches = [s for s in sheets_listing['sheets'] if s['name'].lower() == SHEET_IDENTIFIER.lower()]
-        if matches:
-            spreadsheet_id = matches[0]['id']
+    try:
+        # Name lookup in the local sheet index (kept current from the Drive changes feed)
+        matches = find_sheets_by_name(SHEET_IDENTIFIER)
+    except Exception as e:
+        print(f"ERROR: Could not look up Google Sheets: {e}")
+        matches = None
+    if matches:
+        spreadsheet_id = matches[0]['id']
+        sheet_found = True
+        print(f"Found Google Sheet ID for '{SHEET_IDENTIFIER}': {spreadsheet_id}")
+        if len(matches) > 1:
+            print(f"  ({len(matches) - 1} other sheet(s) share this name; using the most recently modified)")
+    elif matches is not None:
+        print(f"No Google Sheet found with name '{SHEET_IDENTIFIER}'. Creating new sheet...")
+        create_result = create_sheet(SHEET_IDENTIFIER)
+        print("Sheet creation result:", create_result)
+        if create_result.get('status') == 'success':
+            spreadsheet_id = create_result['spreadsheetId']
             sheet_found = True
-            print(f"Found Google Sheet ID for '{SHEET_IDENTIFIER}': {spreadsheet_id}")
+            print(f"Created and using new Google Sheet with ID: {spreadsheet_id}")
         else:
-            print(f"No Google Sheet found with name '{SHEET_IDENTIFIER}'. Creating new sheet...")
-            create_result = create_sheet(SHEET_IDENTIFIER)
-            print("Sheet creation result:", create_result)
-            if create_result.get('status') == 'success':
-                spreadsheet_id = create_result['spreadsheetId']
-                sheet_found = True
-                print(f"Created and using new Google Sheet with ID: {spreadsheet_id}")
-            else:
-                spreadsheet_id = None
-                print("ERROR: Failed to create new Google Sheet.")
+            spreadsheet_id = None
+            print("ERROR: Failed to create new Google Sheet.")
     else:
-        print(f"ERROR: Could not list Google Sheets: {sheets_listing.get('message')}")
         spreadsheet_id = None
 else:
     sheet_found = True